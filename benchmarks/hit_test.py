@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Hit-test benchmark for screens with many views.
+
+Builds an activity holding a grid of buttons (rows of horizontal
+LinearLayouts inside a vertical one) and reports the time per
+Activity.find_view_at() call, both on a static screen and right after
+scrolling one row's worth of views.
+
+Usage:
+    python benchmarks/hit_test.py [--views N] [--row-size N] [--queries N]
+"""
+
+import argparse
+import random
+import time
+
+from pyandroid.core import Activity
+from pyandroid.ui import LinearLayout, Button
+
+
+def build_activity(view_count: int, row_size: int) -> Activity:
+    """Build an activity with a grid of view_count 40x40 buttons."""
+    root = LinearLayout("root", orientation="vertical", spacing=0)
+    row = None
+    for i in range(view_count):
+        if i % row_size == 0:
+            row = LinearLayout(f"row_{i // row_size}", orientation="horizontal", spacing=0)
+            root.add_view(row)
+        row.add_view(Button(f"button_{i}", "OK", width=40, height=40))
+    activity = Activity("BenchmarkActivity")
+    activity.add_view("root", root)
+    return activity
+
+
+def main() -> None:
+    """Run the benchmark and print microseconds per hit test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=10_000)
+    parser.add_argument("--row-size", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    activity = build_activity(args.views, args.row_size)
+    width = args.row_size * 40
+    height = -(-args.views // args.row_size) * 40
+    rng = random.Random(0)
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    activity.find_view_at(0, 0)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = sum(activity.find_view_at(x, y) is not None for x, y in points)
+    static = (time.perf_counter() - start) / args.queries
+
+    root = activity.get_view("root")
+    start = time.perf_counter()
+    root.set_padding(0, 40, 0, 0)
+    activity.find_view_at(0, 0)
+    moved = time.perf_counter() - start
+
+    print(f"views:              {args.views}")
+    print(f"index build:        {build * 1000:.1f} ms")
+    print(f"hit test:           {static * 1e6:.1f} us ({hits}/{args.queries} hits)")
+    print(f"re-index all moved: {moved * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
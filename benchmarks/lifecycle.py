@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Activity lifecycle benchmark for headless simulations.
+
+Cycles activities through start, resume, pause, stop and destroy and
+reports the time per full cycle, with and without a lifecycle observer.
+
+Usage:
+    python benchmarks/lifecycle.py [--cycles N]
+"""
+
+import argparse
+import time
+
+from pyandroid.core import Activity
+from pyandroid.lifecycle import LifecycleObserver
+
+
+class CountingObserver(LifecycleObserver):
+    """Observer counting resumes."""
+
+    def __init__(self) -> None:
+        self.resumed = 0
+
+    def on_resume(self, owner) -> None:
+        self.resumed += 1
+
+
+def run_cycles(cycles: int, observer: LifecycleObserver = None) -> float:
+    """Return microseconds per lifecycle cycle."""
+    start = time.perf_counter()
+    for _ in range(cycles):
+        activity = Activity("BenchmarkActivity")
+        if observer is not None:
+            activity.add_observer(observer)
+        activity.start()
+        activity.resume()
+        activity.pause()
+        activity.stop()
+        activity.destroy()
+    return (time.perf_counter() - start) / cycles * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print microseconds per cycle."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"cycle:               {run_cycles(args.cycles):.2f} us")
+    print(f"cycle with observer: {run_cycles(args.cycles, CountingObserver()):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Logger rate limiting benchmark.
+
+Reports the time per Logger.info() call when the record is written, when
+it is dropped by the per-call-site rate limit, and when the level is
+disabled. Records go to a sink that discards them, so the numbers measure
+the caller's side of logging.
+
+Usage:
+    python benchmarks/log_sampling.py [--calls N]
+"""
+
+import argparse
+import logging
+import time
+
+from pyandroid import logs
+from pyandroid.utils import Logger
+
+
+def time_calls(logger: Logger, calls: int) -> float:
+    """Return microseconds per info() call."""
+    start = time.perf_counter()
+    for number in range(calls):
+        logger.info("Counter incremented to %d", number, button="increment")
+    elapsed = time.perf_counter() - start
+    logs.flush()
+    return elapsed / calls * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print microseconds per call."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Keep the console quiet; every record still goes through the queue
+    logs.queue_handler()
+    logs._writer.handlers = (logging.NullHandler(),)
+
+    unlimited = Logger("Benchmark.unlimited")
+    limited = Logger("Benchmark.limited", rate_limit=10, rate_period=60.0)
+    disabled = Logger("Benchmark.disabled", level="WARNING")
+
+    print(f"logged:           {time_calls(unlimited, args.calls):.3f} us")
+    print(f"rate limited:     {time_calls(limited, args.calls):.3f} us")
+    print(f"level disabled:   {time_calls(disabled, args.calls):.3f} us")
+
+
+if __name__ == "__main__":
+    main()
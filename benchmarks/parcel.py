@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Intent extras serialization benchmark.
+
+Builds an intent carrying an image-sized bytes payload, a numeric array and
+a few small extras, then reports the time to serialize it, to read it back
+and access one small extra, and to forward it unchanged.
+
+Usage:
+    python benchmarks/parcel.py [--payload-kb N] [--rounds N]
+"""
+
+import argparse
+import array
+import time
+
+from pyandroid.core import Intent
+
+
+def build_intent(payload_kb: int) -> Intent:
+    """Build an intent with large and small extras."""
+    intent = Intent("ACTION_SEND", "EditorActivity", mime_type="image/png")
+    intent.put_extra("image", bytes(payload_kb * 1024))
+    intent.put_extra("histogram", array.array("d", range(payload_kb * 16)))
+    intent.put_extra("title", "photo.png")
+    intent.put_extra("tags", ["holiday", "beach"])
+    return intent
+
+
+def timed(function, rounds: int) -> float:
+    """Return microseconds per call of function."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print microseconds per operation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-kb", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    intent = build_intent(args.payload_kb)
+    data = intent.to_bytes()
+
+    print(f"serialized size:     {len(data) / 1024:.0f} KiB")
+    print(f"to_bytes:            {timed(intent.to_bytes, args.rounds):.1f} us")
+    print(f"read one extra:      "
+          f"{timed(lambda: Intent.from_bytes(data).get_extra('title'), args.rounds):.1f} us")
+    print(f"read image (view):   "
+          f"{timed(lambda: Intent.from_bytes(data).get_extra('image'), args.rounds):.1f} us")
+    print(f"forward unchanged:   "
+          f"{timed(lambda: Intent.from_bytes(data).to_bytes(), args.rounds):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Memory benchmark for large view trees.
+
+Builds a tree of 100,000 views (rows of mixed TextView, Button and EditText
+inside nested LinearLayouts) and reports the traced allocation per view.
+
+Usage:
+    python benchmarks/view_memory.py [--views N] [--row-size N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from pyandroid.ui import LinearLayout, TextView, Button, EditText
+
+
+def build_tree(view_count: int, row_size: int) -> LinearLayout:
+    """Build a vertical layout of horizontal rows holding view_count views."""
+    root = LinearLayout("root", orientation="vertical")
+    row = None
+    for i in range(view_count):
+        if i % row_size == 0:
+            row = LinearLayout(f"row_{i // row_size}", orientation="horizontal")
+            root.add_view(row)
+        kind = i % 3
+        if kind == 0:
+            view = TextView(f"text_{i}", "Label", width=100, height=40)
+        elif kind == 1:
+            view = Button(f"button_{i}", "OK", width=100, height=40)
+        else:
+            view = EditText(f"edit_{i}", hint="Value", width=100, height=40)
+        row.add_view(view)
+    return root
+
+
+def main() -> None:
+    """Run the benchmark and print bytes per view."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=100_000)
+    parser.add_argument("--row-size", type=int, default=100)
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    root = build_tree(args.views, args.row_size)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    total = after - before
+    print(f"views:          {args.views}")
+    print(f"total bytes:    {total}")
+    print(f"bytes per view: {total / args.views:.1f}")
+    # Keep the tree alive until after the measurement
+    del root
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,13 @@ from pyandroid.utils import Logger
 class MainActivity(Activity):
     """Main activity for the simple app."""
     
-    def __init__(self):
-        super().__init__("MainActivity")
-        self.logger = Logger("MainActivity")
+    # The counter survives the activity being recreated
+    SAVED_STATE_FIELDS = ("counter",)
+    
+    def __init__(self, name="MainActivity", **kwargs):
+        super().__init__(name, **kwargs)
+        # Click handlers log on every event; keep bursts of clicks to 10 lines a second
+        self.logger = Logger("MainActivity", rate_limit=10)
         self.counter = 0
         
     def on_start(self):
@@ -111,13 +115,13 @@ class MainActivity(Activity):
         """Handle increment button click."""
         self.counter += 1
         self.update_counter_display()
-        self.logger.info(f"Counter incremented to {self.counter}")
+        self.logger.info("Counter incremented to %d", self.counter)
         
     def on_decrement_click(self, view):
         """Handle decrement button click."""
         self.counter -= 1
         self.update_counter_display()
-        self.logger.info(f"Counter decremented to {self.counter}")
+        self.logger.info("Counter decremented to %d", self.counter)
         
     def on_reset_click(self, view):
         """Handle reset button click."""
@@ -148,6 +152,10 @@ class MainActivity(Activity):
         else:
             self.counter_text.set_text_color("#000000")  # Black for zero
             
+    def on_restore_instance_state(self, saved_state):
+        """Show the restored counter."""
+        self.update_counter_display()
+        
     def on_resume(self):
         """Called when activity resumes."""
         self.logger.info("MainActivity resumed")
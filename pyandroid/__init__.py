@@ -22,20 +22,56 @@ Basic Usage:
 For more examples, see the examples/ directory in the repository.
 """
 
-from .core import AndroidApp, Activity, Intent
-from . import ui
-from . import utils
+import importlib
+
 from .__version__ import __version__, __author__, __license__
 
+# Submodules and the classes re-exported from them are imported on first
+# access (PEP 562), so `import pyandroid` stays cheap for short-lived workers
+_SUBMODULES = frozenset((
+    "backend", "broadcast", "bundle", "constraints", "core", "diff", "executor", "lifecycle",
+    "logs", "looper", "preferences", "scope", "service", "spatial", "state", "ui", "utils",
+))
+_LAZY_ATTRIBUTES = {
+    "AndroidApp": "core",
+    "Activity": "core",
+    "Intent": "core",
+    "IntentFilter": "core",
+    "BroadcastReceiver": "broadcast",
+    "LifecycleObserver": "lifecycle",
+    "Service": "service",
+}
+
 __all__ = [
     "AndroidApp",
     "Activity",
     "Intent",
+    "IntentFilter",
+    "BroadcastReceiver",
+    "LifecycleObserver",
+    "Service",
     "ui",
     "utils",
     "__version__",
 ]
 
+
+def __getattr__(name: str):
+    """Import submodules and re-exported classes on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
+
+
 # Attribution requirement as per license
 print(f"PyAndroid v{__version__} - Built by {__author__}")
 print("GitHub: https://github.com/subhobhai943/pyandroid-dev")
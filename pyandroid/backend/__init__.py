@@ -2,12 +2,18 @@
 
 This module provides different rendering backends for PyAndroid applications.
 Currently supports: Kivy (optional)
+
+Backends are imported on first access, and Kivy itself only when a
+renderer is constructed, so console-only apps never pay for it.
 """
 
-try:
-    from .kivy_backend import KivyRenderer
-    __all__ = ['KivyRenderer']
-except ImportError:
-    # Kivy not available - this is okay for console-only mode
-    KivyRenderer = None
-    __all__ = []
+__all__ = ['KivyRenderer']
+
+
+def __getattr__(name: str):
+    """Import backend renderers on first access."""
+    if name == 'KivyRenderer':
+        from .kivy_backend import KivyRenderer
+        globals()[name] = KivyRenderer
+        return KivyRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
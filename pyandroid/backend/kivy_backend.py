@@ -5,20 +5,54 @@ PyAndroid UI components to actual Kivy widgets.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-try:
-    from kivy.app import App
-    from kivy.uix.boxlayout import BoxLayout
-    from kivy.uix.label import Label
-    from kivy.uix.button import Button as KivyButton
-    from kivy.uix.textinput import TextInput
-    from kivy.graphics import Color, Rectangle
-    from kivy.core.window import Window
-    KIVY_AVAILABLE = True
-except ImportError:
-    KIVY_AVAILABLE = False
-    logging.warning("Kivy not installed. GUI features will not work. Install with: pip install kivy")
+from ..diff import INSERT, MOVE, REMOVE, SET, PatchOp, diff_trees
+from ..ui import parse_color
+
+# Kivy is imported by _load_kivy() when the first renderer is built;
+# None means it has not been probed yet
+KIVY_AVAILABLE = None
+
+
+def _load_kivy() -> bool:
+    """Import Kivy into this module on first use.
+    
+    Returns:
+        True if Kivy is installed, False otherwise
+    """
+    global KIVY_AVAILABLE, App, BoxLayout, FloatLayout, Label, KivyButton
+    global TextInput, Color, Rectangle, Window, Clock
+    if KIVY_AVAILABLE is None:
+        try:
+            from kivy.app import App
+            from kivy.uix.boxlayout import BoxLayout
+            from kivy.uix.floatlayout import FloatLayout
+            from kivy.uix.label import Label
+            from kivy.uix.button import Button as KivyButton
+            from kivy.uix.textinput import TextInput
+            from kivy.graphics import Color, Rectangle
+            from kivy.core.window import Window
+            from kivy.clock import Clock
+            KIVY_AVAILABLE = True
+        except ImportError:
+            KIVY_AVAILABLE = False
+            logging.warning("Kivy not installed. GUI features will not work. "
+                            "Install with: pip install kivy")
+    return KIVY_AVAILABLE
+
+
+def argb_to_rgba(value: int) -> tuple:
+    """Convert a packed 32-bit ARGB color to a Kivy RGBA tuple.
+    
+    Args:
+        value: Color as an ARGB integer
+        
+    Returns:
+        RGBA tuple with values 0-1
+    """
+    return (((value >> 16) & 0xFF) / 255.0, ((value >> 8) & 0xFF) / 255.0,
+            (value & 0xFF) / 255.0, ((value >> 24) & 0xFF) / 255.0)
 
 
 class KivyRenderer:
@@ -30,29 +64,28 @@ class KivyRenderer:
         Args:
             android_app: AndroidApp instance to render
         """
-        if not KIVY_AVAILABLE:
+        if not _load_kivy():
             raise ImportError("Kivy is required for GUI rendering. Install with: pip install kivy")
         
         self.android_app = android_app
         self.widget_map = {}
+        self.activity = None
+        self.render_tree = None
         self.logger = logging.getLogger("PyAndroid.KivyRenderer")
         
     def hex_to_rgba(self, hex_color: str) -> tuple:
         """Convert hex color to RGBA tuple.
         
         Args:
-            hex_color: Hex color string (e.g., #FF0000)
+            hex_color: Hex color string (#RRGGBB or #AARRGGBB)
             
         Returns:
-            RGBA tuple with values 0-1
+            RGBA tuple with values 0-1; white if the string is not a valid color
         """
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 6:
-            r = int(hex_color[0:2], 16) / 255.0
-            g = int(hex_color[2:4], 16) / 255.0
-            b = int(hex_color[4:6], 16) / 255.0
-            return (r, g, b, 1.0)
-        return (1.0, 1.0, 1.0, 1.0)
+        try:
+            return argb_to_rgba(parse_color(hex_color))
+        except ValueError:
+            return (1.0, 1.0, 1.0, 1.0)
     
     def render_view(self, view, parent_widget=None):
         """Render a PyAndroid view to Kivy widget.
@@ -77,7 +110,7 @@ class KivyRenderer:
             )
             # Set background color
             with widget.canvas.before:
-                Color(*self.hex_to_rgba(view_data["background_color"]))
+                widget.bg_color = Color(*self.hex_to_rgba(view_data["background_color"]))
                 widget.bg_rect = Rectangle(size=widget.size, pos=widget.pos)
             widget.bind(size=self._update_rect, pos=self._update_rect)
             
@@ -94,7 +127,7 @@ class KivyRenderer:
             
             # Bind click event
             if view.onclick_listener:
-                widget.bind(on_press=lambda btn: view.on_click())
+                widget.bind(on_press=lambda btn: self._dispatch_click(view))
                 
         elif view_data["type"] == "EditText":
             widget = TextInput(
@@ -105,6 +138,8 @@ class KivyRenderer:
                 foreground_color=self.hex_to_rgba(view_data["text_color"]),
                 background_color=self.hex_to_rgba(view_data["background_color"])
             )
+            # Keep the model in sync so the next diff sees the typed text
+            widget.bind(text=lambda instance, value: view.set_text(value))
         
         if widget:
             self.widget_map[view.view_id] = widget
@@ -140,7 +175,7 @@ class KivyRenderer:
                         layout_data["padding"]["top"],
                         layout_data["padding"]["right"], 
                         layout_data["padding"]["bottom"]],
-                spacing=10
+                spacing=layout.spacing
             )
             
             # Render child views
@@ -150,19 +185,164 @@ class KivyRenderer:
                 else:  # It's a view
                     child_widget = self.render_view(child, kivy_layout)
         
-        elif layout_data["type"] == "RelativeLayout":
-            kivy_layout = BoxLayout(orientation='vertical')  # Simplified
+        elif layout_data["type"] == "RecyclerView":
+            # Only the bound items are children, so this stays viewport-sized
+            kivy_layout = BoxLayout(orientation='vertical')
+            for child in layout.children:
+                self.render_view(child, kivy_layout)
+        
+        elif layout_data["type"] in ("RelativeLayout", "ConstraintLayout"):
+            # Children already carry solved positions, so place them absolutely
+            height = layout_data["size"]["height"]
+            kivy_layout = FloatLayout(
+                size_hint=(None, None),
+                size=(layout_data["size"]["width"], height)
+            )
             for child in layout.children:
                 if hasattr(child, 'children'):
                     child_widget = self.render_layout(child, kivy_layout)
                 else:
                     child_widget = self.render_view(child, kivy_layout)
+                if child_widget is not None:
+                    # Kivy's y axis points up, PyAndroid's points down
+                    child_widget.pos = (child.x, height - child.y - child_widget.height)
         
-        if kivy_layout and parent_widget:
-            parent_widget.add_widget(kivy_layout)
+        if kivy_layout:
+            self.widget_map[layout.layout_id] = kivy_layout
+            if parent_widget:
+                parent_widget.add_widget(kivy_layout)
             
         return kivy_layout
     
+    def build_render_tree(self, activity) -> Dict[str, Any]:
+        """Render an activity's top-level views into a single tree.
+        
+        Args:
+            activity: PyAndroid Activity to render
+            
+        Returns:
+            Render tree rooted at the activity
+        """
+        return {
+            "type": "Activity",
+            "id": activity.name,
+            "children": [view.render() for view in activity.views.values()]
+        }
+    
+    def refresh(self) -> List[PatchOp]:
+        """Bring the Kivy widgets up to date with the current activity.
+        
+        The activity is re-rendered (reusing cached subtrees), diffed
+        against the previous render and only the resulting patches are
+        applied to the existing widgets.
+        
+        Returns:
+            Applied patch operations
+        """
+        if self.activity is None:
+            return []
+        tree = self.build_render_tree(self.activity)
+        patches = diff_trees(self.render_tree, tree)
+        self.apply_patches(patches)
+        self.render_tree = tree
+        return patches
+    
+    def apply_patches(self, patches: List[PatchOp]):
+        """Apply patch operations to the widgets in widget_map.
+        
+        Args:
+            patches: Operations produced by pyandroid.diff.diff_trees()
+        """
+        for patch in patches:
+            if patch.op == SET:
+                widget = self.widget_map.get(patch.id)
+                if widget is not None:
+                    self._set_property(widget, patch.key, patch.value)
+            elif patch.op == REMOVE:
+                widget = self.widget_map.get(patch.id)
+                if widget is not None and widget.parent is not None:
+                    widget.parent.remove_widget(widget)
+                self._forget(patch.value)
+            elif patch.op == INSERT:
+                parent = self.widget_map.get(patch.parent_id)
+                widget = self._create_widget(patch.id)
+                if parent is not None and widget is not None:
+                    parent.add_widget(widget, index=len(parent.children) - patch.index)
+                    self._place(widget, parent, patch.value)
+            elif patch.op == MOVE:
+                parent = self.widget_map.get(patch.parent_id)
+                widget = self.widget_map.get(patch.id)
+                if parent is not None and widget is not None:
+                    parent.remove_widget(widget)
+                    parent.add_widget(widget, index=len(parent.children) - patch.index)
+        self.logger.debug(f"Applied {len(patches)} patches")
+    
+    def _create_widget(self, view_id: str):
+        """Build a new widget subtree for an inserted view or layout."""
+        view = self.activity.get_view(view_id) if self.activity else None
+        if view is None:
+            self.logger.warning(f"Cannot insert unknown view '{view_id}'")
+            return None
+        if hasattr(view, 'children'):
+            return self.render_layout(view)
+        return self.render_view(view)
+    
+    def _forget(self, node: Dict[str, Any]):
+        """Drop a removed subtree from widget_map."""
+        self.widget_map.pop(node["id"], None)
+        for child in node.get("children", ()):
+            self._forget(child)
+    
+    def _place(self, widget, parent, node: Dict[str, Any]):
+        """Position a widget absolutely when its parent is a FloatLayout."""
+        if isinstance(parent, FloatLayout) and "position" in node:
+            position = node["position"]
+            widget.pos = (position["x"], parent.height - position["y"] - widget.height)
+    
+    def _set_property(self, widget, key: str, value):
+        """Apply a single changed render property to a widget."""
+        if key == "text":
+            if widget.text != value:
+                widget.text = value
+        elif key == "hint":
+            widget.hint_text = value
+        elif key == "text_color":
+            if isinstance(widget, TextInput):
+                widget.foreground_color = self.hex_to_rgba(value)
+            else:
+                widget.color = self.hex_to_rgba(value)
+        elif key == "hint_color":
+            widget.hint_text_color = self.hex_to_rgba(value)
+        elif key == "text_size":
+            widget.font_size = value
+        elif key == "background_color":
+            if hasattr(widget, 'bg_color'):
+                widget.bg_color.rgba = self.hex_to_rgba(value)
+            else:
+                widget.background_color = self.hex_to_rgba(value)
+        elif key == "size":
+            if widget.size_hint == (None, None):
+                widget.size = (value["width"] or widget.width, value["height"] or widget.height)
+        elif key == "position":
+            if widget.parent is not None:
+                self._place(widget, widget.parent, {"position": value})
+        elif key == "visible":
+            widget.opacity = 1 if value else 0
+        elif key == "enabled":
+            widget.disabled = not value
+        elif key == "padding":
+            widget.padding = [value["left"], value["top"], value["right"], value["bottom"]]
+    
+    def _pump_looper(self, dt):
+        """Run due looper messages, then patch whatever they changed."""
+        if self.android_app.looper.run_pending():
+            self.refresh()
+    
+    def _dispatch_click(self, view):
+        """Run a click listener, then patch whatever it changed."""
+        view.on_click()
+        self.refresh()
+    
     def create_app(self, activity):
         """Create Kivy App from PyAndroid Activity.
         
@@ -182,6 +362,8 @@ class KivyRenderer:
                 
                 # Create main layout
                 root = BoxLayout(orientation='vertical')
+                renderer.activity = activity
+                renderer.widget_map[activity.name] = root
                 
                 # Render all views from activity
                 for view_id, view in activity.views.items():
@@ -189,6 +371,10 @@ class KivyRenderer:
                         renderer.render_layout(view, root)
                     else:  # It's a view
                         renderer.render_view(view, root)
+                renderer.render_tree = renderer.build_render_tree(activity)
+                
+                # Run messages posted to the main looper once per frame
+                Clock.schedule_interval(renderer._pump_looper, 0)
                 
                 return root
         
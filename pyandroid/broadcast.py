@@ -0,0 +1,335 @@
+"""Broadcasting Intents to registered receivers.
+
+Receivers register for actions and are kept in per-action lists sorted by
+priority, so sending a broadcast only looks at the receivers of its action.
+Broadcasts are delivered on the main looper: everything sent before the
+looper gets to it is delivered by a single message, and receivers
+registered with ``batch=True`` get all the matching intents of that tick in
+one call instead of one call per intent.
+
+Example:
+    >>> bus = BroadcastBus(app.handler)
+    >>> bus.register(on_battery, IntentFilter(actions=["BATTERY_CHANGED"]))
+    >>> bus.send_sticky(Intent("BATTERY_CHANGED"))
+    >>> app.looper.run_until_idle()
+"""
+
+import bisect
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .looper import Handler
+
+
+class BroadcastResult:
+    """Result passed along the receivers of an ordered broadcast."""
+
+    __slots__ = ("intent", "code", "data", "extras", "aborted")
+
+    def __init__(self, intent: Any, code: int = 0, data: Any = None) -> None:
+        """Initialize result.
+
+        Args:
+            intent: Intent being broadcast
+            code: Initial result code
+            data: Initial result data
+        """
+        self.intent = intent
+        self.code = code
+        self.data = data
+        self.extras: Dict[str, Any] = {}
+        self.aborted = False
+
+
+class BroadcastReceiver:
+    """Base class for broadcast receivers.
+
+    Plain callables taking an intent (or a list of intents, for batch
+    registrations) can be registered too.
+
+    Example:
+        >>> class SyncReceiver(BroadcastReceiver):
+        ...     def on_receive(self, intent):
+        ...         print("synced", intent.get_extra("count"))
+        >>> app.register_receiver(SyncReceiver(), "SYNC_FINISHED")
+    """
+
+    # Set while the receiver handles an ordered broadcast
+    _result: Optional[BroadcastResult] = None
+
+    def on_receive(self, intent: Any) -> None:
+        """Handle a broadcast. Override in subclasses.
+
+        Args:
+            intent: Broadcast intent
+        """
+        pass
+
+    def on_receive_batch(self, intents: List[Any]) -> None:
+        """Handle the intents coalesced for a batch registration.
+
+        Calls on_receive() for each intent by default.
+
+        Args:
+            intents: Matching intents sent since the last delivery, oldest first
+        """
+        for intent in intents:
+            self.on_receive(intent)
+
+    def is_ordered_broadcast(self) -> bool:
+        """Check whether the broadcast being handled is ordered."""
+        return self._result is not None
+
+    @property
+    def result(self) -> BroadcastResult:
+        """Result of the ordered broadcast being handled.
+
+        Raises:
+            RuntimeError: If no ordered broadcast is being handled
+        """
+        if self._result is None:
+            raise RuntimeError("Not handling an ordered broadcast")
+        return self._result
+
+    def abort_broadcast(self) -> None:
+        """Stop an ordered broadcast from reaching lower-priority receivers.
+
+        Raises:
+            RuntimeError: If no ordered broadcast is being handled
+        """
+        self.result.aborted = True
+
+
+class _Registration:
+    """A receiver registered for one intent filter."""
+
+    __slots__ = ("receiver", "intent_filter", "batch", "key", "active")
+
+    def __init__(self, receiver: Any, intent_filter: Any, batch: bool,
+                 key: Tuple[int, int]) -> None:
+        self.receiver = receiver
+        self.intent_filter = intent_filter
+        self.batch = batch
+        # (-priority, registration order), the delivery order
+        self.key = key
+        self.active = True
+
+    def deliver(self, intent: Any) -> None:
+        if isinstance(self.receiver, BroadcastReceiver):
+            self.receiver.on_receive(intent)
+        else:
+            self.receiver(intent)
+
+    def deliver_batch(self, intents: List[Any]) -> None:
+        if isinstance(self.receiver, BroadcastReceiver):
+            self.receiver.on_receive_batch(intents)
+        else:
+            self.receiver(intents)
+
+
+class BroadcastBus:
+    """Delivers broadcast intents to receivers on a handler's looper.
+
+    Receivers are registered and unregistered on the looper thread;
+    broadcasts may be sent from any thread.
+    """
+
+    def __init__(self, handler: Handler) -> None:
+        """Initialize broadcast bus.
+
+        Args:
+            handler: Handler whose looper delivers broadcasts
+        """
+        self.handler = handler
+        self.logger = logging.getLogger("PyAndroid.Broadcast")
+        # Entries (-priority, registration order, registration) by action
+        self._index: Dict[str, List[tuple]] = {}
+        self._registrations: Dict[Any, List[_Registration]] = {}
+        self._sequence = itertools.count()
+        self._sticky: Dict[str, Any] = {}
+        # (intent, target registration or None, ordered result or None, result callback)
+        self._pending: List[tuple] = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def register(self, receiver: Any, intent_filter: Any, priority: int = 0,
+                 batch: bool = False) -> Optional[Any]:
+        """Register a receiver for the intents matching a filter.
+
+        A matching sticky broadcast is delivered to the new receiver on the
+        next loop tick.
+
+        Args:
+            receiver: BroadcastReceiver or callable; None only looks up the
+                sticky broadcast
+            intent_filter: IntentFilter with the actions to receive
+            priority: Receivers with higher priority are called first
+            batch: Deliver the intents of each tick in one call; the receiver
+                always gets a list, of one intent for an ordered broadcast
+
+        Returns:
+            The matching sticky intent, if any
+        """
+        with self._lock:
+            sticky = [self._sticky[action] for action in intent_filter.actions
+                      if action in self._sticky]
+        sticky = [intent for intent in sticky if intent_filter.matches(intent)]
+        if receiver is None:
+            return sticky[0] if sticky else None
+        registration = _Registration(receiver, intent_filter, batch,
+                                     (-priority, next(self._sequence)))
+        entry = registration.key + (registration,)
+        for action in intent_filter.actions:
+            bisect.insort(self._index.setdefault(action, []), entry)
+        self._registrations.setdefault(receiver, []).append(registration)
+        for intent in sticky:
+            self._enqueue((intent, registration, None, None))
+        return sticky[0] if sticky else None
+
+    def unregister(self, receiver: Any) -> bool:
+        """Unregister every registration of a receiver.
+
+        Args:
+            receiver: Registered receiver
+
+        Returns:
+            True if the receiver was registered, False otherwise
+        """
+        registrations = self._registrations.pop(receiver, None)
+        if not registrations:
+            return False
+        for registration in registrations:
+            registration.active = False
+            for action in registration.intent_filter.actions:
+                entries = self._index[action]
+                entries.remove(registration.key + (registration,))
+                if not entries:
+                    del self._index[action]
+        return True
+
+    def send(self, intent: Any) -> None:
+        """Broadcast an intent to all matching receivers.
+
+        Args:
+            intent: Intent to broadcast
+        """
+        self._enqueue((intent, None, None, None))
+
+    def send_ordered(self, intent: Any,
+                     result_callback: Optional[Callable[[BroadcastResult], Any]] = None,
+                     initial_code: int = 0, initial_data: Any = None) -> None:
+        """Broadcast an intent to matching receivers one at a time.
+
+        Receivers are called in priority order, including batch
+        registrations, which get a list holding just this intent; each can
+        change the result or abort the broadcast.
+
+        Args:
+            intent: Intent to broadcast
+            result_callback: Called with the final result
+            initial_code: Initial result code
+            initial_data: Initial result data
+        """
+        result = BroadcastResult(intent, initial_code, initial_data)
+        self._enqueue((intent, None, result, result_callback))
+
+    def send_sticky(self, intent: Any) -> None:
+        """Broadcast an intent and keep it for receivers registered later.
+
+        Replaces the previous sticky intent with the same action.
+
+        Args:
+            intent: Intent to broadcast
+        """
+        with self._lock:
+            self._sticky[intent.action] = intent
+        self.send(intent)
+
+    def remove_sticky(self, action: str) -> bool:
+        """Forget the sticky intent of an action.
+
+        Args:
+            action: Intent action
+
+        Returns:
+            True if a sticky intent was removed, False otherwise
+        """
+        with self._lock:
+            return self._sticky.pop(action, None) is not None
+
+    def _enqueue(self, item: tuple) -> None:
+        """Queue a delivery, posting the drain unless one is already queued."""
+        with self._lock:
+            self._pending.append(item)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.handler.post(self._drain)
+
+    def _drain(self) -> None:
+        """Deliver everything queued since the last tick."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+        # Receivers by intent shape, so a burst of similar intents is matched once
+        matches: Dict[tuple, List[_Registration]] = {}
+        batches: Dict[_Registration, List[Any]] = {}
+        for intent, target, result, result_callback in pending:
+            if target is not None:
+                receivers = [target]
+            else:
+                shape = (intent.action, frozenset(intent.categories), intent.data,
+                         intent.mime_type)
+                receivers = matches.get(shape)
+                if receivers is None:
+                    receivers = matches[shape] = [
+                        entry[2] for entry in self._index.get(intent.action, ())
+                        if entry[2].intent_filter.matches(intent)
+                    ]
+            if result is not None:
+                self._deliver_ordered(receivers, result, result_callback)
+                continue
+            for registration in receivers:
+                if not registration.active:
+                    continue
+                if registration.batch:
+                    batches.setdefault(registration, []).append(intent)
+                else:
+                    self._call(registration.deliver, intent)
+        for registration in sorted(batches, key=lambda item: item.key):
+            if registration.active:
+                self._call(registration.deliver_batch, batches[registration])
+
+    def _deliver_ordered(self, receivers: List[_Registration], result: BroadcastResult,
+                         result_callback: Optional[Callable[[BroadcastResult], Any]]) -> None:
+        """Pass an ordered broadcast down the receivers until one aborts it."""
+        for registration in receivers:
+            if not registration.active:
+                continue
+            receiver = registration.receiver
+            # Batch registrations keep their signature: a list, here of one intent
+            if registration.batch:
+                deliver, argument = registration.deliver_batch, [result.intent]
+            else:
+                deliver, argument = registration.deliver, result.intent
+            if isinstance(receiver, BroadcastReceiver):
+                receiver._result = result
+                try:
+                    self._call(deliver, argument)
+                finally:
+                    del receiver._result
+            else:
+                self._call(deliver, argument)
+            if result.aborted:
+                break
+        if result_callback is not None:
+            self._call(result_callback, result)
+
+    def _call(self, callback: Callable[[Any], Any], argument: Any) -> None:
+        """Call a receiver, logging its errors so other receivers still run."""
+        try:
+            callback(argument)
+        except Exception:
+            self.logger.exception(f"Error in broadcast receiver {callback!r}")
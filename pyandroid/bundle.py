@@ -0,0 +1,484 @@
+"""Bundles of typed values with a compact binary encoding.
+
+A Bundle maps string keys to None, bool, int, float, str, bytes, numeric
+array.array values, lists and nested bundles. It is used for saved instance
+state and Intent extras and can be converted to and from bytes with
+to_bytes()/from_bytes().
+
+A Parcel is a Bundle read from bytes lazily: opening one only indexes where
+each entry starts, an entry is decoded the first time it is read, and bytes
+and arrays are returned as memoryviews of the buffer instead of copies.
+Encoding an unmodified Parcel copies its buffer as is.
+
+Encoding: a bundle is a little-endian uint32 entry count followed by its
+entries. Each entry is a length-prefixed UTF-8 key and a value; a value is
+a one-byte type tag followed by its payload (fixed-size numbers,
+length-prefixed strings, bytes and arrays, counted lists and nested
+bundles). An array payload is its typecode, then its items as
+little-endian raw bytes.
+"""
+
+import array
+import struct
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+_UINT32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_BIG_INT = 4
+_FLOAT = 5
+_STR = 6
+_BYTES = 7
+_LIST = 8
+_BUNDLE = 9
+_ARRAY = 10
+
+_FIXED_SIZES = {_NONE: 0, _FALSE: 0, _TRUE: 0, _INT: 8, _FLOAT: 8}
+# Array typecodes by item size, so "l"/"L" arrays decode on every platform
+_INT_CODES = {(code.islower(), array.array(code).itemsize): code for code in "bBhHiIqQ"}
+_ARRAY_CODES = "bBhHiIqQfd"
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+class Bundle(MutableMapping):
+    """A mapping of string keys to simple values that can be serialized.
+
+    Example:
+        >>> state = Bundle()
+        >>> state["counter"] = 3
+        >>> state.put("query", "pizza")
+        >>> Bundle.from_bytes(state.to_bytes())["counter"]
+        3
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize bundle.
+
+        Args:
+            values: Optional initial entries
+        """
+        self._values: Dict[str, Any] = {}
+        if values:
+            self.update(values)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not isinstance(key, str):
+            raise TypeError(f"Bundle keys must be strings, not {type(key).__name__}")
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"Bundle({self._values!r})"
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value.
+
+        Args:
+            key: Entry key
+            value: None, bool, int, float, str, bytes, array.array, list or
+                Bundle/dict
+        """
+        self[key] = value
+
+    def copy(self) -> "Bundle":
+        """Return a shallow copy."""
+        return Bundle(self._values)
+
+    def to_bytes(self) -> bytes:
+        """Encode the bundle.
+
+        Returns:
+            Binary representation
+
+        Raises:
+            TypeError: If a value has an unsupported type
+        """
+        out = bytearray()
+        _write_bundle(out, self)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Bundle":
+        """Decode a bundle produced by to_bytes().
+
+        Args:
+            data: Binary representation
+
+        Returns:
+            Decoded bundle
+
+        Raises:
+            ValueError: If the data is truncated or malformed
+        """
+        bundle, offset = read_bundle(memoryview(data), 0)
+        if offset != len(data):
+            raise ValueError("Trailing data after bundle")
+        return bundle
+
+
+class _Encoded:
+    """Location of a Parcel entry that has not been decoded yet."""
+
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+
+
+class Parcel(Bundle):
+    """A Bundle decoded lazily from a read-only buffer.
+
+    Bytes entries are returned as read-only memoryviews and arrays as
+    memoryviews cast to their typecode, both sharing the parcel's buffer.
+    Nested bundles are Parcels over the same buffer. The buffer must not be
+    modified while the parcel or values read from it are in use.
+
+    Example:
+        >>> parcel = Parcel.from_bytes(intent_bytes)
+        >>> pixels = parcel["pixels"]    # decodes this entry only, no copy
+    """
+
+    __slots__ = ("_data", "_raw")
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize an empty or prefilled parcel.
+
+        Args:
+            values: Optional initial entries
+        """
+        self._data: Optional[memoryview] = None
+        # Encoding of this parcel while it still matches its buffer
+        self._raw: Optional[memoryview] = None
+        super().__init__(values)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if type(value) is _Encoded:
+            return self._decode(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._raw = None
+
+    def __delitem__(self, key: str) -> None:
+        del self._values[key]
+        self._raw = None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __repr__(self) -> str:
+        return f"Parcel(keys={list(self._values)!r})"
+
+    def copy(self) -> "Parcel":
+        """Return a shallow copy sharing the buffer and the undecoded entries."""
+        parcel = Parcel()
+        parcel._values = dict(self._values)
+        parcel._data = self._data
+        parcel._raw = self._raw
+        return parcel
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> "Parcel":
+        """Open an encoded bundle without decoding its values.
+
+        Args:
+            data: Binary representation from Bundle.to_bytes()
+
+        Returns:
+            Parcel reading from data
+
+        Raises:
+            ValueError: If the data is truncated or malformed
+        """
+        view = memoryview(data).cast("B")
+        if not view.readonly:
+            view = view.toreadonly()
+        parcel, offset = read_parcel(view, 0)
+        if offset != len(view):
+            raise ValueError("Trailing data after bundle")
+        return parcel
+
+    def _decode(self, key: str, entry: _Encoded) -> Any:
+        """Decode one entry, sharing the buffer for bytes, arrays and bundles.
+
+        Decoded values replace the entry, except views of bytes and arrays,
+        which are cheap to recreate and keep the entry copyable as is.
+        """
+        data = self._data
+        tag = data[entry.start]
+        if tag == _BYTES:
+            return data[entry.start + 5:entry.end]
+        if tag == _ARRAY and _LITTLE_ENDIAN:
+            return data[entry.start + 6:entry.end].cast(chr(data[entry.start + 1]))
+        if tag in (_BUNDLE, _LIST):
+            # Mutable values may change behind our back; re-encode from now on
+            self._raw = None
+        if tag == _BUNDLE:
+            value = read_parcel(data, entry.start + 1)[0]
+        else:
+            value = read_value(data, entry.start)[0]
+        self._values[key] = value
+        return value
+
+    def _write(self, out: bytearray) -> None:
+        """Append the encoding, copying undecoded entries from the buffer."""
+        if self._raw is not None:
+            out += self._raw
+            return
+        out += _UINT32.pack(len(self._values))
+        for key, value in self._values.items():
+            write_str(out, key)
+            if type(value) is _Encoded:
+                out += self._data[value.start:value.end]
+            else:
+                write_value(out, value)
+
+
+def read_parcel(data: memoryview, offset: int) -> Tuple[Parcel, int]:
+    """Index an encoded bundle as a Parcel, returning it and the next offset.
+
+    Raises:
+        ValueError: If the data is truncated or malformed
+    """
+    start = offset
+    parcel = Parcel()
+    values = parcel._values
+    try:
+        count, = _UINT32.unpack_from(data, offset)
+        offset += 4
+        for _ in range(count):
+            key, offset = read_str(data, offset)
+            end = skip_value(data, offset)
+            values[key] = _Encoded(offset, end)
+            offset = end
+    except struct.error as e:
+        raise ValueError(f"Truncated bundle data: {e}") from e
+    parcel._data = data
+    parcel._raw = data[start:offset]
+    return parcel, offset
+
+
+def write_str(out: bytearray, text: str) -> None:
+    """Append a length-prefixed UTF-8 string."""
+    encoded = text.encode("utf-8")
+    out += _UINT32.pack(len(encoded))
+    out += encoded
+
+
+def read_str(data: memoryview, offset: int) -> Tuple[str, int]:
+    """Read a length-prefixed UTF-8 string, returning it and the next offset."""
+    length, = _UINT32.unpack_from(data, offset)
+    offset += 4
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Truncated string")
+    return str(data[offset:end], "utf-8"), end
+
+
+def write_value(out: bytearray, value: Any) -> None:
+    """Append a tagged value.
+
+    Raises:
+        TypeError: If the value has an unsupported type
+    """
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out.append(_INT)
+            out += _INT64.pack(value)
+        else:
+            encoded = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+            out.append(_BIG_INT)
+            out += _UINT32.pack(len(encoded))
+            out += encoded
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _FLOAT64.pack(value)
+    elif isinstance(value, str):
+        out.append(_STR)
+        write_str(out, value)
+    elif isinstance(value, (bytes, bytearray)) or (
+            isinstance(value, memoryview) and value.format in ("B", "b", "c")):
+        out.append(_BYTES)
+        out += _UINT32.pack(len(value) if not isinstance(value, memoryview) else value.nbytes)
+        out += value
+    elif isinstance(value, (array.array, memoryview)):
+        # Arrays, and memoryviews of numbers such as arrays read from a Parcel
+        code = value.typecode if isinstance(value, array.array) else value.format.lstrip("@=<")
+        if code in "lLiI":
+            code = _INT_CODES[(code.islower(), value.itemsize)]
+        if len(code) != 1 or code not in _ARRAY_CODES:
+            raise TypeError(f"Cannot store array of typecode {code!r} in a Bundle")
+        if not _LITTLE_ENDIAN:
+            value = array.array(code, value)
+            value.byteswap()
+        out.append(_ARRAY)
+        out.append(ord(code))
+        out += _UINT32.pack(len(value) * value.itemsize)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        out += _UINT32.pack(len(value))
+        for item in value:
+            write_value(out, item)
+    elif isinstance(value, (Bundle, dict)):
+        out.append(_BUNDLE)
+        _write_bundle(out, value)
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} in a Bundle")
+
+
+def read_value(data: memoryview, offset: int) -> Tuple[Any, int]:
+    """Read a tagged value, returning it and the next offset.
+
+    Raises:
+        ValueError: If the data is truncated or malformed
+    """
+    try:
+        tag = data[offset]
+        offset += 1
+        if tag == _NONE:
+            return None, offset
+        if tag == _TRUE:
+            return True, offset
+        if tag == _FALSE:
+            return False, offset
+        if tag == _INT:
+            return _INT64.unpack_from(data, offset)[0], offset + 8
+        if tag == _FLOAT:
+            return _FLOAT64.unpack_from(data, offset)[0], offset + 8
+        if tag == _STR:
+            return read_str(data, offset)
+        if tag in (_BYTES, _BIG_INT):
+            length, = _UINT32.unpack_from(data, offset)
+            offset += 4
+            end = offset + length
+            if end > len(data):
+                raise ValueError("Truncated bytes")
+            if tag == _BYTES:
+                return bytes(data[offset:end]), end
+            return int.from_bytes(data[offset:end], "little", signed=True), end
+        if tag == _ARRAY:
+            code = chr(data[offset])
+            length, = _UINT32.unpack_from(data, offset + 1)
+            offset += 5
+            end = offset + length
+            if end > len(data) or code not in _ARRAY_CODES:
+                raise ValueError("Malformed array")
+            items = array.array(code)
+            items.frombytes(data[offset:end])
+            if not _LITTLE_ENDIAN:
+                items.byteswap()
+            return items, end
+        if tag == _LIST:
+            count, = _UINT32.unpack_from(data, offset)
+            offset += 4
+            items: List[Any] = []
+            for _ in range(count):
+                item, offset = read_value(data, offset)
+                items.append(item)
+            return items, offset
+        if tag == _BUNDLE:
+            return read_bundle(data, offset)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated bundle data: {e}") from e
+    raise ValueError(f"Unknown value tag {tag}")
+
+
+def read_bundle(data: memoryview, offset: int) -> Tuple[Bundle, int]:
+    """Read an encoded bundle, returning it and the next offset.
+
+    Raises:
+        ValueError: If the data is truncated or malformed
+    """
+    try:
+        count, = _UINT32.unpack_from(data, offset)
+    except struct.error as e:
+        raise ValueError(f"Truncated bundle data: {e}") from e
+    offset += 4
+    bundle = Bundle()
+    values = bundle._values
+    for _ in range(count):
+        key, offset = read_str(data, offset)
+        values[key], offset = read_value(data, offset)
+    return bundle, offset
+
+
+def skip_value(data: memoryview, offset: int) -> int:
+    """Return the offset after a tagged value without decoding it.
+
+    Raises:
+        ValueError: If the data is truncated or malformed
+    """
+    try:
+        tag = data[offset]
+        offset += 1
+        size = _FIXED_SIZES.get(tag)
+        if size is not None:
+            end = offset + size
+        elif tag in (_STR, _BYTES, _BIG_INT):
+            end = offset + 4 + _UINT32.unpack_from(data, offset)[0]
+        elif tag == _ARRAY:
+            end = offset + 5 + _UINT32.unpack_from(data, offset + 1)[0]
+        elif tag == _LIST:
+            count, = _UINT32.unpack_from(data, offset)
+            end = offset + 4
+            for _ in range(count):
+                end = skip_value(data, end)
+        elif tag == _BUNDLE:
+            count, = _UINT32.unpack_from(data, offset)
+            end = offset + 4
+            for _ in range(count):
+                key_end = end + 4 + _UINT32.unpack_from(data, end)[0]
+                end = skip_value(data, key_end)
+        else:
+            raise ValueError(f"Unknown value tag {tag}")
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated bundle data: {e}") from e
+    if end > len(data):
+        raise ValueError("Truncated bundle data")
+    return end
+
+
+def _write_bundle(out: bytearray, bundle: Any) -> None:
+    """Append an encoded bundle or dict."""
+    if isinstance(bundle, Parcel):
+        bundle._write(out)
+        return
+    out += _UINT32.pack(len(bundle))
+    for key, value in bundle.items():
+        if not isinstance(key, str):
+            raise TypeError(f"Bundle keys must be strings, not {type(key).__name__}")
+        write_str(out, key)
+        write_value(out, value)
@@ -0,0 +1,249 @@
+"""Incremental linear constraint solver for PyAndroid layouts.
+
+Layout constraints such as "left of", "below" or a biased chain are linear
+equations of the form ``output = constant + sum(coefficient * input)``.
+Each variable is written by at most one constraint, so the system forms a
+dependency graph that is solved by evaluating constraints in topological
+order. The solver is incremental: changing an input value or replacing a
+constraint only re-evaluates the constraints downstream of the change.
+"""
+
+import heapq
+from typing import Dict, List, Optional
+
+from .core import ConstraintError
+
+
+class Variable:
+    """A solver variable holding a single value.
+
+    A variable is either written by one constraint or is an edit variable
+    whose value is supplied with ConstraintSolver.suggest_value().
+    """
+
+    __slots__ = ("name", "value", "_writer", "_readers")
+
+    def __init__(self, name: str, value: float = 0.0) -> None:
+        """Initialize variable.
+
+        Args:
+            name: Variable name, unique within its solver
+            value: Initial value
+        """
+        self.name = name
+        self.value = value
+        self._writer: Optional["LinearConstraint"] = None
+        self._readers: List["LinearConstraint"] = []
+
+    def __repr__(self) -> str:
+        return f"Variable({self.name!r}, {self.value!r})"
+
+
+class LinearConstraint:
+    """Constraint ``output = constant + sum(coefficient * variable)``."""
+
+    __slots__ = ("output", "terms", "constant", "_rank")
+
+    def __init__(self, output: Variable, terms: Dict[Variable, float],
+                 constant: float = 0.0) -> None:
+        """Initialize constraint.
+
+        Args:
+            output: Variable written by this constraint
+            terms: Mapping of input variable to coefficient
+            constant: Constant term
+        """
+        self.output = output
+        self.terms = [(coefficient, variable) for variable, coefficient in terms.items()
+                      if coefficient]
+        self.constant = constant
+        self._rank = 0
+
+    def evaluate(self) -> float:
+        """Compute the output value from the current input values."""
+        value = self.constant
+        for coefficient, variable in self.terms:
+            value += coefficient * variable.value
+        return value
+
+
+class ConstraintSolver:
+    """Incremental solver for acyclic systems of linear constraints.
+
+    Every constraint has a rank greater than the ranks of the constraints
+    writing its inputs. Ranks are maintained incrementally when constraints
+    are added, and solve() re-evaluates only the constraints affected since
+    the previous solve, in rank order, so each is evaluated at most once.
+
+    Example:
+        >>> solver = ConstraintSolver()
+        >>> left = solver.variable("left")
+        >>> right = solver.variable("right")
+        >>> constraint = solver.add_constraint(right, {left: 1.0}, 100.0)
+        >>> solver.suggest_value(left, 20)
+        >>> solver.solve()
+        >>> right.value
+        120.0
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty solver."""
+        self._variables: Dict[str, Variable] = {}
+        self._pending: Dict[LinearConstraint, None] = {}
+
+    def variable(self, name: str, value: float = 0.0) -> Variable:
+        """Get a variable by name, creating it if needed.
+
+        Args:
+            name: Variable name
+            value: Initial value for a new variable
+
+        Returns:
+            Variable instance
+        """
+        variable = self._variables.get(name)
+        if variable is None:
+            variable = self._variables[name] = Variable(name, value)
+        return variable
+
+    def has_variable(self, name: str) -> bool:
+        """Check whether a variable exists.
+
+        Args:
+            name: Variable name
+
+        Returns:
+            True if the variable exists, False otherwise
+        """
+        return name in self._variables
+
+    def remove_variable(self, name: str) -> None:
+        """Remove a variable that is no longer read by any constraint.
+
+        Its writer constraint, if any, is removed as well.
+
+        Args:
+            name: Variable name
+
+        Raises:
+            ConstraintError: If a constraint still reads the variable
+        """
+        variable = self._variables.get(name)
+        if variable is None:
+            return
+        if variable._readers:
+            raise ConstraintError(f"Variable '{name}' is still used by other constraints")
+        if variable._writer is not None:
+            self.remove_constraint(variable._writer)
+        del self._variables[name]
+
+    def add_constraint(self, output: Variable, terms: Dict[Variable, float],
+                       constant: float = 0.0) -> LinearConstraint:
+        """Add a constraint defining output.
+
+        Args:
+            output: Variable to define
+            terms: Mapping of input variable to coefficient
+            constant: Constant term
+
+        Returns:
+            The new constraint
+
+        Raises:
+            ConstraintError: If output already has a constraint or the
+                constraint would create a cycle
+        """
+        if output._writer is not None:
+            raise ConstraintError(f"Variable '{output.name}' is already constrained")
+        if output in terms:
+            raise ConstraintError(f"Constraint on '{output.name}' depends on itself")
+        constraint = LinearConstraint(output, terms, constant)
+        constraint._rank = 1 + max(
+            (variable._writer._rank for _, variable in constraint.terms
+             if variable._writer is not None),
+            default=0
+        )
+        self._raise_reader_ranks(constraint)
+        output._writer = constraint
+        for _, variable in constraint.terms:
+            variable._readers.append(constraint)
+        self._pending[constraint] = None
+        return constraint
+
+    def _raise_reader_ranks(self, constraint: LinearConstraint) -> None:
+        """Push downstream ranks above a new constraint, detecting cycles.
+
+        Ranks already increase along every existing edge, so any path that
+        leads back to one of the new constraint's inputs is visited here.
+        """
+        inputs = {variable for _, variable in constraint.terms}
+        raised: List[tuple] = []
+        stack = [constraint]
+        while stack:
+            current = stack.pop()
+            if current is not constraint and current.output in inputs:
+                for other, rank in reversed(raised):
+                    other._rank = rank
+                raise ConstraintError(
+                    f"Constraint on '{constraint.output.name}' would create a cycle"
+                )
+            for reader in current.output._readers:
+                if reader._rank <= current._rank:
+                    raised.append((reader, reader._rank))
+                    reader._rank = current._rank + 1
+                    stack.append(reader)
+
+    def remove_constraint(self, constraint: LinearConstraint) -> None:
+        """Remove a constraint, turning its output into an edit variable.
+
+        Args:
+            constraint: Constraint to remove
+        """
+        if constraint.output._writer is not constraint:
+            return
+        constraint.output._writer = None
+        for _, variable in constraint.terms:
+            variable._readers.remove(constraint)
+        self._pending.pop(constraint, None)
+
+    def suggest_value(self, variable: Variable, value: float) -> None:
+        """Set the value of an edit variable.
+
+        Args:
+            variable: Variable without a writer constraint
+            value: New value
+
+        Raises:
+            ConstraintError: If the variable is defined by a constraint
+        """
+        if variable._writer is not None:
+            raise ConstraintError(f"Variable '{variable.name}' is defined by a constraint")
+        if variable.value != value:
+            variable.value = value
+            for reader in variable._readers:
+                self._pending[reader] = None
+
+    def solve(self) -> List[Variable]:
+        """Re-evaluate the constraints affected by changes since the last solve.
+
+        Returns:
+            Variables whose value changed
+        """
+        changed: List[Variable] = []
+        heap = [(constraint._rank, id(constraint), constraint) for constraint in self._pending]
+        queued = set(self._pending)
+        self._pending.clear()
+        heapq.heapify(heap)
+        while heap:
+            _, _, constraint = heapq.heappop(heap)
+            value = constraint.evaluate()
+            output = constraint.output
+            if value == output.value:
+                continue
+            output.value = value
+            changed.append(output)
+            for reader in output._readers:
+                if reader not in queued:
+                    queued.add(reader)
+                    heapq.heappush(heap, (reader._rank, id(reader), reader))
+        return changed
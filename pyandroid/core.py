@@ -4,8 +4,31 @@ This module provides the fundamental classes for building Android applications
 with Python, including App, Activity, and Intent management.
 """
 
+import bisect
 import logging
-from typing import Dict, Any, Optional, Callable, Type
+from typing import Dict, Any, Iterable, List, Optional, Callable, Tuple, Type, Union
+
+from .broadcast import BroadcastBus, BroadcastResult
+from .bundle import Bundle, Parcel
+from .lifecycle import (
+    REPLAY, STATE_CODES, STATE_NAMES, LifecycleObserver, State, build_listeners,
+    observed_callbacks, transition_masks,
+)
+from .looper import Handler, Looper
+from .spatial import SpatialIndex
+
+_CREATED, _STARTED, _RESUMED, _PAUSED, _STOPPED, _DESTROYED = map(int, State)
+
+# Activity loggers by activity name; logging.getLogger() takes a lock per call
+_ACTIVITY_LOGGERS: Dict[str, logging.Logger] = {}
+
+
+def _activity_logger(name: str) -> logging.Logger:
+    """Return the logger of the activities with a given name."""
+    logger = _ACTIVITY_LOGGERS.get(name)
+    if logger is None:
+        logger = _ACTIVITY_LOGGERS[name] = logging.getLogger(f"PyAndroid.Activity.{name}")
+    return logger
 
 
 class PyAndroidError(Exception):
@@ -18,11 +41,44 @@ class ActivityNotFoundError(PyAndroidError):
     pass
 
 
+class ServiceNotFoundError(PyAndroidError):
+    """Raised when attempting to start or bind an unregistered service."""
+    pass
+
+
 class InvalidStateError(PyAndroidError):
     """Raised when an invalid state transition is attempted."""
     pass
 
 
+class DuplicateViewIdError(PyAndroidError):
+    """Raised when a view id is already used elsewhere in the view tree."""
+    pass
+
+
+class ConstraintError(PyAndroidError):
+    """Raised when layout constraints are conflicting or cyclic."""
+    pass
+
+
+class _BackStackEntry:
+    """An activity below the current one on the back stack.
+    
+    A warm entry keeps its stopped activity instance. A cold entry was
+    evicted to save memory: only its saved state is kept, encoded as bytes,
+    and the activity is rebuilt from it when the user navigates back.
+    """
+    
+    __slots__ = ("name", "kwargs", "intent", "activity", "saved_state")
+    
+    def __init__(self, name: str, kwargs: Dict[str, Any], activity: 'Activity') -> None:
+        self.name = name
+        self.kwargs = kwargs
+        self.intent = activity.intent
+        self.activity: Optional['Activity'] = activity
+        self.saved_state: Optional[bytes] = None
+
+
 class AndroidApp:
     """Main Android Application class.
     
@@ -36,81 +92,544 @@ class AndroidApp:
         >>> app.run()
     """
     
-    def __init__(self, app_name: str, package_name: str, use_gui: bool = True) -> None:
+    def __init__(self, app_name: str, package_name: str, use_gui: bool = True,
+                 max_warm_activities: int = 4,
+                 max_warm_views: Optional[int] = None) -> None:
         """Initialize Android application.
         
         Args:
             app_name: Human readable application name
             package_name: Android package name (e.g. com.example.myapp)
             use_gui: Whether to use GUI rendering (requires Kivy)
+            max_warm_activities: Stopped activities kept alive on the back stack
+            max_warm_views: Optional limit on the total number of views held
+                by those activities
         """
         self.app_name = app_name
         self.package_name = package_name
         self.use_gui = use_gui
         self.activities: Dict[str, Type['Activity']] = {}
         self.current_activity: Optional['Activity'] = None
+        self.max_warm_activities = max_warm_activities
+        self.max_warm_views = max_warm_views
+        # Activities below the current one, bottom first
+        self._back_stack: List[_BackStackEntry] = []
+        # Warm entries, least recently used first
+        self._warm: Dict[_BackStackEntry, None] = {}
+        # Optional pyandroid.state.InstanceStateStore persisting saved state
+        self.state_store = None
+        # Intent filters by (action, scheme, host); scheme/host are None for
+        # filters that accept any host or no data. Buckets are kept sorted by
+        # (-priority, registration order).
+        self._filter_index: Dict[tuple, List[tuple]] = {}
+        self._filter_count = 0
         self.logger = logging.getLogger(f"PyAndroid.{app_name}")
         self.renderer = None
+        # Main-thread message loop; post UI work here from any thread
+        self.looper = Looper()
+        self.handler = Handler(self.looper)
+        self.broadcasts = BroadcastBus(self.handler)
+        self._executor = None
+        self.services: Dict[str, Type[Any]] = {}
+        # Created services by name, until they are stopped and unbound
+        self._running_services: Dict[str, Any] = {}
         
         # Initialize renderer if GUI is enabled
         if self.use_gui:
             try:
                 from .backend import KivyRenderer
-                if KivyRenderer is not None:
-                    self.renderer = KivyRenderer(self)
-                    self.logger.info("Kivy renderer initialized")
-                else:
-                    self.logger.warning("Kivy not available. Running in console mode.")
-                    self.use_gui = False
+                self.renderer = KivyRenderer(self)
+                self.logger.info("Kivy renderer initialized")
             except ImportError:
                 self.logger.warning("Kivy not available. Running in console mode.")
                 self.use_gui = False
         
-    def register_activity(self, activity_name: str, activity_class: Type['Activity']) -> None:
+    def register_activity(self, activity_name: str, activity_class: Type['Activity'],
+                          intent_filters: Optional[List['IntentFilter']] = None) -> None:
         """Register an activity with the application.
         
+        Intent filters are indexed by action, data scheme and host when
+        they are registered, so resolving an implicit intent only looks at
+        the filters that can match it.
+        
         Args:
             activity_name: Name identifier for the activity
             activity_class: Activity class to register
+            intent_filters: Implicit intents the activity can handle
             
         Example:
             >>> app.register_activity("main", MainActivity)
+            >>> app.register_activity("viewer", ViewerActivity, intent_filters=[
+            ...     IntentFilter(actions=["ACTION_VIEW"], mime_types=["image/*"])])
         """
+        if activity_name in self.activities:
+            self._unindex_filters(activity_name)
         self.activities[activity_name] = activity_class
+        for intent_filter in intent_filters or ():
+            entry = (-intent_filter.priority, self._filter_count, intent_filter, activity_name)
+            self._filter_count += 1
+            for key in intent_filter._index_keys():
+                # Registration counts are unique, so filters are never compared
+                bisect.insort(self._filter_index.setdefault(key, []), entry)
         self.logger.info(f"Registered activity: {activity_name}")
         
-    def start_activity(self, activity_name: str, **kwargs) -> None:
+    def _unindex_filters(self, activity_name: str) -> None:
+        """Drop the indexed intent filters of a re-registered activity."""
+        for key in list(self._filter_index):
+            bucket = [entry for entry in self._filter_index[key] if entry[3] != activity_name]
+            if bucket:
+                self._filter_index[key] = bucket
+            else:
+                del self._filter_index[key]
+                
+    def query_intent_activities(self, intent: 'Intent') -> List[str]:
+        """Find every activity that can handle an intent.
+        
+        Args:
+            intent: Explicit or implicit intent
+            
+        Returns:
+            Activity names, best match first
+        """
+        if intent.target is not None:
+            return [intent.target] if intent.target in self.activities else []
+        scheme, host, _ = _parse_uri(intent.data)
+        candidates = self._filter_index.get((intent.action, scheme, None), [])
+        if host is not None:
+            candidates = sorted(candidates + self._filter_index.get(
+                (intent.action, scheme, host), []))
+        names: List[str] = []
+        for _, _, intent_filter, name in candidates:
+            if name not in names and intent_filter.matches(intent):
+                names.append(name)
+        return names
+        
+    def resolve_activity(self, intent: 'Intent') -> Optional[str]:
+        """Find the activity that should handle an intent.
+        
+        Args:
+            intent: Explicit or implicit intent
+            
+        Returns:
+            Activity name, or None if no activity matches
+        """
+        if intent.target is not None:
+            return intent.target if intent.target in self.activities else None
+        scheme, host, _ = _parse_uri(intent.data)
+        best = None
+        for host_key in ((None, host) if host is not None else (None,)):
+            for entry in self._filter_index.get((intent.action, scheme, host_key), ()):
+                if best is not None and entry[:2] >= best[:2]:
+                    break
+                if entry[2].matches(intent):
+                    best = entry
+                    break
+        return best[3] if best is not None else None
+        
+    def start_activity(self, activity_name: Union[str, 'Intent'], **kwargs) -> None:
         """Start a specific activity.
         
+        The current activity is stopped and pushed onto the back stack,
+        where it stays warm until finish() or back() returns to it.
+        
         Args:
-            activity_name: Name of activity to start
+            activity_name: Name of activity to start, or an Intent to resolve;
+                the intent's extras are passed to the activity constructor and
+                the intent is available as activity.intent
             **kwargs: Arguments to pass to activity constructor
             
         Raises:
-            ActivityNotFoundError: If activity_name is not registered
+            ActivityNotFoundError: If activity_name is not registered or no
+                activity matches the intent
             
         Example:
             >>> app.start_activity("main", user_id=123)
+            >>> app.start_activity(Intent("ACTION_VIEW", data="https://example.com/item/42"))
         """
+        intent = None
+        if isinstance(activity_name, Intent):
+            intent = activity_name
+            activity_name = self.resolve_activity(intent)
+            if activity_name is None:
+                raise ActivityNotFoundError(f"No activity found to handle {intent!r}")
+            kwargs = {**intent.get_all_extras(), **kwargs}
         if activity_name not in self.activities:
             raise ActivityNotFoundError(
                 f"Activity '{activity_name}' not registered. "
                 f"Available activities: {list(self.activities.keys())}"
             )
         
-        # Stop current activity if exists
-        if self.current_activity:
-            self.current_activity.stop()
-            self.current_activity.destroy()
+        # Stop current activity and keep it on the back stack
+        previous = self.current_activity
+        was_resumed = previous is not None and previous._state == _RESUMED
+        if previous:
+            if was_resumed:
+                previous.pause()
+            previous.stop()
+            entry = _BackStackEntry(previous.name, previous.extras, previous)
+            self._back_stack.append(entry)
+            self._warm[entry] = None
+            self._trim_warm_activities()
         
-        activity_class = self.activities[activity_name]
-        self.current_activity = activity_class(activity_name, **kwargs)
+        self.current_activity = self._create_activity(activity_name, kwargs, intent)
         self.current_activity.start()
-        self.logger.info(f"Started activity: {activity_name}")
+        if was_resumed:
+            self.current_activity.resume()
+        self.logger.info("Started activity: %s", activity_name)
+        
+    def finish_activity(self, activity: 'Activity') -> None:
+        """Finish an activity and remove it from the back stack.
+        
+        Finishing the current activity brings back the one below it: a warm
+        activity is restarted as is, an evicted one is rebuilt and its saved
+        state restored.
+        
+        Args:
+            activity: Current activity or an activity on the back stack
+        """
+        if activity is not self.current_activity:
+            for entry in self._back_stack:
+                if entry.activity is activity:
+                    self._back_stack.remove(entry)
+                    self._warm.pop(entry, None)
+                    activity.destroy()
+                    self.logger.info("Finished activity: %s", activity.name)
+                    break
+            return
+        
+        was_resumed = activity._state == _RESUMED
+        if was_resumed:
+            activity.pause()
+        if activity._state != _STOPPED:
+            activity.stop()
+        activity.destroy()
+        self.current_activity = None
+        self.logger.info("Finished activity: %s", activity.name)
+        
+        if self._back_stack:
+            entry = self._back_stack.pop()
+            self._warm.pop(entry, None)
+            if entry.activity is not None:
+                self.current_activity = entry.activity
+                self.current_activity.restart()
+            else:
+                self.current_activity = self._create_activity(entry.name, entry.kwargs,
+                                                              entry.intent)
+                self.current_activity.start()
+                self.current_activity.restore_instance_state(Bundle.from_bytes(entry.saved_state))
+                self.logger.info("Recreated activity: %s", entry.name)
+            if was_resumed:
+                self.current_activity.resume()
+                
+    def back(self) -> bool:
+        """Navigate back, as if the user pressed the back button.
+        
+        Returns:
+            True if there was an activity to go back from, False otherwise
+        """
+        if self.current_activity is None:
+            return False
+        self.current_activity.on_back_pressed()
+        return True
+        
+    def checkpoint(self) -> bool:
+        """Persist the current activity's state to state_store.
+        
+        Only entries that changed since the previous checkpoint are
+        written, so this is cheap to call often.
+        
+        Returns:
+            True if the state was saved, False if there is nothing to save
+            to or writing failed
+            
+        Example:
+            >>> app.state_store = InstanceStateStore(FileManager("MyApp"))
+            >>> app.checkpoint()
+        """
+        if self.state_store is None or self.current_activity is None:
+            return False
+        return self.state_store.save(self.current_activity.name,
+                                     self.current_activity.save_instance_state())
+        
+    def restore_activity(self, activity_name: str, **kwargs) -> bool:
+        """Start an activity and restore the state persisted in state_store.
+        
+        Args:
+            activity_name: Name of activity to start
+            **kwargs: Arguments to pass to activity constructor
+            
+        Returns:
+            True if saved state was found and restored, False otherwise
+        """
+        self.start_activity(activity_name, **kwargs)
+        state = self.state_store.load(activity_name) if self.state_store is not None else None
+        if state is None:
+            return False
+        self.current_activity.restore_instance_state(state)
+        return True
+        
+    def get_back_stack(self) -> List[str]:
+        """Get the names of the activities below the current one.
+        
+        Returns:
+            Activity names, bottom of the stack first
+        """
+        return [entry.name for entry in self._back_stack]
+        
+    def _create_activity(self, activity_name: str, kwargs: Dict[str, Any],
+                         intent: Optional['Intent'] = None) -> 'Activity':
+        """Instantiate a registered activity bound to this app."""
+        activity = self.activities[activity_name](activity_name, **kwargs)
+        activity.app = self
+        activity.intent = intent
+        return activity
+        
+    def _trim_warm_activities(self) -> None:
+        """Evict least recently used warm activities that exceed the budget.
+        
+        Evicted activities save their state and are destroyed; their entry
+        stays on the back stack so they can be rebuilt later.
+        """
+        while self._warm:
+            over_count = len(self._warm) > self.max_warm_activities
+            over_views = (self.max_warm_views is not None
+                          and sum(len(entry.activity._id_index) for entry in self._warm)
+                          > self.max_warm_views)
+            if not (over_count or over_views):
+                return
+            entry = next(iter(self._warm))
+            del self._warm[entry]
+            state = entry.activity.save_instance_state()
+            entry.saved_state = state.to_bytes()
+            if self.state_store is not None:
+                self.state_store.save(entry.name, state)
+            entry.activity.destroy()
+            entry.activity = None
+            self.logger.info("Evicted activity from memory: %s", entry.name)
+            
+    @property
+    def executor(self) -> 'ExecutorService':
+        """Worker pools for work that would block the main looper.
+        
+        The "io" thread pool is meant for FileManager and NetworkManager
+        calls, the "cpu" process pool for CPU-bound work. Done callbacks of
+        the returned futures run on the main looper. Per-pool metrics are
+        available from executor.get_metrics().
+        
+        Example:
+            >>> future = app.executor.run_io(network.get, url)
+            >>> future.add_done_callback(lambda done: label.set_text(done.result()))
+        """
+        if self._executor is None:
+            from .executor import ExecutorService
+            self._executor = ExecutorService(self.handler)
+        return self._executor
+        
+    def register_receiver(self, receiver: Any, intent_filter: Union[str, 'IntentFilter'],
+                          priority: Optional[int] = None, batch: bool = False
+                          ) -> Optional['Intent']:
+        """Register a broadcast receiver.
+        
+        Args:
+            receiver: BroadcastReceiver or callable taking an intent; None only
+                returns the current sticky intent
+            intent_filter: IntentFilter, or a single action name
+            priority: Delivery priority; defaults to the filter's priority
+            batch: Coalesce the intents sent during one loop tick into a single
+                on_receive_batch() call (or a call with a list, for callables);
+                an ordered broadcast is delivered as a list of one intent
+            
+        Returns:
+            The matching sticky intent, if any
+            
+        Example:
+            >>> app.register_receiver(lambda intent: print(intent.action), "SYNC_FINISHED")
+            >>> app.register_receiver(SensorReceiver(), "SENSOR_CHANGED", batch=True)
+        """
+        if isinstance(intent_filter, str):
+            intent_filter = IntentFilter(actions=[intent_filter])
+        if priority is None:
+            priority = intent_filter.priority
+        return self.broadcasts.register(receiver, intent_filter, priority, batch)
+        
+    def unregister_receiver(self, receiver: Any) -> bool:
+        """Unregister a broadcast receiver.
+        
+        Args:
+            receiver: Registered receiver
+            
+        Returns:
+            True if the receiver was registered, False otherwise
+        """
+        return self.broadcasts.unregister(receiver)
+        
+    def send_broadcast(self, intent: 'Intent') -> None:
+        """Deliver an intent to all matching receivers on the main looper.
+        
+        May be called from any thread.
+        
+        Args:
+            intent: Intent to broadcast
+        """
+        self.broadcasts.send(intent)
+        
+    def send_ordered_broadcast(self, intent: 'Intent',
+                               result_callback: Optional[Callable[[BroadcastResult], Any]] = None,
+                               initial_code: int = 0, initial_data: Any = None) -> None:
+        """Deliver an intent to matching receivers one at a time, by priority.
+        
+        A BroadcastReceiver can update its result or call abort_broadcast()
+        to stop lower-priority receivers from getting the intent.
+        
+        Args:
+            intent: Intent to broadcast
+            result_callback: Called with the final BroadcastResult
+            initial_code: Initial result code
+            initial_data: Initial result data
+        """
+        self.broadcasts.send_ordered(intent, result_callback, initial_code, initial_data)
+        
+    def send_sticky_broadcast(self, intent: 'Intent') -> None:
+        """Broadcast an intent and keep it for receivers registered later.
+        
+        Args:
+            intent: Intent to broadcast; replaces the sticky intent with the
+                same action
+        """
+        self.broadcasts.send_sticky(intent)
+        
+    def remove_sticky_broadcast(self, action: str) -> bool:
+        """Forget the sticky intent of an action.
+        
+        Args:
+            action: Intent action
+            
+        Returns:
+            True if a sticky intent was removed, False otherwise
+        """
+        return self.broadcasts.remove_sticky(action)
+        
+    def register_service(self, service_name: str, service_class: Type[Any]) -> None:
+        """Register a service with the application.
+        
+        Args:
+            service_name: Name identifier for the service
+            service_class: pyandroid.service.Service subclass
+            
+        Example:
+            >>> app.register_service("sync", SyncService)
+        """
+        self.services[service_name] = service_class
+        self.logger.info(f"Registered service: {service_name}")
+        
+    def start_service(self, service: Union[str, 'Intent'], **extras) -> int:
+        """Send a command to a service, creating it if it is not running.
+        
+        The command is handled by the service's on_start_command() on its
+        worker thread. A started service runs until stop_service() or
+        stop_self() is called.
+        
+        Args:
+            service: Name of the service, or an Intent targeting it
+            **extras: Extras added to the intent
+            
+        Returns:
+            Start id of the command
+            
+        Raises:
+            ServiceNotFoundError: If the service is not registered
+            
+        Example:
+            >>> app.start_service("sync", account="alice")
+        """
+        intent = self._service_intent(service, extras)
+        running = self._get_or_create_service(intent.target)
+        return running._start_command(intent)
+        
+    def stop_service(self, service_name: str) -> bool:
+        """Stop a started service.
+        
+        The service is destroyed once no clients are bound to it. Commands
+        still queued are dropped; the running one finishes first.
+        
+        Args:
+            service_name: Name of the service
             
+        Returns:
+            True if the service was running, False otherwise
+        """
+        running = self._running_services.get(service_name)
+        if running is None:
+            return False
+        return running._stop()
+        
+    def bind_service(self, service: Union[str, 'Intent']) -> Any:
+        """Bind to a service, creating it if it is not running.
+        
+        A bound service runs at least until every client has called
+        unbind_service().
+        
+        Args:
+            service: Name of the service, or an Intent targeting it
+            
+        Returns:
+            Binder returned by the service's on_bind()
+            
+        Raises:
+            ServiceNotFoundError: If the service is not registered
+            
+        Example:
+            >>> binder = app.bind_service("sync")
+            >>> binder.call("fetch", 42).add_done_callback(show_item)
+        """
+        intent = self._service_intent(service, {})
+        return self._get_or_create_service(intent.target)._bind(intent)
+        
+    def unbind_service(self, service: Union[str, 'Intent']) -> bool:
+        """Release one binding of a service.
+        
+        Args:
+            service: Name of the service, or an Intent targeting it
+            
+        Returns:
+            True if the service had a client bound, False otherwise
+        """
+        intent = self._service_intent(service, {}, check=False)
+        running = self._running_services.get(intent.target)
+        if running is None:
+            return False
+        return running._unbind(intent)
+        
+    def _service_intent(self, service: Union[str, 'Intent'], extras: Dict[str, Any],
+                        check: bool = True) -> 'Intent':
+        """Build the explicit intent for a service call."""
+        intent = service if isinstance(service, Intent) else Intent(target=service)
+        for key, value in extras.items():
+            intent.put_extra(key, value)
+        if check and intent.target not in self.services:
+            raise ServiceNotFoundError(
+                f"Service '{intent.target}' not registered. "
+                f"Available services: {list(self.services.keys())}"
+            )
+        return intent
+        
+    def _get_or_create_service(self, service_name: str) -> Any:
+        """Return the running instance of a service, creating it if needed."""
+        running = self._running_services.get(service_name)
+        if running is None:
+            running = self.services[service_name](service_name)
+            self._running_services[service_name] = running
+            running._create(self)
+            self.logger.info("Created service: %s", service_name)
+        return running
+        
     def run(self) -> None:
         """Run the Android application.
         
+        In GUI mode the main looper is pumped by the Kivy clock. In console
+        mode the looper runs until no messages are left, including delayed
+        ones.
+        
         Example:
             >>> app.run()
         """
@@ -124,6 +643,8 @@ class AndroidApp:
                 self.renderer.run()
             else:
                 self.logger.info("Running in console mode (no GUI)")
+                count = self.looper.run_until_idle()
+                self.logger.info(f"Main looper idle after {count} messages")
         else:
             self.logger.warning("No activity to run. Use start_activity() first.")
 
@@ -144,6 +665,9 @@ class Activity:
         >>> activity.start()
     """
     
+    # Attributes saved and restored automatically with the instance state
+    SAVED_STATE_FIELDS: Tuple[str, ...] = ()
+    
     # Valid state transitions
     VALID_TRANSITIONS = {
         "created": ["started"],
@@ -153,6 +677,17 @@ class Activity:
         "stopped": ["started", "destroyed"],
         "destroyed": []
     }
+    # Bitmask of allowed target states for each state code
+    _TRANSITION_MASKS = transition_masks(VALID_TRANSITIONS)
+    
+    # Lifecycle observers and their callbacks per state code, set on first add_observer()
+    _observers: Tuple[LifecycleObserver, ...] = ()
+    _listeners = build_listeners(())
+    
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "VALID_TRANSITIONS" in cls.__dict__:
+            cls._TRANSITION_MASKS = transition_masks(cls.VALID_TRANSITIONS)
     
     def __init__(self, name: str, **kwargs) -> None:
         """Initialize activity.
@@ -162,10 +697,36 @@ class Activity:
             **kwargs: Additional activity arguments
         """
         self.name = name
-        self.state = "created"
+        self._state = _CREATED
+        # Set by AndroidApp when it creates the activity
+        self.app: Optional[AndroidApp] = None
+        self.intent: Optional[Intent] = None
         self.views: Dict[str, Any] = {}
-        self.logger = logging.getLogger(f"PyAndroid.Activity.{name}")
+        # Every view id in the tree, including views nested inside layouts
+        self._id_index: Dict[str, Any] = {}
+        # Hit-test index over absolute view frames, built on first touch
+        self._hit_index: Optional[SpatialIndex] = None
+        self._moved: Dict[Any, None] = {}
+        self.logger = _activity_logger(name)
         self.extras = kwargs
+        self._lifecycle_scope = None
+        
+    @property
+    def state(self) -> str:
+        """Lifecycle state name: created, started, resumed, paused, stopped or destroyed."""
+        return STATE_NAMES[self._state]
+        
+    @state.setter
+    def state(self, name: str) -> None:
+        try:
+            self._state = STATE_CODES[name]
+        except KeyError:
+            raise ValueError(f"Unknown lifecycle state {name!r}") from None
+            
+    @property
+    def lifecycle_state(self) -> State:
+        """Lifecycle state as a State enum member."""
+        return State(self._state)
         
     def _validate_transition(self, new_state: str) -> None:
         """Validate if state transition is allowed.
@@ -176,10 +737,80 @@ class Activity:
         Raises:
             InvalidStateError: If transition is invalid
         """
-        if new_state not in self.VALID_TRANSITIONS.get(self.state, []):
+        code = STATE_CODES.get(new_state)
+        if code is None or not self._TRANSITION_MASKS[self._state] >> code & 1:
             raise InvalidStateError(
                 f"Cannot transition from '{self.state}' to '{new_state}'"
             )
+            
+    def _move_to(self, code: int) -> None:
+        """Enter a state after checking the transition is allowed."""
+        if not self._TRANSITION_MASKS[self._state] >> code & 1:
+            raise InvalidStateError(
+                f"Cannot transition from '{self.state}' to '{STATE_NAMES[code]}'"
+            )
+        self._state = code
+        
+    def add_observer(self, observer: LifecycleObserver) -> None:
+        """Observe this activity's lifecycle.
+        
+        The observer is first brought up to the current state: it gets
+        on_create(), then on_start() if the activity is started and
+        on_resume() if it is resumed.
+        
+        Args:
+            observer: Observer to add; adding it again has no effect
+        """
+        if observer in self._observers:
+            return
+        self._observers += (observer,)
+        listeners = list(self._listeners)
+        callbacks = observed_callbacks(type(observer))
+        for code, name in callbacks:
+            listeners[code] += (getattr(observer, name),)
+        self._listeners = tuple(listeners)
+        replay = REPLAY[self._state]
+        for code, name in callbacks:
+            if code in replay:
+                getattr(observer, name)(self)
+                
+    def remove_observer(self, observer: LifecycleObserver) -> bool:
+        """Stop observing this activity's lifecycle.
+        
+        Args:
+            observer: Observer added with add_observer()
+            
+        Returns:
+            True if the observer was removed, False if it was not added
+        """
+        if observer not in self._observers:
+            return False
+        self._observers = tuple(item for item in self._observers if item is not observer)
+        self._listeners = build_listeners(self._observers)
+        return True
+        
+    @property
+    def lifecycle_scope(self) -> 'LifecycleScope':
+        """Scope for coroutines that must not outlive this activity.
+        
+        Tasks launched in it run on a background asyncio loop, deliver
+        their results on the app's main looper and are cancelled when the
+        activity is destroyed.
+        
+        Example:
+            >>> self.lifecycle_scope.launch(load_profile(user_id),
+            ...                             on_result=self.show_profile,
+            ...                             suspend_on_pause=True)
+        """
+        if self._lifecycle_scope is None:
+            # asyncio is only imported by activities that launch coroutines
+            from .scope import LifecycleScope
+            self._lifecycle_scope = LifecycleScope(self)
+            if self._state != _DESTROYED:
+                self.add_observer(self._lifecycle_scope)
+            else:
+                self._lifecycle_scope.on_destroy(self)
+        return self._lifecycle_scope
         
     def start(self) -> None:
         """Start the activity.
@@ -187,10 +818,43 @@ class Activity:
         Raises:
             InvalidStateError: If activity is not in 'created' state
         """
-        self._validate_transition("started")
-        self.state = "started"
+        self._move_to(_STARTED)
         self.on_start()
-        self.logger.info(f"Activity {self.name} started")
+        for listener in self._listeners[_STARTED]:
+            listener(self)
+        self.logger.info("Activity %s started", self.name)
+        
+    def restart(self) -> None:
+        """Start a stopped activity again, keeping its views.
+        
+        Unlike start(), on_start() is not called again; on_restart() is.
+        
+        Raises:
+            InvalidStateError: If activity is not in 'stopped' state
+        """
+        if self._state != _STOPPED:
+            raise InvalidStateError(f"Cannot restart from '{self.state}'")
+        self._move_to(_STARTED)
+        self.on_restart()
+        for listener in self._listeners[_STARTED]:
+            listener(self)
+        self.logger.info("Activity %s restarted", self.name)
+        
+    def finish(self) -> None:
+        """Close this activity and return to the previous one.
+        
+        Example:
+            >>> activity.finish()
+        """
+        if self.app is not None:
+            self.app.finish_activity(self)
+            return
+        if self._state == _RESUMED:
+            self.pause()
+        if self._state in (_STARTED, _PAUSED):
+            self.stop()
+        if self._state == _STOPPED:
+            self.destroy()
         
     def resume(self) -> None:
         """Resume the activity.
@@ -198,10 +862,11 @@ class Activity:
         Raises:
             InvalidStateError: If activity cannot be resumed from current state
         """
-        self._validate_transition("resumed")
-        self.state = "resumed"
+        self._move_to(_RESUMED)
         self.on_resume()
-        self.logger.info(f"Activity {self.name} resumed")
+        for listener in self._listeners[_RESUMED]:
+            listener(self)
+        self.logger.info("Activity %s resumed", self.name)
         
     def pause(self) -> None:
         """Pause the activity.
@@ -209,10 +874,11 @@ class Activity:
         Raises:
             InvalidStateError: If activity is not in 'resumed' state
         """
-        self._validate_transition("paused")
-        self.state = "paused"
+        self._move_to(_PAUSED)
+        for listener in self._listeners[_PAUSED]:
+            listener(self)
         self.on_pause()
-        self.logger.info(f"Activity {self.name} paused")
+        self.logger.info("Activity %s paused", self.name)
         
     def stop(self) -> None:
         """Stop the activity.
@@ -220,10 +886,11 @@ class Activity:
         Raises:
             InvalidStateError: If activity cannot be stopped from current state
         """
-        self._validate_transition("stopped")
-        self.state = "stopped"
+        self._move_to(_STOPPED)
+        for listener in self._listeners[_STOPPED]:
+            listener(self)
         self.on_stop()
-        self.logger.info(f"Activity {self.name} stopped")
+        self.logger.info("Activity %s stopped", self.name)
         
     def destroy(self) -> None:
         """Destroy the activity.
@@ -231,15 +898,20 @@ class Activity:
         Raises:
             InvalidStateError: If activity is not in 'stopped' state
         """
-        self._validate_transition("destroyed")
-        self.state = "destroyed"
+        self._move_to(_DESTROYED)
+        for listener in self._listeners[_DESTROYED]:
+            listener(self)
         self.on_destroy()
-        self.logger.info(f"Activity {self.name} destroyed")
+        self.logger.info("Activity %s destroyed", self.name)
         
     def on_start(self) -> None:
         """Called when activity starts. Override in subclasses."""
         pass
         
+    def on_restart(self) -> None:
+        """Called when a stopped activity is started again. Override in subclasses."""
+        pass
+        
     def on_resume(self) -> None:
         """Called when activity resumes. Override in subclasses."""
         pass
@@ -256,21 +928,127 @@ class Activity:
         """Called when activity is destroyed. Override in subclasses."""
         pass
         
+    def on_back_pressed(self) -> None:
+        """Called on back navigation. Finishes the activity by default."""
+        self.finish()
+        
+    def save_instance_state(self) -> Bundle:
+        """Snapshot this activity's state.
+        
+        The bundle holds the SAVED_STATE_FIELDS attributes, the state of
+        every view in the tree under "android:views" and whatever
+        on_save_instance_state() adds.
+        
+        Returns:
+            State bundle
+        """
+        state = Bundle()
+        for field in self.SAVED_STATE_FIELDS:
+            state[field] = getattr(self, field)
+        view_states = Bundle()
+        seen = set()
+        for view in self._id_index.values():
+            if id(view) in seen or not hasattr(view, "on_save_instance_state"):
+                continue
+            seen.add(id(view))
+            view_state = view.on_save_instance_state()
+            if view_state:
+                view_id = getattr(view, "layout_id", None) or view.view_id
+                view_states[view_id] = view_state
+        if view_states:
+            state["android:views"] = view_states
+        self.on_save_instance_state(state)
+        return state
+        
+    def restore_instance_state(self, state: Bundle) -> None:
+        """Apply a bundle produced by save_instance_state().
+        
+        Call after the view tree is built. Saved view states are applied in
+        one pass by id; views that no longer exist are skipped.
+        
+        Args:
+            state: State bundle
+        """
+        for field in self.SAVED_STATE_FIELDS:
+            if field in state:
+                setattr(self, field, state[field])
+        for view_id, view_state in state.get("android:views", {}).items():
+            view = self._id_index.get(view_id)
+            if view is not None:
+                view.on_restore_instance_state(view_state)
+        self.on_restore_instance_state(state)
+        
+    def on_save_instance_state(self, out_state: Bundle) -> None:
+        """Save extra state needed to rebuild this activity. Override in subclasses.
+        
+        Called before a stopped activity is evicted from memory and on
+        AndroidApp.checkpoint().
+        
+        Args:
+            out_state: Bundle to store state in
+        """
+        pass
+        
+    def on_restore_instance_state(self, saved_state: Bundle) -> None:
+        """Restore state saved by on_save_instance_state(). Override in subclasses.
+        
+        Called after on_start() and after fields and views are restored.
+        
+        Args:
+            saved_state: Bundle filled by on_save_instance_state()
+        """
+        pass
+        
+    @staticmethod
+    def _collect_ids(view_id: str, view: Any) -> Dict[str, Any]:
+        """Return the id index entries for a top-level view and its subtree."""
+        entries = dict(getattr(view, "_id_index", {}))
+        own_id = getattr(view, "layout_id", None) or getattr(view, "view_id", None)
+        if own_id is not None:
+            entries[own_id] = view
+        entries[view_id] = view
+        return entries
+        
     def add_view(self, view_id: str, view: Any) -> None:
         """Add a view to this activity.
         
+        Adding a layout indexes its whole subtree, so any nested view can
+        later be fetched with get_view(). Views added to the layout
+        afterwards are indexed as well. Re-using an existing view_id
+        replaces the previous view.
+        
         Args:
             view_id: Unique identifier for the view
             view: View instance to add
             
+        Raises:
+            DuplicateViewIdError: If an id in the subtree is already in use
+            
         Example:
             >>> activity.add_view("text1", TextView("text1", "Hello"))
         """
+        entries = self._collect_ids(view_id, view)
+        replaced = self.views.get(view_id)
+        replaced_entries = self._collect_ids(view_id, replaced) if replaced is not None else {}
+        for key, node in entries.items():
+            existing = self._id_index.get(key)
+            if (existing is not None and existing is not node
+                    and replaced_entries.get(key) is not existing):
+                raise DuplicateViewIdError(f"View id '{key}' is already in use")
+        
+        if replaced is not None:
+            self.remove_view(view_id)
         self.views[view_id] = view
+        self._id_index.update(entries)
+        if hasattr(view, "_owner"):
+            view._owner = self
+        self._mark_moved(entries.values())
         
     def get_view(self, view_id: str) -> Optional[Any]:
         """Get a view by ID.
         
+        Looks up views anywhere in the activity's view tree in constant time.
+        
         Args:
             view_id: View identifier
             
@@ -280,7 +1058,7 @@ class Activity:
         Example:
             >>> text_view = activity.get_view("text1")
         """
-        return self.views.get(view_id)
+        return self._id_index.get(view_id)
     
     def remove_view(self, view_id: str) -> bool:
         """Remove a view from this activity.
@@ -292,9 +1070,135 @@ class Activity:
             True if view was removed, False if not found
         """
         if view_id in self.views:
-            del self.views[view_id]
+            view = self.views.pop(view_id)
+            for key, node in self._collect_ids(view_id, view).items():
+                if self._id_index.get(key) is node:
+                    del self._id_index[key]
+            if getattr(view, "_owner", None) is self:
+                view._owner = None
+            self._mark_moved(self._collect_ids(view_id, view).values())
             return True
         return False
+    
+    def dispatch_touch(self, x: float, y: float) -> Optional[Any]:
+        """Deliver a click at screen coordinates to the view under it.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            
+        Returns:
+            The view that received the click, or None if nothing was hit
+            
+        Example:
+            >>> activity.dispatch_touch(120, 48)
+        """
+        view = self.find_view_at(x, y)
+        if view is not None:
+            view.on_click()
+        return view
+    
+    def find_view_at(self, x: float, y: float) -> Optional[Any]:
+        """Find the topmost visible, enabled view at screen coordinates.
+        
+        Pending layout passes are run first. Views are looked up in a
+        spatial index that is updated only for views that moved since the
+        previous lookup. As on Android, a view is only hit inside the
+        bounds of all of its ancestors.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            
+        Returns:
+            View instance or None if no view is at that point
+        """
+        self._sync_hit_index()
+        hit = None
+        hit_order = None
+        for view in self._hit_index.query_point(x, y):
+            if not (view.visible and view.enabled) or not self._inside_ancestors(view, x, y):
+                continue
+            if hit is None:
+                hit = view
+                continue
+            if hit_order is None:
+                hit_order = self._draw_order(hit)
+            order = self._draw_order(view)
+            if order > hit_order:
+                hit, hit_order = view, order
+        return hit
+    
+    def _mark_moved(self, nodes: Iterable[Any]) -> None:
+        """Queue views that were moved, added or removed for re-indexing."""
+        if self._hit_index is not None:
+            for node in nodes:
+                self._moved[node] = None
+    
+    def _sync_hit_index(self) -> None:
+        """Run pending layout passes and bring the hit index up to date."""
+        for view in list(self.views.values()):
+            if hasattr(view, "arrange_children"):
+                view.render()
+        if self._hit_index is None:
+            self._hit_index = SpatialIndex()
+            pending = list(self.views.values())
+        else:
+            pending = list(self._moved)
+            # Top-level views have no parent to report their moves
+            pending.extend(view for view in self.views.values()
+                           if not hasattr(view, "children"))
+        self._moved.clear()
+        
+        seen = set()
+        while pending:
+            node = pending.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            node_id = getattr(node, "layout_id", None) or getattr(node, "view_id", None)
+            if self._id_index.get(node_id) is not node:
+                self._hit_index.remove(node)
+            elif hasattr(node, "children"):
+                # Moving a layout moves everything inside it
+                pending.extend(node.children)
+            else:
+                left, top = self._absolute_position(node)
+                self._hit_index.insert(node, left, top, node.width or 0, node.height or 0)
+    
+    @staticmethod
+    def _absolute_position(node: Any) -> tuple:
+        """Return a node's top-left corner in screen coordinates."""
+        left = top = 0
+        while node is not None:
+            left += node.x
+            top += node.y
+            node = node._parent
+        return left, top
+    
+    def _inside_ancestors(self, view: Any, x: float, y: float) -> bool:
+        """Check that a point lies within every ancestor of a view."""
+        left, top, _, _ = self._hit_index.get_rect(view)
+        node = view
+        while node._parent is not None:
+            left -= node.x
+            top -= node.y
+            node = node._parent
+            if not (left <= x < left + node.width and top <= y < top + node.height):
+                return False
+        return True
+    
+    def _draw_order(self, view: Any) -> List[int]:
+        """Return the tree path of a view; later paths are drawn on top."""
+        path = []
+        node = view
+        while node._parent is not None:
+            path.append(node._parent.children.index(node))
+            node = node._parent
+        roots = list(self.views.values())
+        path.append(roots.index(node) if node in roots else -1)
+        path.reverse()
+        return path
 
 
 class Intent:
@@ -307,25 +1211,83 @@ class Intent:
         >>> intent.put_extra("user_id", 123)
         >>> intent.put_extra("username", "alice")
         >>> user_id = intent.get_extra("user_id")
+        >>> restored = Intent.from_bytes(intent.to_bytes())
     """
     
-    def __init__(self, action: str, target: Optional[str] = None) -> None:
+    def __init__(self, action: Optional[str] = None, target: Optional[str] = None,
+                 data: Optional[str] = None, mime_type: Optional[str] = None) -> None:
         """Initialize intent.
         
+        An intent with a target is explicit and starts that activity. An
+        intent without one is implicit and is resolved against the intent
+        filters of the registered activities.
+        
         Args:
             action: Action to perform (e.g., ACTION_VIEW, ACTION_EDIT)
             target: Target component (optional activity name)
+            data: Optional data URI (e.g., "https://example.com/item/42")
+            mime_type: Optional MIME type of the data (e.g., "image/png")
         """
         self.action = action
         self.target = target
-        self.extras: Dict[str, Any] = {}
+        self.data = data
+        self.mime_type = mime_type.lower() if mime_type else None
+        self.categories: set = set()
+        self.extras: Bundle = Parcel()
+        
+    def __repr__(self) -> str:
+        return (f"Intent(action={self.action!r}, target={self.target!r}, "
+                f"data={self.data!r}, mime_type={self.mime_type!r})")
+        
+    def add_category(self, category: str) -> None:
+        """Add a category the handling activity must declare.
+        
+        Args:
+            category: Category name (e.g., CATEGORY_BROWSABLE)
+        """
+        self.categories.add(category)
+        
+    def has_category(self, category: str) -> bool:
+        """Check if intent has a category.
+        
+        Args:
+            category: Category name
+            
+        Returns:
+            True if the category was added, False otherwise
+        """
+        return category in self.categories
+        
+    def set_data(self, data: Optional[str]) -> None:
+        """Set the data URI.
+        
+        Args:
+            data: Data URI, or None to clear it
+        """
+        self.data = data
+        
+    def set_type(self, mime_type: Optional[str]) -> None:
+        """Set the MIME type of the data.
+        
+        Args:
+            mime_type: MIME type, or None to clear it
+        """
+        self.mime_type = mime_type.lower() if mime_type else None
+        
+    def get_scheme(self) -> Optional[str]:
+        """Get the scheme of the data URI.
+        
+        Returns:
+            Lowercase scheme, or None if there is no data URI
+        """
+        return _parse_uri(self.data)[0]
         
     def put_extra(self, key: str, value: Any) -> None:
         """Add extra data to intent.
         
         Args:
             key: Data key
-            value: Data value (any serializable type)
+            value: Data value; to_bytes() supports the Bundle value types
         """
         self.extras[key] = value
         
@@ -352,10 +1314,168 @@ class Intent:
         """
         return key in self.extras
     
-    def get_all_extras(self) -> Dict[str, Any]:
-        """Get all extras as a dictionary.
+    def get_all_extras(self) -> Bundle:
+        """Get all extras.
+        
+        The copy is shallow and does not decode extras read from bytes
+        until they are accessed.
         
         Returns:
-            Dictionary of all extras
+            Copy of the extras bundle
         """
         return self.extras.copy()
+        
+    def to_bytes(self) -> bytes:
+        """Serialize the intent, including its extras.
+        
+        Extras of an intent read with from_bytes() are copied without being
+        decoded, unless they were changed.
+        
+        Returns:
+            Binary representation
+            
+        Raises:
+            TypeError: If an extra has a type a Bundle cannot store
+        """
+        return Bundle({
+            "action": self.action,
+            "target": self.target,
+            "data": self.data,
+            "type": self.mime_type,
+            "categories": sorted(self.categories),
+            "extras": self.extras,
+        }).to_bytes()
+        
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Intent':
+        """Read an intent produced by to_bytes().
+        
+        Extras are decoded lazily, one key at a time, and bytes and array
+        extras are memoryviews sharing data.
+        
+        Args:
+            data: Binary representation
+            
+        Returns:
+            Decoded intent
+            
+        Raises:
+            ValueError: If the data is truncated or malformed
+        """
+        fields = Parcel.from_bytes(data)
+        intent = cls(fields["action"], fields["target"], fields["data"], fields["type"])
+        intent.categories = set(fields["categories"])
+        intent.extras = fields["extras"]
+        return intent
+
+
+def _parse_uri(uri: Optional[str]) -> Tuple[Optional[str], Optional[str], str]:
+    """Split a URI into its lowercase scheme and host, and its path.
+    
+    Args:
+        uri: URI such as "https://example.com/item/42", or None
+        
+    Returns:
+        Tuple (scheme, host, path); missing parts are None or ""
+    """
+    if not uri or ":" not in uri:
+        return None, None, uri or ""
+    scheme, rest = uri.split(":", 1)
+    host = None
+    if rest.startswith("//"):
+        end = len(rest)
+        for separator in "/?#":
+            index = rest.find(separator, 2)
+            if index != -1:
+                end = min(end, index)
+        authority = rest[2:end].rpartition("@")[2]
+        if authority.startswith("["):
+            host = authority[:authority.find("]") + 1]
+        else:
+            host = authority.split(":", 1)[0]
+        host = host.lower() or None
+        rest = rest[end:]
+    for separator in "?#":
+        rest = rest.split(separator, 1)[0]
+    return scheme.lower(), host, rest
+
+
+class IntentFilter:
+    """Describes the implicit intents an activity can handle.
+    
+    An intent matches when its action is listed, every one of its
+    categories is listed, its data URI fits the schemes, hosts and path
+    prefixes (a filter without schemes only matches intents without data)
+    and its MIME type fits the types (a filter without types only matches
+    intents without a type). Types may use wildcards such as "image/*".
+    
+    Example:
+        >>> item_filter = IntentFilter(actions=["ACTION_VIEW"], schemes=["https"],
+        ...                            hosts=["example.com"], path_prefixes=["/item/"])
+        >>> app.register_activity("item", ItemActivity, intent_filters=[item_filter])
+        >>> app.start_activity(Intent("ACTION_VIEW", data="https://example.com/item/42"))
+    """
+    
+    def __init__(self, actions: Iterable[str] = (), categories: Iterable[str] = (),
+                 schemes: Iterable[str] = (), hosts: Iterable[str] = (),
+                 path_prefixes: Iterable[str] = (), mime_types: Iterable[str] = (),
+                 priority: int = 0) -> None:
+        """Initialize intent filter.
+        
+        Args:
+            actions: Accepted actions
+            categories: Declared categories
+            schemes: Accepted data URI schemes
+            hosts: Accepted data URI hosts; empty accepts any host
+            path_prefixes: Accepted data URI path prefixes; empty accepts any path
+            mime_types: Accepted MIME types, optionally with wildcards
+            priority: Higher priority filters are preferred when several match
+        """
+        self.actions = set(actions)
+        self.categories = set(categories)
+        self.schemes = {scheme.lower() for scheme in schemes}
+        self.hosts = {host.lower() for host in hosts}
+        self.path_prefixes = tuple(path_prefixes)
+        self.mime_types = {mime_type.lower() for mime_type in mime_types}
+        self.priority = priority
+        
+    def matches(self, intent: Intent) -> bool:
+        """Check whether an intent matches this filter.
+        
+        Args:
+            intent: Intent to test
+            
+        Returns:
+            True if the intent matches, False otherwise
+        """
+        if intent.action not in self.actions:
+            return False
+        if not intent.categories <= self.categories:
+            return False
+        scheme, host, path = _parse_uri(intent.data)
+        if self.schemes:
+            if scheme not in self.schemes:
+                return False
+            if self.hosts and host not in self.hosts:
+                return False
+            if self.path_prefixes and not path.startswith(self.path_prefixes):
+                return False
+        elif scheme is not None:
+            return False
+        if self.mime_types:
+            return intent.mime_type is not None and self._matches_type(intent.mime_type)
+        return intent.mime_type is None
+        
+    def _matches_type(self, mime_type: str) -> bool:
+        """Check a MIME type against the declared types and wildcards."""
+        if mime_type in self.mime_types or "*/*" in self.mime_types:
+            return True
+        major = mime_type.split("/", 1)[0]
+        return f"{major}/*" in self.mime_types
+        
+    def _index_keys(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Return the (action, scheme, host) keys this filter is indexed under."""
+        schemes = self.schemes or {None}
+        hosts = self.hosts if self.schemes and self.hosts else {None}
+        return [(action, scheme, host)
+                for action in self.actions for scheme in schemes for host in hosts]
@@ -0,0 +1,160 @@
+"""Render-tree diffing for PyAndroid backends.
+
+Compares two trees produced by ``Layout.render()`` and emits a minimal list
+of keyed patch operations, so a backend can update its existing widgets
+instead of rebuilding the screen. Nodes are matched by their ``id``; since
+unchanged subtrees are returned from the render cache as the same objects,
+they are skipped without being walked.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+INSERT = "insert"
+REMOVE = "remove"
+MOVE = "move"
+SET = "set"
+
+
+class PatchOp(NamedTuple):
+    """A single change to apply to a rendered widget tree.
+
+    Attributes:
+        op: INSERT, REMOVE, MOVE or SET
+        id: Id of the node the operation applies to
+        parent_id: Id of the parent node (INSERT, REMOVE and MOVE)
+        index: Child index in the parent once the operation is applied
+            (INSERT and MOVE)
+        key: Property name (SET)
+        value: New property value (SET), the inserted node (INSERT) or the
+            removed node (REMOVE)
+    """
+
+    op: str
+    id: str
+    parent_id: Optional[str] = None
+    index: Optional[int] = None
+    key: Optional[str] = None
+    value: Any = None
+
+
+def diff_trees(old: Optional[Dict[str, Any]],
+               new: Optional[Dict[str, Any]]) -> List[PatchOp]:
+    """Compute the patch operations that turn one render tree into another.
+
+    Operations are meant to be applied in order. Within a parent, removals
+    come first, then inserts and moves with indices that are valid at the
+    time each operation is applied.
+
+    Args:
+        old: Previous render tree, or None if nothing was rendered yet
+        new: New render tree, or None to remove everything
+
+    Returns:
+        List of patch operations
+
+    Example:
+        >>> old = layout.render()
+        >>> counter.set_text("Counter: 1")
+        >>> diff_trees(old, layout.render())
+        [PatchOp(op='set', id='counter_text', key='text', value='Counter: 1', ...)]
+    """
+    ops: List[PatchOp] = []
+    if old is new:
+        return ops
+    if old is None:
+        ops.append(PatchOp(INSERT, new["id"], None, 0, value=new))
+    elif new is None:
+        ops.append(PatchOp(REMOVE, old["id"], None, value=old))
+    elif old["id"] != new["id"] or old["type"] != new["type"]:
+        ops.append(PatchOp(REMOVE, old["id"], None, value=old))
+        ops.append(PatchOp(INSERT, new["id"], None, 0, value=new))
+    else:
+        _diff_node(old, new, ops)
+    return ops
+
+
+def _diff_node(old: Dict[str, Any], new: Dict[str, Any], ops: List[PatchOp]) -> None:
+    """Append operations for a node matched by id and type."""
+    node_id = new["id"]
+    for key, value in new.items():
+        if key == "children":
+            continue
+        if key not in old or old[key] != value:
+            ops.append(PatchOp(SET, node_id, key=key, value=value))
+    for key in old:
+        if key != "children" and key not in new:
+            ops.append(PatchOp(SET, node_id, key=key, value=None))
+    old_children = old.get("children")
+    new_children = new.get("children")
+    if old_children is not new_children and (old_children or new_children):
+        _diff_children(node_id, old_children or [], new_children or [], ops)
+
+
+def _diff_children(parent_id: str, old_children: List[Dict[str, Any]],
+                   new_children: List[Dict[str, Any]], ops: List[PatchOp]) -> None:
+    """Append keyed operations reconciling two child lists."""
+    new_by_id = {child["id"]: child for child in new_children}
+    old_index: Dict[str, int] = {}
+    current: List[str] = []
+    for child in old_children:
+        match = new_by_id.get(child["id"])
+        if match is None or match["type"] != child["type"]:
+            ops.append(PatchOp(REMOVE, child["id"], parent_id, value=child))
+        else:
+            old_index[child["id"]] = len(current)
+            current.append(child["id"])
+
+    # Children in the longest run that kept their relative order stay put
+    kept_positions = [old_index.get(child["id"], -1) for child in new_children]
+    stable = _longest_increasing_subsequence(kept_positions)
+
+    # Walk backwards so each placed child is anchored before its successor
+    anchor: Optional[str] = None
+    for position in range(len(new_children) - 1, -1, -1):
+        child = new_children[position]
+        child_id = child["id"]
+        if position not in stable:
+            moved = child_id in old_index
+            if moved:
+                current.remove(child_id)
+            index = current.index(anchor) if anchor is not None else len(current)
+            current.insert(index, child_id)
+            if moved:
+                ops.append(PatchOp(MOVE, child_id, parent_id, index))
+            else:
+                ops.append(PatchOp(INSERT, child_id, parent_id, index, value=child))
+        anchor = child_id
+
+    old_by_id = {child["id"]: child for child in old_children}
+    for child in new_children:
+        previous = old_by_id.get(child["id"])
+        if previous is not None and previous is not child and child["id"] in old_index:
+            _diff_node(previous, child, ops)
+
+
+def _longest_increasing_subsequence(values: List[int]) -> set:
+    """Return the positions of a longest strictly increasing run of values >= 0."""
+    tails: List[int] = []
+    predecessors = [-1] * len(values)
+    for position, value in enumerate(values):
+        if value < 0:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low > 0:
+            predecessors[position] = tails[low - 1]
+        if low == len(tails):
+            tails.append(position)
+        else:
+            tails[low] = position
+    result = set()
+    position = tails[-1] if tails else -1
+    while position >= 0:
+        result.add(position)
+        position = predecessors[position]
+    return result
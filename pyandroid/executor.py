@@ -0,0 +1,290 @@
+"""Background executors for work that must not block the main looper.
+
+An ExecutorService owns named pools: "io", a thread pool for file and
+network calls, and "cpu", a process pool for CPU-bound work. Pools start
+on first use. Submitting returns a future whose done callbacks run on the
+main looper, so they can touch views directly. Each pool keeps metrics:
+tasks in flight, queue depth, and time spent waiting and running.
+
+Example:
+    >>> future = app.executor.submit("io", network.get, "https://example.com/feed")
+    >>> future.add_done_callback(lambda done: show_feed(done.result()))
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .looper import Handler
+
+IO_POOL = "io"
+CPU_POOL = "cpu"
+
+
+class MainLoopFuture(concurrent.futures.Future):
+    """A future whose done callbacks are posted to a main looper."""
+
+    def __init__(self, handler: Handler) -> None:
+        """Initialize future.
+
+        Args:
+            handler: Handler whose looper runs the done callbacks
+        """
+        super().__init__()
+        self._handler = handler
+        self._inner: Optional[concurrent.futures.Future] = None
+
+    def add_done_callback(self, fn: Callable[["MainLoopFuture"], Any]) -> None:
+        """Call fn with this future on the main looper once it is done.
+
+        Args:
+            fn: Callback taking the future; called even if already done
+        """
+        handler = self._handler
+        super().add_done_callback(lambda future: handler.post(lambda: fn(future)))
+
+    def cancel(self) -> bool:
+        """Cancel the task if it has not started yet.
+
+        Returns:
+            True if the task was cancelled
+        """
+        if self._inner is not None and not self._inner.cancel():
+            return False
+        return super().cancel()
+
+
+class PoolMetrics:
+    """Counters and timings of one pool. Times are in milliseconds."""
+
+    def __init__(self, max_workers: int) -> None:
+        """Initialize metrics.
+
+        Args:
+            max_workers: Number of workers of the pool
+        """
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.max_run_ms = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics as a dictionary.
+
+        Returns:
+            Counters, current queue depth, and mean and max wait and run times
+        """
+        with self._lock:
+            timed = self.completed + self.failed
+            return {
+                "workers": self.max_workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "mean_wait_ms": self.total_wait_ms / timed if timed else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+                "mean_run_ms": self.total_run_ms / timed if timed else 0.0,
+                "max_run_ms": self.max_run_ms,
+            }
+
+    def _submitted(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _finished(self, submitted: float, started: Optional[float], failed: bool) -> None:
+        finished = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if started is None:
+                self.cancelled += 1
+                return
+            wait_ms = (started - submitted) * 1000.0
+            run_ms = (finished - started) * 1000.0
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.total_run_ms += run_ms
+            self.max_run_ms = max(self.max_run_ms, run_ms)
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+
+class ExecutorService:
+    """Named worker pools whose futures report back on the main looper.
+
+    Use AndroidApp.executor rather than creating one directly.
+    """
+
+    def __init__(self, handler: Handler, io_workers: Optional[int] = None,
+                 cpu_workers: Optional[int] = None) -> None:
+        """Initialize executor service.
+
+        Args:
+            handler: Handler whose looper runs future callbacks
+            io_workers: Threads of the "io" pool; defaults to min(32, cpus + 4)
+            cpu_workers: Processes of the "cpu" pool; defaults to the CPU count
+        """
+        self.handler = handler
+        cpus = os.cpu_count() or 1
+        self._factories: Dict[str, Callable[[], concurrent.futures.Executor]] = {}
+        self._pools: Dict[str, concurrent.futures.Executor] = {}
+        self.metrics: Dict[str, PoolMetrics] = {}
+        self._lock = threading.Lock()
+        io_workers = io_workers or min(32, cpus + 4)
+        cpu_workers = cpu_workers or cpus
+        self.add_pool(IO_POOL, lambda: concurrent.futures.ThreadPoolExecutor(
+            io_workers, thread_name_prefix="PyAndroid-io"), io_workers)
+        self.add_pool(CPU_POOL, lambda: _process_pool(cpu_workers), cpu_workers)
+
+    def add_pool(self, name: str, factory: Callable[[], concurrent.futures.Executor],
+                 max_workers: int) -> None:
+        """Register a named pool, created on first use.
+
+        Args:
+            name: Pool name passed to submit()
+            factory: Creates the executor
+            max_workers: Number of workers the executor runs, for queue depth
+        """
+        with self._lock:
+            if name in self._pools:
+                raise ValueError(f"Pool '{name}' is already running")
+            self._factories[name] = factory
+            self.metrics[name] = PoolMetrics(max_workers)
+
+    def submit(self, pool: str, fn: Callable[..., Any], *args, **kwargs) -> MainLoopFuture:
+        """Run a callable in a pool.
+
+        Callables for the "cpu" pool, and their arguments and results, must
+        be picklable; workers are not forked, so the callables must live in
+        a module they can import.
+
+        Args:
+            pool: Pool name, such as "io" or "cpu"
+            fn: Callable to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future of fn's result; its done callbacks run on the main looper
+
+        Raises:
+            KeyError: If the pool does not exist
+        """
+        executor = self._pool(pool)
+        metrics = self.metrics[pool]
+        future = MainLoopFuture(self.handler)
+        submitted = time.monotonic()
+        metrics._submitted()
+        inner = executor.submit(_timed_call, fn, args, kwargs)
+        future._inner = inner
+
+        def copy_outcome(done: concurrent.futures.Future) -> None:
+            if done.cancelled():
+                metrics._finished(submitted, None, False)
+                future.cancel()
+                return
+            error = done.exception()
+            if error is None:
+                started, ok, outcome = done.result()
+            else:
+                # The worker itself failed, or fn raised a BaseException
+                started, ok, outcome = submitted, False, error
+            metrics._finished(submitted, started, not ok)
+            if future.set_running_or_notify_cancel():
+                if ok:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+
+        inner.add_done_callback(copy_outcome)
+        return future
+
+    def run_io(self, fn: Callable[..., Any], *args, **kwargs) -> MainLoopFuture:
+        """Run a blocking call, such as file or network I/O, on the "io" pool."""
+        return self.submit(IO_POOL, fn, *args, **kwargs)
+
+    def run_cpu(self, fn: Callable[..., Any], *args, **kwargs) -> MainLoopFuture:
+        """Run a CPU-bound, picklable callable on the "cpu" process pool."""
+        return self.submit(CPU_POOL, fn, *args, **kwargs)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return a metrics snapshot of every pool.
+
+        Returns:
+            PoolMetrics.snapshot() by pool name
+        """
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the running pools.
+
+        Args:
+            wait: Wait for running tasks to finish
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for executor in pools.values():
+            executor.shutdown(wait=wait)
+
+    def _pool(self, name: str) -> concurrent.futures.Executor:
+        """Return a pool, creating it on first use."""
+        executor = self._pools.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._pools.get(name)
+                if executor is None:
+                    if name not in self._factories:
+                        raise KeyError(f"Unknown pool '{name}'. "
+                                       f"Available pools: {list(self._factories)}")
+                    executor = self._pools[name] = self._factories[name]()
+        return executor
+
+
+def _process_pool(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Create the "cpu" pool without forking the app's threads.
+
+    A forked worker inherits locks held by the looper, logging and pool
+    threads with nobody left to release them, so workers are started by a
+    fork server, or spawned where that is unavailable.
+    """
+    import multiprocessing
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers, mp_context=multiprocessing.get_context(method))
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> tuple:
+    """Run fn in a worker.
+
+    Returns:
+        (started, ok, outcome): when fn started, and its result if ok is
+        True or the exception it raised otherwise
+    """
+    started = time.monotonic()
+    try:
+        return started, True, fn(*args, **kwargs)
+    except Exception as e:
+        return started, False, e
@@ -0,0 +1,134 @@
+"""Activity lifecycle states and observers.
+
+States are small integers so a transition is checked with one bit test
+against a table of allowed target states, precomputed from
+Activity.VALID_TRANSITIONS. Observers are kept in one listener tuple per
+state, holding only the callbacks an observer overrides, so moving to a
+state calls exactly the interested listeners.
+"""
+
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+class State(IntEnum):
+    """Lifecycle states of an activity."""
+
+    CREATED = 0
+    STARTED = 1
+    RESUMED = 2
+    PAUSED = 3
+    STOPPED = 4
+    DESTROYED = 5
+
+
+# Lowercase names, as used by Activity.state, indexed by state code
+STATE_NAMES: Tuple[str, ...] = tuple(state.name.lower() for state in State)
+STATE_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATE_NAMES)}
+
+# Observer callback for each state, indexed by state code
+_CALLBACK_NAMES = ("on_create", "on_start", "on_resume", "on_pause", "on_stop", "on_destroy")
+
+# States an observer added late is brought through, by the owner's current state
+REPLAY: Tuple[Tuple[int, ...], ...] = (
+    (State.CREATED,),
+    (State.CREATED, State.STARTED),
+    (State.CREATED, State.STARTED, State.RESUMED),
+    (State.CREATED, State.STARTED),
+    (State.CREATED,),
+    (),
+)
+
+
+def transition_masks(transitions: Dict[str, Sequence[str]]) -> Tuple[int, ...]:
+    """Build the allowed-transition bitmask of every state.
+
+    Args:
+        transitions: Allowed target state names by state name
+
+    Returns:
+        Tuple indexed by state code; bit n is set if state n may follow
+
+    Raises:
+        ValueError: If a state name is unknown
+    """
+    masks = [0] * len(STATE_NAMES)
+    for name, targets in transitions.items():
+        try:
+            masks[STATE_CODES[name]] = sum(1 << STATE_CODES[target] for target in set(targets))
+        except KeyError as e:
+            raise ValueError(f"Unknown lifecycle state {e.args[0]!r}") from None
+    return tuple(masks)
+
+
+class LifecycleObserver:
+    """Observes the lifecycle of an activity. Override the callbacks you need.
+
+    Each callback receives the activity. Observers are told about start and
+    resume after the activity's own on_start()/on_resume(), and about pause,
+    stop and destroy before its on_pause()/on_stop()/on_destroy().
+
+    Example:
+        >>> class LocationUpdates(LifecycleObserver):
+        ...     def on_resume(self, owner):
+        ...         gps.subscribe()
+        ...     def on_pause(self, owner):
+        ...         gps.unsubscribe()
+        >>> activity.add_observer(LocationUpdates())
+    """
+
+    def on_create(self, owner: Any) -> None:
+        """Called when the observer is added to an activity that is not destroyed."""
+        pass
+
+    def on_start(self, owner: Any) -> None:
+        """Called when the activity starts or restarts."""
+        pass
+
+    def on_resume(self, owner: Any) -> None:
+        """Called when the activity resumes."""
+        pass
+
+    def on_pause(self, owner: Any) -> None:
+        """Called when the activity pauses."""
+        pass
+
+    def on_stop(self, owner: Any) -> None:
+        """Called when the activity stops."""
+        pass
+
+    def on_destroy(self, owner: Any) -> None:
+        """Called when the activity is destroyed."""
+        pass
+
+
+# Overridden callbacks by observer class
+_OBSERVED: Dict[type, Tuple[Tuple[int, str], ...]] = {}
+
+
+def observed_callbacks(observer_type: type) -> Tuple[Tuple[int, str], ...]:
+    """Return (state code, callback name) for each callback a class overrides."""
+    callbacks = _OBSERVED.get(observer_type)
+    if callbacks is None:
+        callbacks = _OBSERVED[observer_type] = tuple(
+            (code, name) for code, name in enumerate(_CALLBACK_NAMES)
+            if getattr(observer_type, name) is not getattr(LifecycleObserver, name)
+        )
+    return callbacks
+
+
+def build_listeners(observers: Sequence[LifecycleObserver]
+                    ) -> Tuple[Tuple[Callable[[Any], Any], ...], ...]:
+    """Collect the overridden callbacks of observers into one tuple per state.
+
+    Args:
+        observers: Observers in registration order
+
+    Returns:
+        Tuple indexed by state code of the callbacks to call on entering it
+    """
+    listeners: List[List[Callable[[Any], Any]]] = [[] for _ in STATE_NAMES]
+    for observer in observers:
+        for code, name in observed_callbacks(type(observer)):
+            listeners[code].append(getattr(observer, name))
+    return tuple(tuple(callbacks) for callbacks in listeners)
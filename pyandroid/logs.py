@@ -0,0 +1,570 @@
+"""Shared, non-blocking logging pipeline behind pyandroid.utils.Logger.
+
+Every Logger hands its records to one QueueHandler. A single background
+thread takes them off the queue, formats them and writes them to the
+sinks, so logging from a click handler neither formats messages nor waits
+on the terminal or a file. The console is the default sink; add_sink()
+adds more. Keyword arguments given to Logger methods travel with the
+record as ``record.fields`` and are printed as key=value pairs.
+
+enable_logcat() also keeps the most recent records in memory, logcat
+style: a LogBuffer of fixed capacity that can be queried by tag, level
+and time, or dumped to a file after something went wrong. A FileLogSink
+writes records to disk in group commits, rotates the file by size and
+age and gzips old segments in the background; read_log_files() streams
+the records back.
+
+Example:
+    >>> logger = Logger("Sync")
+    >>> logger.info("Uploaded %d items", 12, account="alice")
+    >>> logcat = logs.enable_logcat()
+    >>> logcat.query(tag="PyAndroid.", level=logging.WARNING, since=time.monotonic() - 60)
+    >>> logs.add_sink(FileLogSink(FileManager("MyApp")))
+"""
+
+import array
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Core loggers are named PyAndroid.*; the console only prints their warnings
+CORE_LOGGER = "PyAndroid"
+_LEVEL_LETTERS = {logging.DEBUG: "D", logging.INFO: "I", logging.WARNING: "W",
+                  logging.ERROR: "E", logging.CRITICAL: "F"}
+
+
+class FieldsFormatter(logging.Formatter):
+    """Formatter appending a record's structured fields as key=value pairs."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return text
+
+
+def _console_filter(record: logging.LogRecord) -> bool:
+    """Keep core INFO and DEBUG records, queued for the log buffer, off the console."""
+    if record.levelno >= logging.WARNING:
+        return True
+    name = record.name
+    return not (name == CORE_LOGGER or name.startswith(CORE_LOGGER + "."))
+
+
+class LogEntry(NamedTuple):
+    """A record read back from a LogBuffer or a log file.
+
+    tag is the logger name. time is when the record was created: a
+    time.monotonic() value for LogBuffer entries, and a time.time() value
+    for entries read from log files.
+    """
+
+    time: float
+    level: int
+    tag: str
+    message: str
+
+
+class LogBuffer(logging.Handler):
+    """Keeps the most recent log records in a fixed-size ring.
+
+    Storage is allocated up front and never grows: each slot holds a
+    monotonic timestamp and level in typed arrays, an interned tag and the
+    formatted message. Adding a record overwrites the oldest one in O(1).
+    """
+
+    def __init__(self, capacity: int = 4096, level: int = logging.NOTSET) -> None:
+        """Initialize log buffer.
+
+        Args:
+            capacity: Number of records kept
+            level: Lowest level stored
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        super().__init__(level)
+        self.setFormatter(FieldsFormatter("%(message)s"))
+        self.capacity = capacity
+        self._times = array.array("d", bytes(8 * capacity))
+        self._levels = array.array("B", bytes(capacity))
+        self._tags: List[str] = [""] * capacity
+        self._messages: List[str] = [""] * capacity
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of records stored."""
+        return self._count
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # record.created is wall-clock time; convert it to the monotonic clock
+        created = time.monotonic() - (time.time() - record.created)
+        index = self._next
+        self._times[index] = created
+        self._levels[index] = min(record.levelno, 255)
+        self._tags[index] = sys.intern(record.name)
+        self._messages[index] = message
+        self._next = (index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self) -> None:
+        """Drop every stored record."""
+        with self.lock:
+            self._next = self._count = 0
+
+    def query(self, tag: Optional[str] = None, level: int = logging.NOTSET,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: Optional[int] = None) -> List[LogEntry]:
+        """Return stored records, oldest first.
+
+        Args:
+            tag: Only records whose logger name starts with this prefix
+            level: Only records at this level or above
+            since: Only records created at or after this time.monotonic() value
+            until: Only records created at or before this time.monotonic() value
+            limit: Only the most recent matching records, at most this many
+
+        Returns:
+            Matching log entries
+        """
+        with self.lock:
+            start = (self._next - self._count) % self.capacity
+            indexes = [(start + offset) % self.capacity for offset in range(self._count)]
+            rows = [(self._times[i], self._levels[i], self._tags[i], self._messages[i])
+                    for i in indexes]
+        tag_matches: Dict[str, bool] = {}
+        entries = []
+        for created, levelno, name, message in rows:
+            if levelno < level:
+                continue
+            if since is not None and created < since:
+                continue
+            if until is not None and created > until:
+                continue
+            if tag is not None:
+                matches = tag_matches.get(name)
+                if matches is None:
+                    matches = tag_matches[name] = name.startswith(tag)
+                if not matches:
+                    continue
+            entries.append(LogEntry(created, levelno, name, message))
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return entries
+
+    def dump(self, path: str, **filters: Any) -> int:
+        """Write stored records to a text file, one line per record.
+
+        Lines read "<monotonic seconds> <level letter>/<tag>: <message>".
+
+        Args:
+            path: File to write
+            **filters: query() arguments selecting the records
+
+        Returns:
+            Number of records written
+        """
+        entries = self.query(**filters)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                letter = _LEVEL_LETTERS.get(entry.level, "V")
+                f.write(f"{entry.time:12.3f} {letter}/{entry.tag}: {entry.message}\n")
+        return len(entries)
+
+
+class FileLogSink(logging.Handler):
+    """Writes records to rotating, gzip-compressed log files.
+
+    Records are buffered and written in one go once flush_bytes have
+    accumulated or flush_interval seconds after the first buffered record,
+    whichever comes first. The current file "<basename>.log" is rotated
+    once it would grow past max_bytes or is older than max_age; rotated
+    segments are named "<basename>.<sequence>.log" and compressed to
+    ".log.gz" on a background thread, keeping the newest backup_count.
+
+    Each line is a JSON object with the record's time, level, logger name
+    and message, so read_log_files() can stream the records back.
+    """
+
+    def __init__(self, file_manager: Any, basename: str = "app", subdir: str = "logs",
+                 max_bytes: int = 1024 * 1024, max_age: float = 24 * 3600.0,
+                 backup_count: int = 10, flush_bytes: int = 64 * 1024,
+                 flush_interval: float = 1.0, level: int = logging.NOTSET) -> None:
+        """Initialize file log sink.
+
+        Args:
+            file_manager: FileManager whose app directory holds the logs
+            basename: File name prefix of the log files
+            subdir: Subdirectory of the app directory holding the logs
+            max_bytes: Rotate before the current file grows past this size
+            max_age: Rotate the current file after this many seconds
+            backup_count: Compressed segments kept
+            flush_bytes: Write once this many bytes are buffered
+            flush_interval: Seconds a record may wait in the buffer
+            level: Lowest level written
+        """
+        super().__init__(level)
+        self.setFormatter(FieldsFormatter("%(message)s"))
+        self.directory = os.path.join(file_manager.get_app_directory(), subdir)
+        os.makedirs(self.directory, exist_ok=True)
+        self.basename = basename
+        self.path = os.path.join(self.directory, f"{basename}.log")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._buffer = bytearray()
+        self._file: Optional[Any] = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._compressors: List[threading.Thread] = []
+        segments = _log_segments(self.directory, basename)
+        self._sequence = segments[-1][0] if segments else 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        import json
+
+        try:
+            line = json.dumps({"time": record.created, "level": record.levelno,
+                               "tag": record.name, "message": self.format(record)},
+                              ensure_ascii=False, separators=(",", ":"))
+        except Exception:
+            self.handleError(record)
+            return
+        self._buffer += line.encode("utf-8") + b"\n"
+        if len(self._buffer) >= self.flush_bytes:
+            self._commit()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write buffered records now."""
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._buffer:
+                self._commit()
+
+    def close(self) -> None:
+        """Write buffered records, close the file and wait for compression."""
+        self.flush()
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            compressors, self._compressors = self._compressors, []
+        for thread in compressors:
+            thread.join()
+        super().close()
+
+    def read(self) -> Iterator[LogEntry]:
+        """Flush, then stream every record in the log files, oldest first."""
+        self.flush()
+        return read_log_files(self.directory, self.basename)
+
+    def _commit(self) -> None:
+        """Write the buffer in one call, rotating the file first if needed."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        try:
+            if self._file is None:
+                self._open()
+            if self._size and (self._size + len(data) > self.max_bytes
+                               or time.time() - self._opened_at >= self.max_age):
+                self._rotate()
+                self._open()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+        except OSError as e:
+            sys.stderr.write(f"PyAndroid: failed to write log file {self.path}: {e}\n")
+
+    def _open(self) -> None:
+        """Open the current file for appending.
+
+        A file left by an earlier run keeps its size and age, taken from its
+        first record (or its modification time if that cannot be read), so
+        restarting the app does not postpone rotation.
+        """
+        import json
+
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+        if self._size:
+            try:
+                with open(self.path, "rb") as f:
+                    self._opened_at = float(json.loads(f.readline())["time"])
+            except (ValueError, KeyError, TypeError):
+                self._opened_at = os.stat(self.path).st_mtime
+
+    def _rotate(self) -> None:
+        """Move the current file aside and compress it in the background."""
+        self._file.close()
+        self._file = None
+        self._sequence += 1
+        segment = os.path.join(self.directory, f"{self.basename}.{self._sequence:06d}.log")
+        os.replace(self.path, segment)
+        self._compressors = [thread for thread in self._compressors if thread.is_alive()]
+        thread = threading.Thread(target=self._compress, args=(segment,),
+                                  name="PyAndroid-log-compress", daemon=True)
+        self._compressors.append(thread)
+        thread.start()
+
+    def _compress(self, segment: str) -> None:
+        """Gzip a rotated segment, then drop the oldest beyond backup_count."""
+        import gzip
+        import shutil
+
+        try:
+            with open(segment, "rb") as source, gzip.open(f"{segment}.gz.tmp", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(f"{segment}.gz.tmp", f"{segment}.gz")
+            os.remove(segment)
+            compressed = [path for _, path in _log_segments(self.directory, self.basename)
+                          if path.endswith(".gz")]
+            for path in compressed[:max(0, len(compressed) - self.backup_count)]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Pruned by another compression thread
+                    pass
+        except OSError as e:
+            sys.stderr.write(f"PyAndroid: failed to compress log segment {segment}: {e}\n")
+
+
+def _log_segments(directory: str, basename: str) -> List[Tuple[int, str]]:
+    """Return (sequence, path) of the rotated segments, oldest first.
+
+    A segment that is both compressed and not yet deleted is listed once,
+    as the finished .gz file.
+    """
+    import re
+
+    pattern = re.compile(re.escape(basename) + r"\.(\d+)\.log(\.gz)?$")
+    segments: Dict[int, str] = {}
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match is None:
+            continue
+        sequence = int(match.group(1))
+        if match.group(2) or sequence not in segments:
+            segments[sequence] = os.path.join(directory, name)
+    return sorted(segments.items())
+
+
+def read_log_files(directory: str, basename: str = "app") -> Iterator[LogEntry]:
+    """Stream the records written by a FileLogSink, oldest first.
+
+    Compressed segments are decompressed while reading. Lines that cannot
+    be parsed, such as one cut short by a crash, are skipped.
+
+    Args:
+        directory: Directory holding the log files
+        basename: File name prefix of the log files
+
+    Yields:
+        Log entries whose time is a time.time() value
+    """
+    import gzip
+    import json
+
+    paths = [path for _, path in _log_segments(directory, basename)]
+    current = os.path.join(directory, f"{basename}.log")
+    if os.path.exists(current):
+        paths.append(current)
+    for path in paths:
+        if not path.endswith(".gz") and path != current and not os.path.exists(path):
+            # Compressed after we listed the directory
+            path += ".gz"
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        yield LogEntry(record["time"], record["level"], record["tag"],
+                                       record["message"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except (OSError, EOFError):
+            # Removed by backup_count pruning, or a damaged segment
+            continue
+
+
+class _FlushRequest:
+    """Queue marker set once every record queued before it was written."""
+
+    __slots__ = ("done",)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class RecordQueueHandler(QueueHandler):
+    """Queues records without formatting them; the writer thread formats.
+
+    The stock QueueHandler formats every record on the logging thread.
+    Only a traceback is turned into text here, while it is still current.
+    Arguments are formatted later, so they should not be mutated after
+    logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class LogWriter(QueueListener):
+    """The background thread writing queued records to the sinks."""
+
+    def handle(self, record: Any) -> None:
+        if isinstance(record, _FlushRequest):
+            for handler in self.handlers:
+                handler.flush()
+            record.done.set()
+            return
+        super().handle(record)
+
+
+_lock = threading.Lock()
+_queue_handler: Optional[RecordQueueHandler] = None
+_writer: Optional[LogWriter] = None
+_logcat: Optional[LogBuffer] = None
+
+
+def queue_handler() -> RecordQueueHandler:
+    """Return the shared QueueHandler, starting the writer thread on first use."""
+    global _queue_handler, _writer
+    with _lock:
+        if _queue_handler is None:
+            records: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+            console = logging.StreamHandler()
+            console.setFormatter(FieldsFormatter(LOG_FORMAT))
+            console.addFilter(_console_filter)
+            _writer = LogWriter(records, console, respect_handler_level=True)
+            _writer.start()
+            atexit.register(_writer.stop)
+            _queue_handler = RecordQueueHandler(records)
+    return _queue_handler
+
+
+def add_sink(handler: logging.Handler) -> None:
+    """Write every logged record to another handler as well.
+
+    The handler runs on the writer thread.
+
+    Args:
+        handler: logging.Handler to add; adding it twice has no effect
+    """
+    queue_handler()
+    with _lock:
+        if handler not in _writer.handlers:
+            _writer.handlers = _writer.handlers + (handler,)
+
+
+def remove_sink(handler: logging.Handler) -> bool:
+    """Stop writing records to a handler.
+
+    Args:
+        handler: Handler passed to add_sink()
+
+    Returns:
+        True if the handler was a sink, False otherwise
+    """
+    with _lock:
+        if _writer is None or handler not in _writer.handlers:
+            return False
+        _writer.handlers = tuple(entry for entry in _writer.handlers if entry is not handler)
+        return True
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Wait until every record logged so far has been written.
+
+    Args:
+        timeout: Seconds to wait at most; None waits indefinitely
+
+    Returns:
+        True if the records were written, False on timeout
+    """
+    if _queue_handler is None:
+        return True
+    request = _FlushRequest()
+    _queue_handler.queue.put(request)
+    return request.done.wait(timeout)
+
+
+def enable_logcat(capacity: int = 4096, core_level: int = logging.INFO) -> LogBuffer:
+    """Keep recent records of Logger and the PyAndroid.* core loggers in memory.
+
+    Core loggers are routed through the queue as well; the console still
+    only prints their warnings and errors.
+
+    Args:
+        capacity: Number of records kept; ignored if logcat is already enabled
+        core_level: Level given to the PyAndroid logger if it has none set
+
+    Returns:
+        The LogBuffer, also available as logs.logcat()
+    """
+    global _logcat
+    handler = queue_handler()
+    with _lock:
+        if _logcat is None:
+            _logcat = LogBuffer(capacity)
+        buffer = _logcat
+    add_sink(buffer)
+    core = logging.getLogger(CORE_LOGGER)
+    core.addHandler(handler)
+    if core.level == logging.NOTSET:
+        core.setLevel(core_level)
+    return buffer
+
+
+def disable_logcat() -> bool:
+    """Stop collecting records in the log buffer.
+
+    Returns:
+        True if logcat was enabled, False otherwise
+    """
+    global _logcat
+    with _lock:
+        buffer, _logcat = _logcat, None
+    if buffer is None:
+        return False
+    remove_sink(buffer)
+    logging.getLogger(CORE_LOGGER).removeHandler(queue_handler())
+    return True
+
+
+def logcat() -> Optional[LogBuffer]:
+    """Return the log buffer enabled by enable_logcat(), if any."""
+    return _logcat
@@ -0,0 +1,448 @@
+"""Main-thread message loop for PyAndroid applications.
+
+Mirrors Android's ``Looper``/``Handler``/``Message`` trio. A Looper owns a
+queue of messages ordered by the time they are due; a Handler posts
+callbacks or messages to a looper and handles them when they come up.
+Delayed messages wait in a heap, so posting and dispatching cost
+O(log n) no matter how many timers are pending, and Message objects are
+recycled through a small pool. Any thread may post to a looper.
+
+Times are in milliseconds on the uptime_millis() clock.
+
+Example:
+    >>> looper = Looper()
+    >>> handler = Handler(looper)
+    >>> handler.post_delayed(lambda: print("tick"), 100)
+    >>> looper.run_until_idle()
+    tick
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+
+def uptime_millis() -> float:
+    """Return milliseconds on a monotonic clock, as used by Looper."""
+    return time.monotonic() * 1000.0
+
+
+class Message:
+    """A message or callback queued on a Looper.
+
+    Use Message.obtain() or Handler.obtain_message() rather than the
+    constructor so instances are reused from the pool.
+    """
+
+    __slots__ = ("what", "arg1", "arg2", "obj", "callback", "target", "token", "when")
+
+    MAX_POOL_SIZE = 50
+    _pool: List["Message"] = []
+
+    def __init__(self) -> None:
+        """Initialize an empty message."""
+        self.what = 0
+        self.arg1 = 0
+        self.arg2 = 0
+        self.obj: Any = None
+        self.callback: Optional[Callable[[], Any]] = None
+        self.target: Optional["Handler"] = None
+        self.token: Any = None
+        self.when = 0.0
+
+    @classmethod
+    def obtain(cls, target: Optional["Handler"] = None, what: int = 0, arg1: int = 0,
+               arg2: int = 0, obj: Any = None,
+               callback: Optional[Callable[[], Any]] = None) -> "Message":
+        """Get a message from the pool, or a new one if the pool is empty.
+
+        Args:
+            target: Handler that will handle the message
+            what: Message code
+            arg1: First integer argument
+            arg2: Second integer argument
+            obj: Arbitrary payload
+            callback: Callable to run instead of Handler.handle_message()
+
+        Returns:
+            Message instance
+        """
+        try:
+            message = cls._pool.pop()
+        except IndexError:
+            message = cls()
+        message.target = target
+        message.what = what
+        message.arg1 = arg1
+        message.arg2 = arg2
+        message.obj = obj
+        message.callback = callback
+        return message
+
+    def recycle(self) -> None:
+        """Clear the message and return it to the pool.
+
+        The message must not be used after it is recycled.
+        """
+        self.what = self.arg1 = self.arg2 = 0
+        self.obj = self.callback = self.target = self.token = None
+        self.when = 0.0
+        if len(Message._pool) < Message.MAX_POOL_SIZE:
+            Message._pool.append(self)
+
+
+class Looper:
+    """Runs messages from a time-ordered queue on one thread.
+
+    The looper belongs to the thread that created it. Messages posted from
+    other threads are queued the same way and wake the loop if it is
+    waiting for work.
+    """
+
+    def __init__(self, clock: Callable[[], float] = uptime_millis) -> None:
+        """Initialize looper.
+
+        Args:
+            clock: Function returning the current time in milliseconds
+        """
+        self.clock = clock
+        self.thread_id = threading.get_ident()
+        self.logger = logging.getLogger("PyAndroid.Looper")
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._quitting = False
+
+    def is_current_thread(self) -> bool:
+        """Check whether the caller is running on this looper's thread."""
+        return threading.get_ident() == self.thread_id
+
+    def enqueue(self, message: Message, when: float) -> bool:
+        """Queue a message to be dispatched at a given time.
+
+        Args:
+            message: Message with a target handler
+            when: Uptime in milliseconds at which the message is due
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        message.when = when
+        with self._lock:
+            if self._quitting:
+                message.recycle()
+                return False
+            heapq.heappush(self._queue, (when, next(self._sequence), message))
+            self._wakeup.notify()
+        return True
+
+    def remove_messages(self, handler: "Handler", token: Any = None,
+                        what: Optional[int] = None) -> int:
+        """Remove queued messages of a handler.
+
+        Args:
+            handler: Handler whose messages to remove
+            token: Only remove messages posted with this token; None matches all
+            what: Only remove messages with this code; None matches all
+
+        Returns:
+            Number of messages removed
+        """
+        removed = []
+        with self._lock:
+            kept = []
+            for entry in self._queue:
+                message = entry[2]
+                if (message.target is handler
+                        and (token is None or message.token is token)
+                        and (what is None or message.what == what)):
+                    removed.append(message)
+                else:
+                    kept.append(entry)
+            if removed:
+                heapq.heapify(kept)
+                self._queue = kept
+        for message in removed:
+            message.recycle()
+        return len(removed)
+
+    def has_messages(self, handler: "Handler", token: Any = None) -> bool:
+        """Check whether a handler has queued messages.
+
+        Args:
+            handler: Handler to check
+            token: Only count messages posted with this token; None matches all
+
+        Returns:
+            True if at least one message is queued
+        """
+        with self._lock:
+            return any(entry[2].target is handler and (token is None or entry[2].token is token)
+                       for entry in self._queue)
+
+    def pending_count(self) -> int:
+        """Return the number of queued messages."""
+        return len(self._queue)
+
+    def run_pending(self) -> int:
+        """Dispatch every message that is due now, without waiting.
+
+        Messages posted while running are dispatched too if already due.
+        This is the hook for embedding the loop in another event loop.
+
+        Returns:
+            Number of messages dispatched
+        """
+        count = 0
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > self.clock():
+                    return count
+                message = heapq.heappop(self._queue)[2]
+            self._dispatch(message)
+            count += 1
+
+    def run_until_idle(self) -> int:
+        """Dispatch messages, waiting for delayed ones, until the queue is empty.
+
+        Returns:
+            Number of messages dispatched
+        """
+        return self._run(until_idle=True)
+
+    def loop(self) -> None:
+        """Dispatch messages until quit() is called, waiting for new work."""
+        self._run(until_idle=False)
+
+    def quit(self) -> None:
+        """Stop the loop and drop any messages still queued.
+
+        May be called from any thread.
+        """
+        with self._lock:
+            self._quitting = True
+            queue, self._queue = self._queue, []
+            self._wakeup.notify()
+        for _, _, message in queue:
+            message.recycle()
+
+    def _run(self, until_idle: bool) -> int:
+        """Run the loop, returning when idle or when quit() is called."""
+        if not self.is_current_thread():
+            raise RuntimeError("Looper can only run on the thread that created it")
+        count = 0
+        while True:
+            with self._lock:
+                while True:
+                    if self._quitting:
+                        return count
+                    if self._queue:
+                        delay = self._queue[0][0] - self.clock()
+                        if delay <= 0:
+                            message = heapq.heappop(self._queue)[2]
+                            break
+                        self._wakeup.wait(delay / 1000.0)
+                    elif until_idle:
+                        return count
+                    else:
+                        self._wakeup.wait()
+            self._dispatch(message)
+            count += 1
+
+    def _dispatch(self, message: Message) -> None:
+        """Hand a message to its target, then recycle it."""
+        try:
+            message.target.dispatch_message(message)
+        except Exception:
+            self.logger.exception(f"Error while dispatching message {message.what}")
+        finally:
+            message.recycle()
+
+
+class Handler:
+    """Posts work to a Looper and handles its messages.
+
+    Example:
+        >>> class CounterHandler(Handler):
+        ...     def handle_message(self, message):
+        ...         print("count", message.arg1)
+        >>> handler = CounterHandler(looper)
+        >>> handler.send_message(handler.obtain_message(what=1, arg1=5))
+        >>> handler.post_delayed(refresh, 500, token="refresh")
+        >>> handler.remove_callbacks_and_messages("refresh")
+    """
+
+    def __init__(self, looper: Looper,
+                 callback: Optional[Callable[[Message], Any]] = None) -> None:
+        """Initialize handler.
+
+        Args:
+            looper: Looper whose thread runs this handler's messages
+            callback: Optional function handling messages instead of
+                handle_message()
+        """
+        self.looper = looper
+        self.callback = callback
+
+    def obtain_message(self, what: int = 0, arg1: int = 0, arg2: int = 0,
+                       obj: Any = None) -> Message:
+        """Get a pooled message targeting this handler.
+
+        Args:
+            what: Message code
+            arg1: First integer argument
+            arg2: Second integer argument
+            obj: Arbitrary payload
+
+        Returns:
+            Message instance
+        """
+        return Message.obtain(self, what, arg1, arg2, obj)
+
+    def post(self, callback: Callable[[], Any], token: Any = None) -> bool:
+        """Run a callback on the looper thread as soon as possible.
+
+        Args:
+            callback: Callable taking no arguments
+            token: Optional token for remove_callbacks_and_messages()
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        return self.post_at_time(callback, self.looper.clock(), token)
+
+    def post_delayed(self, callback: Callable[[], Any], delay_ms: float,
+                     token: Any = None) -> bool:
+        """Run a callback after a delay.
+
+        Args:
+            callback: Callable taking no arguments
+            delay_ms: Delay in milliseconds
+            token: Optional token for remove_callbacks_and_messages()
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        return self.post_at_time(callback, self.looper.clock() + max(delay_ms, 0), token)
+
+    def post_at_time(self, callback: Callable[[], Any], uptime_ms: float,
+                     token: Any = None) -> bool:
+        """Run a callback at an absolute time.
+
+        Args:
+            callback: Callable taking no arguments
+            uptime_ms: Time on the looper's clock, in milliseconds
+            token: Optional token for remove_callbacks_and_messages()
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        message = Message.obtain(self, callback=callback)
+        message.token = token
+        return self.looper.enqueue(message, uptime_ms)
+
+    def send_message(self, message: Message) -> bool:
+        """Queue a message to be handled as soon as possible.
+
+        Args:
+            message: Message, usually from obtain_message()
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        return self.send_message_at_time(message, self.looper.clock())
+
+    def send_message_delayed(self, message: Message, delay_ms: float) -> bool:
+        """Queue a message to be handled after a delay.
+
+        Args:
+            message: Message, usually from obtain_message()
+            delay_ms: Delay in milliseconds
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        return self.send_message_at_time(message, self.looper.clock() + max(delay_ms, 0))
+
+    def send_message_at_time(self, message: Message, uptime_ms: float) -> bool:
+        """Queue a message to be handled at an absolute time.
+
+        Args:
+            message: Message, usually from obtain_message()
+            uptime_ms: Time on the looper's clock, in milliseconds
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        message.target = self
+        return self.looper.enqueue(message, uptime_ms)
+
+    def send_empty_message(self, what: int) -> bool:
+        """Queue a message carrying only a code.
+
+        Args:
+            what: Message code
+
+        Returns:
+            True if queued, False if the looper is quitting
+        """
+        return self.send_message(self.obtain_message(what))
+
+    def remove_callbacks_and_messages(self, token: Any = None) -> int:
+        """Remove queued callbacks and messages posted with a token.
+
+        Args:
+            token: Token passed when posting; None removes everything
+                queued by this handler
+
+        Returns:
+            Number of messages removed
+        """
+        return self.looper.remove_messages(self, token)
+
+    def remove_messages(self, what: int) -> int:
+        """Remove queued messages with a given code.
+
+        Args:
+            what: Message code
+
+        Returns:
+            Number of messages removed
+        """
+        return self.looper.remove_messages(self, what=what)
+
+    def has_messages(self, token: Any = None) -> bool:
+        """Check whether this handler has queued work.
+
+        Args:
+            token: Only count work posted with this token; None matches all
+
+        Returns:
+            True if anything is queued
+        """
+        return self.looper.has_messages(self, token)
+
+    def dispatch_message(self, message: Message) -> None:
+        """Run a message's callback or pass it to the message handler.
+
+        Args:
+            message: Message taken off the queue
+        """
+        if message.callback is not None:
+            message.callback()
+        elif self.callback is not None:
+            self.callback(message)
+        else:
+            self.handle_message(message)
+
+    def handle_message(self, message: Message) -> None:
+        """Handle a message. Override in subclasses.
+
+        Args:
+            message: Message to handle
+        """
+        pass
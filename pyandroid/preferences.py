@@ -0,0 +1,297 @@
+"""Key/value settings with an in-memory cache, modeled on Android's SharedPreferences.
+
+Each SharedPreferences object is one JSON file read once, on first access;
+every read after that comes from memory. Edits are collected in an Editor.
+Editor.commit() writes the file before returning. Editor.apply() updates
+memory right away and leaves the write to a background timer, so edits
+applied in quick succession cost a single write; edits still pending when
+the interpreter exits are written by an atexit hook. FileManager replaces the
+file atomically, so a crash never leaves a half-written file behind.
+
+Example:
+    >>> prefs = FileManager("MyApp").get_shared_preferences("settings")
+    >>> prefs.edit().put("dark_mode", True).apply()
+    >>> prefs.get("dark_mode", False)
+    True
+"""
+
+import atexit
+import json
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from .utils import FileManager
+
+_VALUE_TYPES = (str, int, float, bool, list)
+_MISSING = object()
+
+OnChangeListener = Callable[["SharedPreferences", Optional[str]], Any]
+
+# Every live SharedPreferences, flushed at interpreter exit
+_instances: "weakref.WeakSet[SharedPreferences]" = weakref.WeakSet()
+
+
+def _flush_all() -> None:
+    """Write the edits applied but not yet written by every preferences object."""
+    for preferences in list(_instances):
+        preferences.flush()
+
+
+atexit.register(_flush_all)
+
+
+class SharedPreferences:
+    """Cached key/value settings persisted as a JSON file.
+
+    Use FileManager.get_shared_preferences() rather than creating one
+    directly, so every caller shares the same cache. Safe to use from
+    several threads.
+    """
+
+    def __init__(self, file_manager: FileManager, name: str, subdir: str = "shared_prefs",
+                 flush_delay: float = 0.1) -> None:
+        """Initialize preferences.
+
+        Args:
+            file_manager: FileManager used to read and write the file
+            name: Preferences name; the file is "<name>.json"
+            subdir: Subdirectory of the app directory holding the file
+            flush_delay: Seconds apply() waits for more edits before writing
+        """
+        self.file_manager = file_manager
+        self.name = name
+        self.subdir = subdir
+        self.flush_delay = flush_delay
+        self.filename = f"{name}.json"
+        self._values: Optional[Dict[str, Any]] = None
+        self._listeners: List[OnChangeListener] = []
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        # Bumped by every edit that changes a value; the file holds _written
+        self._generation = 0
+        self._written = 0
+        self._timer: Optional[threading.Timer] = None
+        _instances.add(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value.
+
+        Args:
+            key: Preference key
+            default: Returned if the key is not set
+
+        Returns:
+            Stored value or default; lists are returned as copies
+        """
+        value = self._load().get(key, default)
+        return list(value) if isinstance(value, list) else value
+
+    def get_all(self) -> Dict[str, Any]:
+        """Return a copy of every stored value."""
+        with self._lock:
+            return {key: list(value) if isinstance(value, list) else value
+                    for key, value in self._load().items()}
+
+    def contains(self, key: str) -> bool:
+        """Check whether a key is set."""
+        return key in self._load()
+
+    __contains__ = contains
+
+    def edit(self) -> "Editor":
+        """Start a batch of changes.
+
+        Returns:
+            Editor whose changes take effect on apply() or commit()
+        """
+        return Editor(self)
+
+    def register_on_change_listener(self, listener: OnChangeListener) -> None:
+        """Call listener(prefs, key) for each key an edit changes.
+
+        The key is None when an edit clears the preferences. Listeners run
+        on the thread calling apply() or commit().
+
+        Args:
+            listener: Callable taking the preferences and the changed key
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners = self._listeners + [listener]
+
+    def unregister_on_change_listener(self, listener: OnChangeListener) -> bool:
+        """Stop calling a listener.
+
+        Args:
+            listener: Registered listener
+
+        Returns:
+            True if the listener was registered, False otherwise
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                return False
+            self._listeners = [entry for entry in self._listeners if entry is not listener]
+            return True
+
+    def flush(self) -> bool:
+        """Write pending applied changes now.
+
+        Returns:
+            True if the file is up to date, False if writing failed
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return self._write()
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the cached values, reading the file on first use."""
+        values = self._values
+        if values is None:
+            with self._lock:
+                if self._values is None:
+                    self._values = self._read()
+                values = self._values
+        return values
+
+    def _read(self) -> Dict[str, Any]:
+        """Read the preferences file; a missing or corrupt file reads as empty."""
+        data = self.file_manager.read_bytes(self.filename, self.subdir)
+        if data is None:
+            return {}
+        try:
+            values = json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            self.file_manager.logger.error(f"Ignoring corrupt preferences {self.filename}: {e}")
+            return {}
+        return values if isinstance(values, dict) else {}
+
+    def _commit_edits(self, edits: Dict[str, Any], removed: List[str],
+                      clear: bool) -> List[Optional[str]]:
+        """Apply an editor's changes to memory and return the changed keys."""
+        with self._lock:
+            values = self._load()
+            changed: List[Optional[str]] = []
+            if clear and values:
+                values.clear()
+                changed.append(None)
+            for key in removed:
+                if key in values and key not in edits:
+                    del values[key]
+                    changed.append(key)
+            for key, value in edits.items():
+                old = values.get(key, _MISSING)
+                if old is _MISSING or old != value or type(old) is not type(value):
+                    values[key] = value
+                    changed.append(key)
+            if changed:
+                self._generation += 1
+            listeners = self._listeners
+        for key in changed:
+            for listener in listeners:
+                try:
+                    listener(self, key)
+                except Exception as e:
+                    self.file_manager.logger.error(
+                        f"Preference listener failed for {self.name}.{key}: {e}")
+        return changed
+
+    def _schedule_write(self) -> None:
+        """Write after flush_delay, unless a write is already scheduled."""
+        with self._lock:
+            if self._timer is not None or self._generation == self._written:
+                return
+            self._timer = threading.Timer(self.flush_delay, self._write_scheduled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write_scheduled(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._write()
+
+    def _write(self) -> bool:
+        """Write the cached values atomically unless the file is current."""
+        with self._write_lock:
+            with self._lock:
+                generation = self._generation
+                if generation == self._written:
+                    return True
+                data = json.dumps(self._values, ensure_ascii=False,
+                                  separators=(",", ":")).encode("utf-8")
+            # FileManager replaces the file atomically
+            if not self.file_manager.write_bytes(self.filename, data, self.subdir):
+                return False
+            with self._lock:
+                self._written = max(self._written, generation)
+            return True
+
+
+class Editor:
+    """A batch of preference changes.
+
+    Puts and removes are recorded in order; clear() empties the preferences
+    before the other changes are applied, whatever the order of the calls.
+    """
+
+    def __init__(self, preferences: SharedPreferences) -> None:
+        """Initialize editor.
+
+        Args:
+            preferences: Preferences the changes are applied to
+        """
+        self.preferences = preferences
+        self._edits: Dict[str, Any] = {}
+        self._removed: List[str] = []
+        self._clear = False
+
+    def put(self, key: str, value: Any) -> "Editor":
+        """Set a value.
+
+        Args:
+            key: Preference key
+            value: String, number, bool or list of JSON-compatible values
+
+        Returns:
+            This editor, for chaining
+
+        Raises:
+            TypeError: If the value cannot be stored
+        """
+        if not isinstance(value, _VALUE_TYPES):
+            raise TypeError(f"Unsupported preference type for '{key}': "
+                            f"{type(value).__name__}")
+        self._edits[key] = list(value) if isinstance(value, list) else value
+        return self
+
+    def remove(self, key: str) -> "Editor":
+        """Remove a key. Returns this editor."""
+        self._edits.pop(key, None)
+        self._removed.append(key)
+        return self
+
+    def clear(self) -> "Editor":
+        """Remove every key, before this editor's other changes. Returns this editor."""
+        self._clear = True
+        return self
+
+    def apply(self) -> None:
+        """Apply the changes in memory now and write them in the background.
+
+        Changes applied within the preferences' flush_delay are written
+        together.
+        """
+        self.preferences._commit_edits(self._edits, self._removed, self._clear)
+        self.preferences._schedule_write()
+
+    def commit(self) -> bool:
+        """Apply the changes and write the file before returning.
+
+        Returns:
+            True if the file was written, False otherwise
+        """
+        self.preferences._commit_edits(self._edits, self._removed, self._clear)
+        return self.preferences.flush()
@@ -0,0 +1,212 @@
+"""Coroutine scopes tied to an activity's lifecycle.
+
+Coroutines launched in an activity's lifecycle_scope run on a background
+asyncio event loop shared by the process, so they never block the main
+looper. Their results are posted back to the app's main looper. Every
+task still running when the activity is destroyed is cancelled, and a
+result that arrives after that is dropped. Tasks launched with
+``suspend_on_pause=True`` also stop at their next await while the activity
+is paused or stopped, and continue when it resumes.
+
+Example:
+    >>> class FeedActivity(Activity):
+    ...     def on_start(self):
+    ...         self.lifecycle_scope.launch(fetch_feed(), on_result=self.show_feed)
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Coroutine, List, Optional, Set
+
+from .lifecycle import LifecycleObserver
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="PyAndroid-async",
+                                      daemon=True)
+            thread.start()
+            _loop = loop
+    return _loop
+
+
+class _Gate:
+    """Lets suspendable tasks run only while open. Used on the event loop thread."""
+
+    def __init__(self, is_open: bool) -> None:
+        self.is_open = is_open
+        self._waiters: List[asyncio.Future] = []
+
+    def set_open(self, is_open: bool) -> None:
+        self.is_open = is_open
+        if is_open:
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def wait(self) -> asyncio.Future:
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+
+class _Suspendable:
+    """Runs a coroutine one step at a time, waiting for the gate before each step.
+
+    An exception raised into the task, such as a cancellation, is thrown
+    into the coroutine at once, and a cancelled coroutine runs its cleanup
+    without waiting for the gate.
+    """
+
+    def __init__(self, coroutine: Coroutine, gate: _Gate) -> None:
+        self.coroutine = coroutine
+        self.gate = gate
+
+    def __await__(self):
+        coroutine = self.coroutine
+        error: Optional[BaseException] = None
+        cancelled = False
+        while True:
+            if error is None and not cancelled and not self.gate.is_open:
+                try:
+                    yield from self.gate.wait().__await__()
+                except BaseException as e:
+                    # Cancelled while suspended; let the coroutine clean up
+                    error = e
+            try:
+                if error is not None:
+                    cancelled = cancelled or isinstance(error, asyncio.CancelledError)
+                    step = coroutine.throw(error)
+                else:
+                    step = coroutine.send(None)
+            except StopIteration as stop:
+                return stop.value
+            error = None
+            try:
+                yield step
+            except BaseException as e:
+                error = e
+
+
+class LifecycleScope(LifecycleObserver):
+    """Launches coroutines that live no longer than an activity.
+
+    Use Activity.lifecycle_scope rather than creating scopes directly.
+    """
+
+    def __init__(self, owner: Any, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Initialize scope.
+
+        Args:
+            owner: Activity whose lifecycle bounds the scope
+            loop: Event loop running the coroutines; defaults to the shared
+                background loop
+        """
+        self.owner = owner
+        self.loop = loop if loop is not None else background_loop()
+        self.closed = False
+        self._gate = _Gate(owner.state == "resumed")
+        self._jobs: Set[concurrent.futures.Future] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of tasks still running."""
+        return len(self._jobs)
+
+    def launch(self, coroutine: Coroutine,
+               on_result: Optional[Callable[[Any], Any]] = None,
+               on_error: Optional[Callable[[BaseException], Any]] = None,
+               suspend_on_pause: bool = False) -> concurrent.futures.Future:
+        """Run a coroutine on the background event loop.
+
+        on_result and on_error are called on the main looper of the owner's
+        app, or on the event loop thread if the activity has no app. They
+        are not called once the activity is destroyed.
+
+        Args:
+            coroutine: Coroutine object to run
+            on_result: Called with the coroutine's return value
+            on_error: Called with the exception it raised; errors are logged
+                if omitted
+            suspend_on_pause: Only run while the activity is resumed
+
+        Returns:
+            Future of the coroutine's result; cancel() cancels the task
+        """
+        if self.closed:
+            coroutine.close()
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.cancel()
+            return future
+        if suspend_on_pause:
+            coroutine = _Suspendable(coroutine, self._gate)
+        future = asyncio.run_coroutine_threadsafe(_await(coroutine), self.loop)
+        with self._lock:
+            self._jobs.add(future)
+        future.add_done_callback(lambda done: self._on_done(done, on_result, on_error))
+        return future
+
+    def cancel(self) -> int:
+        """Cancel every running task.
+
+        Returns:
+            Number of tasks cancelled
+        """
+        with self._lock:
+            jobs, self._jobs = self._jobs, set()
+        return sum(job.cancel() for job in jobs)
+
+    def on_resume(self, owner: Any) -> None:
+        self.loop.call_soon_threadsafe(self._gate.set_open, True)
+
+    def on_pause(self, owner: Any) -> None:
+        self.loop.call_soon_threadsafe(self._gate.set_open, False)
+
+    def on_destroy(self, owner: Any) -> None:
+        self.closed = True
+        self.cancel()
+        # Release suspended tasks; the cancellations above reach them first
+        self.loop.call_soon_threadsafe(self._gate.set_open, True)
+
+    def _on_done(self, future: concurrent.futures.Future,
+                 on_result: Optional[Callable[[Any], Any]],
+                 on_error: Optional[Callable[[BaseException], Any]]) -> None:
+        """Hand a finished task's outcome to the main looper."""
+        with self._lock:
+            self._jobs.discard(future)
+        if future.cancelled() or self.closed:
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is None:
+                self.owner.logger.error("Task in lifecycle scope failed", exc_info=error)
+                return
+            callback, value = on_error, error
+        elif on_result is not None:
+            callback, value = on_result, future.result()
+        else:
+            return
+        app = self.owner.app
+        if app is None:
+            self._deliver(callback, value)
+        else:
+            app.handler.post(lambda: self._deliver(callback, value))
+
+    def _deliver(self, callback: Callable[[Any], Any], value: Any) -> None:
+        """Call a result callback unless the scope was closed meanwhile."""
+        if not self.closed:
+            callback(value)
+
+
+async def _await(awaitable: Any) -> Any:
+    """Wrap an awaitable in a coroutine for run_coroutine_threadsafe()."""
+    return await awaitable
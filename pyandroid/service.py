@@ -0,0 +1,304 @@
+"""Services: components that run work without a screen.
+
+A Service is registered on an AndroidApp and lives independently of
+activities. Each running service owns a worker thread with its own Looper:
+commands sent with AndroidApp.start_service() are handled there one at a
+time by on_start_command(), and calls made through the Binder returned by
+AndroidApp.bind_service() run there too. Calls to a method decorated with
+@batched that queue up while the worker is busy are executed together, in
+one call receiving the list of requests.
+
+on_create(), on_bind(), on_unbind() and on_destroy() run on the main
+looper; on_start_command() and binder calls run on the worker thread.
+
+Example:
+    >>> class SyncService(Service):
+    ...     def on_start_command(self, intent, start_id):
+    ...         sync_account(intent.get_extra("account"))
+    ...         self.stop_self(start_id)
+    ...
+    ...     @batched
+    ...     def fetch(self, item_ids):
+    ...         return api.fetch_many(item_ids)
+    >>> app.register_service("sync", SyncService)
+    >>> app.start_service("sync", account="alice")
+    >>> app.bind_service("sync").call("fetch", 42).add_done_callback(show_item)
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .executor import MainLoopFuture
+from .looper import Handler, Looper
+
+
+def batched(method: Callable[[Any, List[Any]], List[Any]]) -> Callable[[Any, List[Any]], List[Any]]:
+    """Mark a service method as taking a list of requests and returning a list of results.
+
+    Each Binder.call() passes one request; calls queued before the worker
+    gets to them are combined into a single invocation.
+    """
+    method._batched = True
+    return method
+
+
+class Binder:
+    """Client interface of a bound service.
+
+    Calls run on the service's worker thread and return futures whose
+    done callbacks run on the main looper.
+    """
+
+    def __init__(self, service: "Service") -> None:
+        """Initialize binder.
+
+        Args:
+            service: Service the calls are made on
+        """
+        self.service = service
+        self._pending: Dict[str, List[Tuple[Any, MainLoopFuture]]] = {}
+        # Futures of calls the worker has not picked up yet
+        self._waiting: Set[MainLoopFuture] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def call(self, method: str, *args, **kwargs) -> MainLoopFuture:
+        """Call a service method on its worker thread.
+
+        Args:
+            method: Name of the service method
+            *args: Arguments; a @batched method takes exactly one request
+            **kwargs: Keyword arguments, not allowed for @batched methods
+
+        Returns:
+            Future of the method's result, failing with RuntimeError if the
+            service stops before the call runs
+
+        Raises:
+            AttributeError: If the service has no such method
+            TypeError: If a @batched method is not called with one request
+        """
+        function = getattr(self.service, method)
+        batched_call = getattr(function, "_batched", False)
+        if batched_call and (len(args) != 1 or kwargs):
+            raise TypeError(f"Batched method '{method}' takes exactly one request")
+        future = MainLoopFuture(self.service.app.handler)
+        with self._lock:
+            if self._closed:
+                _fail(future, self.service.name)
+                return future
+            self._waiting.add(future)
+            if batched_call:
+                pending = self._pending.setdefault(method, [])
+                pending.append((args[0], future))
+                if len(pending) > 1:
+                    return future
+        if batched_call:
+            posted = self.service.handler.post(lambda: self._run_batch(method, function))
+        else:
+            posted = self.service.handler.post(lambda: self._run(future, function, args, kwargs))
+        if not posted:
+            self._close()
+        return future
+
+    def _run(self, future: MainLoopFuture, function: Callable[..., Any], args: tuple,
+             kwargs: Dict[str, Any]) -> None:
+        """Run a binder call and complete its future."""
+        with self._lock:
+            if future not in self._waiting:
+                return
+            self._waiting.discard(future)
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _run_batch(self, method: str, function: Callable[[List[Any]], List[Any]]) -> None:
+        """Run every queued request of a batched method in one call."""
+        with self._lock:
+            batch = self._pending.pop(method, [])
+            batch = [(request, future) for request, future in batch if future in self._waiting]
+            self._waiting.difference_update(future for _, future in batch)
+        batch = [(request, future) for request, future in batch
+                 if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = function([request for request, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batched method '{method}' returned {len(results)} "
+                                 f"results for {len(batch)} requests")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _close(self) -> None:
+        """Fail every call the worker has not picked up, and any later call."""
+        with self._lock:
+            self._closed = True
+            waiting, self._waiting = self._waiting, set()
+            self._pending.clear()
+        for future in waiting:
+            _fail(future, self.service.name)
+
+
+def _fail(future: MainLoopFuture, service_name: str) -> None:
+    """Complete a call's future with the service-not-running error."""
+    if future.set_running_or_notify_cancel():
+        future.set_exception(RuntimeError(f"Service '{service_name}' is not running"))
+
+
+class Service:
+    """Android Service base class.
+
+    A service runs until it is stopped and no clients are bound to it.
+    Override the callbacks you need.
+    """
+
+    def __init__(self, name: str, **kwargs) -> None:
+        """Initialize service.
+
+        Args:
+            name: Service name identifier
+            **kwargs: Additional service arguments
+        """
+        self.name = name
+        self.extras = kwargs
+        # Set by AndroidApp when it creates the service
+        self.app: Any = None
+        self.logger = logging.getLogger(f"PyAndroid.Service.{name}")
+        self.handler: Optional[Handler] = None
+        self.started = False
+        self.bindings = 0
+        self._binder: Optional[Binder] = None
+        # Every Binder handed out, failed on shutdown
+        self._binders: List[Binder] = []
+        self._last_start_id = 0
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """True until the service is stopped and unbound."""
+        return self.handler is not None and self._worker is not None and self._worker.is_alive()
+
+    def on_create(self) -> None:
+        """Called once when the service is created. Override in subclasses."""
+        pass
+
+    def on_start_command(self, intent: Any, start_id: int) -> None:
+        """Handle a command from start_service() on the worker thread. Override in subclasses.
+
+        Args:
+            intent: Intent passed to start_service()
+            start_id: Increasing number identifying this command
+        """
+        pass
+
+    def on_bind(self, intent: Any) -> Binder:
+        """Return the interface for bound clients.
+
+        Called once, for the first client. Returns a Binder calling this
+        service's methods by default.
+
+        Args:
+            intent: Intent passed to bind_service()
+        """
+        return Binder(self)
+
+    def on_unbind(self, intent: Any) -> None:
+        """Called when the last client unbinds. Override in subclasses."""
+        pass
+
+    def on_destroy(self) -> None:
+        """Called after the worker of a stopped service has finished. Override in subclasses."""
+        pass
+
+    def stop_self(self, start_id: Optional[int] = None) -> None:
+        """Stop the service once bound clients are gone. May be called from any thread.
+
+        Args:
+            start_id: Only stop if this is the latest command's id, so commands
+                that arrived meanwhile still run
+        """
+        self.app.handler.post(lambda: self._stop(start_id))
+
+    def _create(self, app: Any) -> None:
+        """Attach to the app, start the worker thread and call on_create()."""
+        self.app = app
+        ready = threading.Event()
+
+        def run() -> None:
+            looper = Looper()
+            self.handler = Handler(looper)
+            ready.set()
+            looper.loop()
+            app.handler.post(self._destroyed)
+
+        self._worker = threading.Thread(target=run, name=f"PyAndroid-service-{self.name}",
+                                        daemon=True)
+        self._worker.start()
+        ready.wait()
+        self.on_create()
+
+    def _start_command(self, intent: Any) -> int:
+        """Queue a command for the worker and return its start id."""
+        self.started = True
+        self._last_start_id += 1
+        start_id = self._last_start_id
+        if not self.handler.post(lambda: self.on_start_command(intent, start_id)):
+            self.logger.warning("Service %s is not running; dropped command %d",
+                                self.name, start_id)
+        return start_id
+
+    def _bind(self, intent: Any) -> Binder:
+        """Register a client and return the binder."""
+        self.bindings += 1
+        if self._binder is None:
+            self._binder = self.on_bind(intent)
+            if isinstance(self._binder, Binder):
+                self._binders.append(self._binder)
+        return self._binder
+
+    def _unbind(self, intent: Any) -> bool:
+        """Unregister a client, stopping the service if it is no longer needed."""
+        if self.bindings == 0:
+            return False
+        self.bindings -= 1
+        if self.bindings == 0:
+            self.on_unbind(intent)
+            self._binder = None
+            if not self.started:
+                self._shutdown()
+        return True
+
+    def _stop(self, start_id: Optional[int] = None) -> bool:
+        """Stop a started service, shutting it down unless clients are bound."""
+        if start_id is not None and start_id != self._last_start_id:
+            return False
+        self.started = False
+        if self.bindings == 0:
+            self._shutdown()
+        return True
+
+    def _shutdown(self) -> None:
+        """Quit the worker; queued work is dropped and on_destroy() follows.
+
+        Binder calls still queued fail with RuntimeError.
+        """
+        if self.app._running_services.get(self.name) is self:
+            del self.app._running_services[self.name]
+        self.handler.looper.quit()
+        binders, self._binders = self._binders, []
+        for binder in binders:
+            binder._close()
+
+    def _destroyed(self) -> None:
+        """Call on_destroy() on the main looper once the worker has exited."""
+        self.on_destroy()
+        self.logger.info("Service %s destroyed", self.name)
@@ -0,0 +1,185 @@
+"""Spatial index for hit-testing views by coordinates.
+
+Rectangles are kept in a binary space-partitioning tree. A leaf that
+overflows is split at a median edge or center of its items, along whichever
+axis leaves fewer items straddling the split line; straddling items stay in
+the inner node. Choosing the axis per node keeps typical UI shapes cheap to
+query: full-width list rows are split by y, toolbars of buttons by x and
+grids by both. Items can be inserted, moved and removed one at a time.
+"""
+
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+Rect = Tuple[float, float, float, float]
+
+
+class _Node:
+    """A tree node; leaves have no split axis."""
+
+    __slots__ = ("items", "axis", "split", "low", "high", "depth", "limit")
+
+    def __init__(self, depth: int, limit: int) -> None:
+        self.items: Dict[Hashable, Rect] = {}
+        self.axis: Optional[int] = None
+        self.split = 0.0
+        self.low: Optional["_Node"] = None
+        self.high: Optional["_Node"] = None
+        self.depth = depth
+        self.limit = limit
+
+
+class SpatialIndex:
+    """Index of items by axis-aligned rectangle, queried by point.
+
+    Rectangles are half-open: an item at (0, 0) of size 10x10 contains
+    (9.5, 0) but not (10, 0).
+
+    Example:
+        >>> index = SpatialIndex()
+        >>> index.insert("ok", 0, 0, 100, 40)
+        >>> index.query_point(50, 20)
+        ['ok']
+    """
+
+    def __init__(self, max_items: int = 8, max_depth: int = 24) -> None:
+        """Initialize an empty index.
+
+        Args:
+            max_items: Items a leaf holds before it is split
+            max_depth: Maximum depth of the tree
+        """
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self._root = _Node(0, max_items)
+        self._nodes: Dict[Hashable, _Node] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._nodes
+
+    def get_rect(self, item: Hashable) -> Optional[Rect]:
+        """Get the rectangle stored for an item.
+
+        Args:
+            item: Indexed item
+
+        Returns:
+            Tuple (left, top, right, bottom) or None if not indexed
+        """
+        node = self._nodes.get(item)
+        return node.items[item] if node is not None else None
+
+    def insert(self, item: Hashable, x: float, y: float, width: float, height: float) -> None:
+        """Index an item, replacing its previous rectangle if any.
+
+        Args:
+            item: Item to index
+            x: Left edge
+            y: Top edge
+            width: Rectangle width
+            height: Rectangle height
+        """
+        rect = (x, y, x + width, y + height)
+        node = self._nodes.get(item)
+        if node is not None:
+            if node.items[item] == rect:
+                return
+            del node.items[item]
+        node = self._root
+        while node.axis is not None:
+            axis = node.axis
+            if rect[axis + 2] <= node.split:
+                node = node.low
+            elif rect[axis] >= node.split:
+                node = node.high
+            else:
+                break
+        node.items[item] = rect
+        self._nodes[item] = node
+        if node.axis is None and len(node.items) > node.limit:
+            self._split(node)
+
+    def remove(self, item: Hashable) -> bool:
+        """Remove an item from the index.
+
+        Args:
+            item: Indexed item
+
+        Returns:
+            True if the item was removed, False if it was not indexed
+        """
+        node = self._nodes.pop(item, None)
+        if node is None:
+            return False
+        del node.items[item]
+        return True
+
+    def query_point(self, x: float, y: float) -> List[Any]:
+        """Find the items whose rectangle contains a point.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+
+        Returns:
+            Matching items, in no particular order
+        """
+        found = []
+        point = (x, y)
+        node = self._root
+        while node is not None:
+            for item, (left, top, right, bottom) in node.items.items():
+                if left <= x < right and top <= y < bottom:
+                    found.append(item)
+            if node.axis is None:
+                break
+            node = node.low if point[node.axis] < node.split else node.high
+        return found
+
+    def _split(self, node: _Node) -> None:
+        """Turn an overflowing leaf into an inner node with two leaves."""
+        if node.depth >= self.max_depth:
+            node.limit = len(node.items) * 2
+            return
+        best = None
+        middle = len(node.items) // 2
+        for axis in (0, 1):
+            # Median edges split a grid between cells; the median center
+            # suits items of varying size
+            starts = sorted(rect[axis] for rect in node.items.values())
+            ends = sorted(rect[axis + 2] for rect in node.items.values())
+            centers = sorted(rect[axis] + rect[axis + 2] for rect in node.items.values())
+            for split in (starts[middle], ends[middle - 1], centers[middle] / 2):
+                straddling = low = 0
+                for rect in node.items.values():
+                    if rect[axis + 2] <= split:
+                        low += 1
+                    elif rect[axis] < split:
+                        straddling += 1
+                high = len(node.items) - low - straddling
+                if low and high and (best is None or straddling < best[0]):
+                    best = (straddling, axis, split)
+        if best is None or best[0] > len(node.items) // 2:
+            # Splitting would not separate these items; wait until more arrive
+            node.limit = len(node.items) * 2
+            return
+        _, node.axis, node.split = best
+        node.low = _Node(node.depth + 1, self.max_items)
+        node.high = _Node(node.depth + 1, self.max_items)
+        items = node.items
+        node.items = {}
+        axis = node.axis
+        for item, rect in items.items():
+            if rect[axis + 2] <= node.split:
+                target = node.low
+            elif rect[axis] >= node.split:
+                target = node.high
+            else:
+                target = node
+            target.items[item] = rect
+            self._nodes[item] = target
+        for child in (node.low, node.high):
+            if len(child.items) > child.limit:
+                self._split(child)
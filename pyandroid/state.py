@@ -0,0 +1,242 @@
+"""Persistent, incremental storage of saved instance state.
+
+Each activity's state lives in one file made of records. The first record
+holds a full snapshot; later records only hold the entries that changed
+since the previous save, plus the entries that were removed. Nested bundles
+are diffed entry by entry, so changing one view's state rewrites that view
+only. Loading replays every record in a single pass over the file, and the
+file is rewritten as one full snapshot once the appended changes outgrow
+it.
+
+Record layout (little-endian): uint32 payload length, uint8 flags (1 for a
+full snapshot), uint32 count of set entries, each as an entry path and a
+tagged value, then a uint32 count of removed entry paths. A path is a uint8
+depth followed by that many length-prefixed UTF-8 keys.
+"""
+
+import struct
+from typing import Dict, Optional, Tuple
+
+from .bundle import Bundle, read_str, read_value, skip_value, write_str, write_value
+from .utils import FileManager
+
+_UINT32 = struct.Struct("<I")
+_FULL = 1
+
+Path = Tuple[str, ...]
+
+
+class InstanceStateStore:
+    """Saves activity state bundles through a FileManager.
+
+    Example:
+        >>> store = InstanceStateStore(FileManager("MyApp"))
+        >>> store.save("main", activity.save_instance_state())
+        >>> bundle = store.load("main")
+    """
+
+    def __init__(self, file_manager: FileManager, subdir: str = "state",
+                 compact_ratio: float = 2.0) -> None:
+        """Initialize state store.
+
+        Args:
+            file_manager: FileManager used to read and write state files
+            subdir: Subdirectory of the app directory holding state files
+            compact_ratio: Rewrite a file as a full snapshot once the
+                appended changes exceed this multiple of the snapshot size
+        """
+        self.file_manager = file_manager
+        self.subdir = subdir
+        self.compact_ratio = compact_ratio
+        # Encoded values of the last saved or loaded state, by entry path
+        self._entries: Dict[str, Dict[Path, bytes]] = {}
+        # (full snapshot size, bytes appended since) for each state file
+        self._sizes: Dict[str, Tuple[int, int]] = {}
+
+    def save(self, name: str, state: Bundle) -> bool:
+        """Save a state bundle, writing only what changed since the last save.
+
+        Args:
+            name: Key identifying the state, usually the activity name
+            state: State to save
+
+        Returns:
+            True if successful, False otherwise
+        """
+        entries = _flatten(state)
+        previous = self._entries.get(name)
+        filename = f"{name}.state"
+        if previous is not None:
+            changed = {path: value for path, value in entries.items()
+                       if previous.get(path) != value}
+            removed = [path for path in previous if path not in entries]
+            if not changed and not removed:
+                return True
+            record = _encode_record(changed, removed, full=False)
+            snapshot_size, appended = self._sizes[name]
+            appended += len(record)
+            if appended <= snapshot_size * self.compact_ratio:
+                if not self.file_manager.write_bytes(filename, record, self.subdir, append=True):
+                    return False
+                self._entries[name] = entries
+                self._sizes[name] = (snapshot_size, appended)
+                return True
+        record = _encode_record(entries, [], full=True)
+        if not self.file_manager.write_bytes(filename, record, self.subdir):
+            return False
+        self._entries[name] = entries
+        self._sizes[name] = (len(record), 0)
+        return True
+
+    def load(self, name: str) -> Optional[Bundle]:
+        """Load a saved state bundle.
+
+        Args:
+            name: Key identifying the state
+
+        Returns:
+            The saved state, or None if nothing was saved or the file is
+            unreadable
+        """
+        data = self.file_manager.read_bytes(f"{name}.state", self.subdir)
+        if data is None:
+            return None
+        try:
+            entries, snapshot_size, intact = _decode_records(memoryview(data))
+        except ValueError as e:
+            self.file_manager.logger.error(f"Corrupt state file for {name}: {e}")
+            return None
+        self._entries[name] = entries
+        if intact < len(data):
+            # Never append after a torn record; the next save rewrites the file
+            self._sizes[name] = (snapshot_size, float("inf"))
+        else:
+            self._sizes[name] = (snapshot_size, len(data) - snapshot_size)
+        return _unflatten(entries)
+
+    def delete(self, name: str) -> bool:
+        """Delete saved state.
+
+        Args:
+            name: Key identifying the state
+
+        Returns:
+            True if a state file was deleted, False otherwise
+        """
+        self._entries.pop(name, None)
+        self._sizes.pop(name, None)
+        return self.file_manager.delete_file(f"{name}.state", self.subdir)
+
+
+def _flatten(bundle: Bundle, prefix: Path = (), out: Optional[Dict[Path, bytes]] = None
+             ) -> Dict[Path, bytes]:
+    """Map the path of every leaf entry to its encoded value.
+
+    Non-empty nested bundles are descended into; everything else, including
+    empty bundles, is a leaf.
+    """
+    if out is None:
+        out = {}
+    for key, value in bundle.items():
+        path = prefix + (key,)
+        if isinstance(value, (Bundle, dict)) and value:
+            _flatten(value, path, out)
+        else:
+            encoded = bytearray()
+            write_value(encoded, value)
+            out[path] = bytes(encoded)
+    return out
+
+
+def _unflatten(entries: Dict[Path, bytes]) -> Bundle:
+    """Rebuild a bundle from leaf entries."""
+    root = Bundle()
+    for path, encoded in entries.items():
+        node = root
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, Bundle):
+                child = node[key] = Bundle()
+            node = child
+        node[path[-1]], _ = read_value(memoryview(encoded), 0)
+    return root
+
+
+def _write_path(out: bytearray, path: Path) -> None:
+    """Append an entry path: its depth, then each key."""
+    out.append(len(path))
+    for key in path:
+        write_str(out, key)
+
+
+def _read_path(data: memoryview, offset: int) -> Tuple[Path, int]:
+    """Read an entry path, returning it and the offset after it."""
+    depth = data[offset]
+    offset += 1
+    keys = []
+    for _ in range(depth):
+        key, offset = read_str(data, offset)
+        keys.append(key)
+    return tuple(keys), offset
+
+
+def _encode_record(changed: Dict[Path, bytes], removed: list, full: bool) -> bytes:
+    """Encode one record of set and removed entries."""
+    payload = bytearray()
+    payload.append(_FULL if full else 0)
+    payload += _UINT32.pack(len(changed))
+    for path, encoded in changed.items():
+        _write_path(payload, path)
+        payload += encoded
+    payload += _UINT32.pack(len(removed))
+    for path in removed:
+        _write_path(payload, path)
+    return _UINT32.pack(len(payload)) + payload
+
+
+def _decode_records(data: memoryview) -> Tuple[Dict[Path, bytes], int, int]:
+    """Replay all records.
+    
+    Returns:
+        Tuple (entries, size of the full snapshot, length of intact data)
+
+    Raises:
+        ValueError: If a record is truncated or malformed
+    """
+    entries: Dict[Path, bytes] = {}
+    snapshot_size = 0
+    offset = 0
+    try:
+        while offset < len(data):
+            start = offset
+            if offset + 5 > len(data):
+                # A save was interrupted inside the length prefix or before
+                # the flag byte; keep the records before it
+                return entries, snapshot_size, start
+            length, = _UINT32.unpack_from(data, offset)
+            offset += 4
+            end = offset + length
+            if end > len(data):
+                # A save was interrupted; keep the records before it
+                return entries, snapshot_size, start
+            if data[offset] & _FULL:
+                entries.clear()
+                snapshot_size = end - start
+            offset += 1
+            count, = _UINT32.unpack_from(data, offset)
+            offset += 4
+            for _ in range(count):
+                path, offset = _read_path(data, offset)
+                value_end = skip_value(data, offset)
+                entries[path] = bytes(data[offset:value_end])
+                offset = value_end
+            count, = _UINT32.unpack_from(data, offset)
+            offset += 4
+            for _ in range(count):
+                path, offset = _read_path(data, offset)
+                entries.pop(path, None)
+            if offset != end:
+                raise ValueError("Malformed record")
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated state data: {e}") from e
+    return entries, snapshot_size, offset
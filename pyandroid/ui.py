@@ -6,32 +6,372 @@ in Android applications with Python.
 
 from typing import Dict, Any, Optional, List, Tuple
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
+from .constraints import ConstraintSolver, LinearConstraint, Variable
+from .core import DuplicateViewIdError
 
-class View(ABC):
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def parse_color(color: str) -> int:
+    """Pack a hex color string into a 32-bit ARGB integer.
+    
+    Args:
+        color: Color as #RRGGBB or #AARRGGBB
+        
+    Returns:
+        Color as an ARGB integer (alpha defaults to 0xFF)
+        
+    Raises:
+        ValueError: If the string is not a valid hex color
+    """
+    digits = color[1:] if color.startswith("#") else ""
+    try:
+        value = int(digits, 16)
+    except ValueError:
+        value = -1
+    if value < 0 or len(digits) not in (6, 8):
+        raise ValueError(f"Invalid color '{color}', expected #RRGGBB or #AARRGGBB")
+    if len(digits) == 6:
+        value |= 0xFF000000
+    return value
+
+
+@lru_cache(maxsize=1024)
+def format_color(value: int) -> str:
+    """Format a 32-bit ARGB integer as a hex color string.
+    
+    Args:
+        value: Color as an ARGB integer
+        
+    Returns:
+        #RRGGBB for opaque colors, #AARRGGBB otherwise
+    """
+    if value >> 24 == 0xFF:
+        return f"#{value & 0xFFFFFF:06X}"
+    return f"#{value:08X}"
+
+
+# Packed defaults shared by every view
+_WHITE = parse_color("#FFFFFF")
+_BLACK = parse_color("#000000")
+_GRAY = parse_color("#808080")
+_BLUE = parse_color("#2196F3")
+_DEFAULT_TEXT_SIZE = 14
+_DEFAULT_FONT_FAMILY = "Arial"
+_NO_MARGINS = (0, 0, 0, 0)
+# Attributes that move a node on screen and so affect hit-testing
+_FRAME_ATTRS = frozenset(("x", "y", "width", "height"))
+
+# Rough glyph metrics used to estimate wrap_content text sizes
+_CHAR_WIDTH_RATIO = 0.6
+_LINE_HEIGHT_RATIO = 1.5
+_BUTTON_PADDING = (16, 8)
+
+# Special values for layout_width / layout_height
+MATCH_PARENT = -1
+WRAP_CONTENT = -2
+
+
+class MeasureSpec:
+    """Size constraint passed from a parent to a child during measurement.
+    
+    A spec is a ``(mode, size)`` tuple, which keeps it hashable so it can
+    key the measure cache:
+    
+    - EXACTLY: the child must be exactly ``size`` pixels
+    - AT_MOST: the child may be at most ``size`` pixels
+    - UNSPECIFIED: the child may be as large as it wants
+    """
+    
+    UNSPECIFIED = 0
+    EXACTLY = 1
+    AT_MOST = 2
+    
+    @staticmethod
+    def make(size: int, mode: int) -> Tuple[int, int]:
+        """Build a measure spec.
+        
+        Args:
+            size: Size in pixels
+            mode: One of UNSPECIFIED, EXACTLY or AT_MOST
+            
+        Returns:
+            Measure spec tuple
+        """
+        return (mode, size)
+    
+    @staticmethod
+    def get_child_spec(spec: Tuple[int, int], padding: int,
+                       child_dimension: int) -> Tuple[int, int]:
+        """Compute the spec for one dimension of a child.
+        
+        Args:
+            spec: The parent's spec for this dimension
+            padding: Space already used (padding, margins, siblings)
+            child_dimension: The child's layout_width or layout_height
+            
+        Returns:
+            Measure spec for the child
+        """
+        mode, size = spec
+        size = max(0, size - padding)
+        if child_dimension >= 0:
+            return (MeasureSpec.EXACTLY, child_dimension)
+        if child_dimension == MATCH_PARENT and mode == MeasureSpec.EXACTLY:
+            return (MeasureSpec.EXACTLY, size)
+        if mode == MeasureSpec.UNSPECIFIED:
+            return (MeasureSpec.UNSPECIFIED, 0)
+        return (MeasureSpec.AT_MOST, size)
+    
+    @staticmethod
+    def resolve_size(size: int, spec: Tuple[int, int]) -> int:
+        """Reconcile a desired size with a spec.
+        
+        Args:
+            size: Size the view would like to be
+            spec: Constraint imposed by the parent
+            
+        Returns:
+            Final size in pixels
+        """
+        mode, spec_size = spec
+        if mode == MeasureSpec.EXACTLY:
+            return spec_size
+        if mode == MeasureSpec.AT_MOST:
+            return min(size, spec_size)
+        return size
+
+
+def _text_size(text: str, text_size: int) -> Tuple[int, int]:
+    """Estimate the pixel size of text rendered at text_size."""
+    lines = text.split("\n")
+    longest = max(len(line) for line in lines)
+    return (int(longest * text_size * _CHAR_WIDTH_RATIO),
+            int(len(lines) * text_size * _LINE_HEIGHT_RATIO))
+
+
+def _node_id(node: Any) -> Optional[str]:
+    """Return the identifier of a view or layout."""
+    if isinstance(node, Layout):
+        return node.layout_id
+    return getattr(node, "view_id", None)
+
+
+def _collect_ids(node: Any) -> Dict[str, Any]:
+    """Return the id index entries contributed by a node and its subtree."""
+    entries = {}
+    node_id = _node_id(node)
+    if node_id is not None:
+        entries[node_id] = node
+    if isinstance(node, Layout):
+        entries.update(node._id_index)
+    return entries
+
+
+def _check_duplicate_ids(index: Dict[str, Any], entries: Dict[str, Any]) -> None:
+    """Raise if any entry would shadow a different node already indexed.
+    
+    Raises:
+        DuplicateViewIdError: If an id is already used by another view
+    """
+    for view_id, node in entries.items():
+        existing = index.get(view_id)
+        if existing is not None and existing is not node:
+            raise DuplicateViewIdError(f"View id '{view_id}' is already in use")
+
+
+class _RenderNode:
+    """Dirty tracking and measurement shared by views and layouts.
+    
+    Assigning a public attribute to a new value marks the node and all of
+    its ancestors dirty, so a later ``Layout.render()`` only rebuilds the
+    subtrees that actually changed and reuses cached output for the rest.
+    Private (underscore) attributes are bookkeeping and never invalidate.
+    
+    Layout passes run in two phases, as on Android: ``measure()`` computes
+    each node's desired size under the parent's MeasureSpecs, then the
+    parent positions its children. The last measurement is cached by spec
+    and only recomputed after the node or one of its descendants changes.
+    """
+    
+    __slots__ = ()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name[0] == "_":
+            object.__setattr__(self, name, value)
+            return
+        changed = getattr(self, name, _MISSING) != value
+        object.__setattr__(self, name, value)
+        if changed:
+            self.invalidate()
+            if name in _FRAME_ATTRS:
+                self._frame_changed()
+    
+    def invalidate(self):
+        """Mark this node and its ancestors as needing a re-render.
+        
+        Called automatically when a public attribute changes. Call it
+        directly after mutating a container attribute in place (for
+        example ``layout.padding["left"] = 5``).
+        """
+        node = self
+        # A node that is dirty and unmeasured always has dirty, unmeasured
+        # ancestors, so the walk can stop early
+        while node is not None and not (node._dirty and node._measure_key is None):
+            node._dirty = True
+            node._measure_key = None
+            node = node._parent
+    
+    def set_layout_params(self, width: Optional[int] = None,
+                          height: Optional[int] = None,
+                          weight: Optional[float] = None):
+        """Set how this node wants to be sized by its parent.
+        
+        Args:
+            width: Width in pixels, MATCH_PARENT or WRAP_CONTENT
+            height: Height in pixels, MATCH_PARENT or WRAP_CONTENT
+            weight: Share of the remaining space in a LinearLayout
+        """
+        if width is not None:
+            self.layout_width = width
+        if height is not None:
+            self.layout_height = height
+        if weight is not None:
+            self.layout_weight = weight
+    
+    def set_margins(self, left: int, top: int, right: int, bottom: int):
+        """Set the space kept around this node inside its parent.
+        
+        Args:
+            left: Left margin
+            top: Top margin
+            right: Right margin
+            bottom: Bottom margin
+        """
+        self.margins = (left, top, right, bottom)
+    
+    def measure(self, width_spec: Tuple[int, int],
+                height_spec: Tuple[int, int]) -> Tuple[int, int]:
+        """Measure this node, reusing the cached result for the same specs.
+        
+        Args:
+            width_spec: Horizontal MeasureSpec
+            height_spec: Vertical MeasureSpec
+            
+        Returns:
+            Tuple (measured_width, measured_height)
+        """
+        key = (width_spec, height_spec)
+        if self._measure_key != key:
+            self.on_measure(width_spec, height_spec)
+            self._measure_key = key
+        return self.measured_width, self.measured_height
+    
+    def on_measure(self, width_spec: Tuple[int, int], height_spec: Tuple[int, int]):
+        """Compute measured_width and measured_height. Override in subclasses.
+        
+        Args:
+            width_spec: Horizontal MeasureSpec
+            height_spec: Vertical MeasureSpec
+        """
+        width, height = self.get_content_size()
+        self._set_measured_dimension(
+            MeasureSpec.resolve_size(width, width_spec),
+            MeasureSpec.resolve_size(height, height_spec)
+        )
+    
+    def get_content_size(self) -> Tuple[int, int]:
+        """Return the size this node needs to show its content."""
+        return 0, 0
+    
+    def _set_measured_dimension(self, width: int, height: int):
+        """Store the result of on_measure() without invalidating."""
+        object.__setattr__(self, "measured_width", width)
+        object.__setattr__(self, "measured_height", height)
+    
+    def _set_frame(self, x: int, y: int, width: int, height: int):
+        """Apply the position and size chosen by the parent's layout pass.
+        
+        Unlike the public setters this only marks the node itself for
+        re-render; the parent is already mid-layout and its measurement
+        stays valid.
+        """
+        if (self.x, self.y, self.width, self.height) != (x, y, width, height):
+            object.__setattr__(self, "x", x)
+            object.__setattr__(self, "y", y)
+            object.__setattr__(self, "width", width)
+            object.__setattr__(self, "height", height)
+            self._dirty = True
+            self._frame_changed()
+    
+    def _frame_changed(self):
+        """Tell the owning activity that this node moved or was resized."""
+        node = self
+        while node._parent is not None:
+            node = node._parent
+        owner = getattr(node, "_owner", None)
+        if owner is not None:
+            owner._mark_moved((self,))
+
+
+class View(_RenderNode, ABC):
     """Base class for all UI views.
     
     Represents a basic UI component in Android.
+    
+    Views use ``__slots__`` and store colors as packed 32-bit ARGB integers
+    to keep large trees compact; the color attributes still read and write
+    hex strings.
     """
     
+    __slots__ = (
+        "_parent", "_dirty", "_render_cache", "_measure_key", "view_id",
+        "width", "height", "x", "y", "visible", "enabled", "_background_color",
+        "onclick_listener", "layout_width", "layout_height", "layout_weight",
+        "margins", "measured_width", "measured_height",
+    )
+    
     def __init__(self, view_id: str, width: int = 0, height: int = 0):
         """Initialize view.
         
         Args:
             view_id: Unique identifier for the view
-            width: View width in pixels
-            height: View height in pixels
+            width: View width in pixels (0 to wrap the content)
+            height: View height in pixels (0 to wrap the content)
         """
+        self._parent: Optional["Layout"] = None
+        self._dirty = True
+        self._render_cache: Optional[Dict[str, Any]] = None
+        self._measure_key: Optional[Tuple] = None
         self.view_id = view_id
         self.width = width
         self.height = height
+        self.layout_width = width if width > 0 else WRAP_CONTENT
+        self.layout_height = height if height > 0 else WRAP_CONTENT
+        self.layout_weight = 0
+        self.margins = _NO_MARGINS
+        self.measured_width = 0
+        self.measured_height = 0
         self.x = 0
         self.y = 0
         self.visible = True
         self.enabled = True
-        self.background_color = "#FFFFFF"
+        self._background_color = _WHITE
         self.onclick_listener = None
         
+    @property
+    def background_color(self) -> str:
+        """Background color as a hex string."""
+        return format_color(self._background_color)
+    
+    @background_color.setter
+    def background_color(self, color: str):
+        self._background_color = parse_color(color)
+        
     def set_position(self, x: int, y: int):
         """Set view position.
         
@@ -43,7 +383,7 @@ class View(ABC):
         self.y = y
         
     def set_size(self, width: int, height: int):
-        """Set view size.
+        """Set a fixed view size.
         
         Args:
             width: View width
@@ -51,6 +391,8 @@ class View(ABC):
         """
         self.width = width
         self.height = height
+        self.layout_width = width
+        self.layout_height = height
         
     def set_visibility(self, visible: bool):
         """Set view visibility.
@@ -89,6 +431,24 @@ class View(ABC):
         if self.onclick_listener and self.enabled:
             self.onclick_listener(self)
             
+    def on_save_instance_state(self) -> Optional[Dict[str, Any]]:
+        """Return state that should survive the view being recreated.
+        
+        Only state that differs from a freshly built view is saved.
+        
+        Returns:
+            Dictionary of state, or None if there is nothing to save
+        """
+        return None if self.visible else {"visible": False}
+        
+    def on_restore_instance_state(self, state: Dict[str, Any]):
+        """Restore state returned by on_save_instance_state().
+        
+        Args:
+            state: Saved state
+        """
+        self.visible = state.get("visible", self.visible)
+        
     @abstractmethod
     def render(self) -> Dict[str, Any]:
         """Render view to dictionary representation.
@@ -102,6 +462,8 @@ class View(ABC):
 class TextView(View):
     """Text display view."""
     
+    __slots__ = ("text", "_text_color", "text_size", "font_family")
+    
     def __init__(self, view_id: str, text: str = "", **kwargs):
         """Initialize TextView.
         
@@ -112,9 +474,18 @@ class TextView(View):
         """
         super().__init__(view_id, **kwargs)
         self.text = text
-        self.text_color = "#000000"
-        self.text_size = 14
-        self.font_family = "Arial"
+        self._text_color = _BLACK
+        self.text_size = _DEFAULT_TEXT_SIZE
+        self.font_family = _DEFAULT_FONT_FAMILY
+        
+    @property
+    def text_color(self) -> str:
+        """Text color as a hex string."""
+        return format_color(self._text_color)
+    
+    @text_color.setter
+    def text_color(self, color: str):
+        self._text_color = parse_color(color)
         
     def set_text(self, text: str):
         """Set text content.
@@ -140,6 +511,10 @@ class TextView(View):
         """
         self.text_size = size
         
+    def get_content_size(self) -> Tuple[int, int]:
+        """Estimate the size of the text."""
+        return _text_size(self.text, self.text_size)
+        
     def render(self) -> Dict[str, Any]:
         """Render TextView."""
         return {
@@ -160,6 +535,8 @@ class TextView(View):
 class Button(TextView):
     """Button widget for user interaction."""
     
+    __slots__ = ()
+    
     def __init__(self, view_id: str, text: str = "Button", **kwargs):
         """Initialize Button.
         
@@ -169,8 +546,13 @@ class Button(TextView):
             **kwargs: Additional view arguments
         """
         super().__init__(view_id, text, **kwargs)
-        self.background_color = "#2196F3"
-        self.text_color = "#FFFFFF"
+        self._background_color = _BLUE
+        self._text_color = _WHITE
+        
+    def get_content_size(self) -> Tuple[int, int]:
+        """Estimate the size of the label plus button padding."""
+        width, height = super().get_content_size()
+        return width + 2 * _BUTTON_PADDING[0], height + 2 * _BUTTON_PADDING[1]
         
     def render(self) -> Dict[str, Any]:
         """Render Button."""
@@ -182,6 +564,8 @@ class Button(TextView):
 class EditText(View):
     """Text input field."""
     
+    __slots__ = ("text", "hint", "_text_color", "_hint_color")
+    
     def __init__(self, view_id: str, hint: str = "", **kwargs):
         """Initialize EditText.
         
@@ -193,8 +577,26 @@ class EditText(View):
         super().__init__(view_id, **kwargs)
         self.text = ""
         self.hint = hint
-        self.text_color = "#000000"
-        self.hint_color = "#808080"
+        self._text_color = _BLACK
+        self._hint_color = _GRAY
+        
+    @property
+    def text_color(self) -> str:
+        """Text color as a hex string."""
+        return format_color(self._text_color)
+    
+    @text_color.setter
+    def text_color(self, color: str):
+        self._text_color = parse_color(color)
+    
+    @property
+    def hint_color(self) -> str:
+        """Hint text color as a hex string."""
+        return format_color(self._hint_color)
+    
+    @hint_color.setter
+    def hint_color(self, color: str):
+        self._hint_color = parse_color(color)
         
     def set_text(self, text: str):
         """Set input text.
@@ -212,6 +614,23 @@ class EditText(View):
         """
         return self.text
         
+    def on_save_instance_state(self) -> Optional[Dict[str, Any]]:
+        """Save the entered text along with the base view state."""
+        state = super().on_save_instance_state()
+        if self.text:
+            state = dict(state or {}, text=self.text)
+        return state
+        
+    def on_restore_instance_state(self, state: Dict[str, Any]):
+        """Restore the entered text along with the base view state."""
+        super().on_restore_instance_state(state)
+        if "text" in state:
+            self.text = state["text"]
+        
+    def get_content_size(self) -> Tuple[int, int]:
+        """Estimate the size of the text, or of the hint when empty."""
+        return _text_size(self.text or self.hint, _DEFAULT_TEXT_SIZE)
+        
     def render(self) -> Dict[str, Any]:
         """Render EditText."""
         return {
@@ -229,7 +648,7 @@ class EditText(View):
         }
 
 
-class Layout(ABC):
+class Layout(_RenderNode, ABC):
     """Base class for view containers."""
     
     def __init__(self, layout_id: str):
@@ -238,17 +657,84 @@ class Layout(ABC):
         Args:
             layout_id: Unique identifier for layout
         """
+        self._parent: Optional["Layout"] = None
+        self._dirty = True
+        self._render_cache: Optional[Dict[str, Any]] = None
+        self._measure_key: Optional[Tuple] = None
+        # Ids of every view in the subtree, kept current by add/remove_view
+        self._id_index: Dict[str, Any] = {}
+        # Activity holding this layout as a top-level view, if any
+        self._owner: Any = None
         self.layout_id = layout_id
         self.children: List[View] = []
         self.padding = {"left": 0, "top": 0, "right": 0, "bottom": 0}
+        self.x = 0
+        self.y = 0
+        self.width = 0
+        self.height = 0
+        self.layout_width = MATCH_PARENT
+        self.layout_height = WRAP_CONTENT
+        self.layout_weight = 0
+        self.margins = _NO_MARGINS
+        self.measured_width = 0
+        self.measured_height = 0
+        
+    def set_position(self, x: int, y: int):
+        """Set layout position within its parent.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+        """
+        self.x = x
+        self.y = y
+        
+    def set_size(self, width: int, height: int):
+        """Set a fixed layout size.
+        
+        Args:
+            width: Layout width
+            height: Layout height
+        """
+        self.width = width
+        self.height = height
+        self.layout_width = width
+        self.layout_height = height
+        
+    def _index_chain(self) -> List[Any]:
+        """Return this layout, its ancestors and the owning activity, if any."""
+        chain = []
+        node = self
+        while node is not None:
+            chain.append(node)
+            if node._parent is None and node._owner is not None:
+                chain.append(node._owner)
+            node = node._parent
+        return chain
         
     def add_view(self, view: View):
         """Add child view to layout.
         
+        The view (and, for nested layouts, its whole subtree) is added to the
+        id index of this layout, every ancestor and the owning activity.
+        
         Args:
             view: View to add
+            
+        Raises:
+            DuplicateViewIdError: If an id in the subtree is already in use
         """
+        entries = _collect_ids(view)
+        chain = self._index_chain()
+        for container in chain:
+            _check_duplicate_ids(container._id_index, entries)
+        for container in chain:
+            container._id_index.update(entries)
         self.children.append(view)
+        view._parent = self
+        self.invalidate()
+        if not isinstance(chain[-1], Layout):
+            chain[-1]._mark_moved(entries.values())
         
     def remove_view(self, view: View):
         """Remove child view from layout.
@@ -258,9 +744,23 @@ class Layout(ABC):
         """
         if view in self.children:
             self.children.remove(view)
+            entries = _collect_ids(view)
+            chain = self._index_chain()
+            for container in chain:
+                index = container._id_index
+                for view_id, node in entries.items():
+                    if index.get(view_id) is node:
+                        del index[view_id]
+            view._parent = None
+            self.invalidate()
+            if not isinstance(chain[-1], Layout):
+                chain[-1]._mark_moved(entries.values())
             
     def find_view_by_id(self, view_id: str) -> Optional[View]:
-        """Find child view by ID.
+        """Find a view anywhere in this layout's subtree by ID.
+        
+        Lookups use the subtree id index and run in constant time.
+        Nested layouts are found by their layout_id.
         
         Args:
             view_id: View identifier to search for
@@ -268,11 +768,24 @@ class Layout(ABC):
         Returns:
             View instance or None if not found
         """
-        for view in self.children:
-            if view.view_id == view_id:
-                return view
+        return self._id_index.get(view_id)
+        
+    def on_save_instance_state(self) -> Optional[Dict[str, Any]]:
+        """Return state that should survive the layout being recreated.
+        
+        Returns:
+            Dictionary of state, or None if there is nothing to save
+        """
         return None
         
+    def on_restore_instance_state(self, state: Dict[str, Any]):
+        """Restore state returned by on_save_instance_state().
+        
+        Args:
+            state: Saved state
+        """
+        pass
+        
     def set_padding(self, left: int, top: int, right: int, bottom: int):
         """Set layout padding.
         
@@ -294,50 +807,270 @@ class Layout(ABC):
         """Arrange child views within the layout."""
         pass
         
+    def on_measure(self, width_spec: Tuple[int, int], height_spec: Tuple[int, int]):
+        """Measure children and wrap them at their current positions."""
+        pad = self.padding
+        pad_width = pad["left"] + pad["right"]
+        pad_height = pad["top"] + pad["bottom"]
+        right = bottom = 0
+        for child in self.children:
+            left_m, top_m, right_m, bottom_m = child.margins
+            child_width, child_height = child.measure(
+                MeasureSpec.get_child_spec(width_spec, pad_width + left_m + right_m,
+                                           child.layout_width),
+                MeasureSpec.get_child_spec(height_spec, pad_height + top_m + bottom_m,
+                                           child.layout_height)
+            )
+            right = max(right, child.x + child_width + right_m)
+            bottom = max(bottom, child.y + child_height + bottom_m)
+        self._set_measured_dimension(
+            MeasureSpec.resolve_size(right + pad["right"], width_spec),
+            MeasureSpec.resolve_size(bottom + pad["bottom"], height_spec)
+        )
+        
+    def _ensure_measured(self):
+        """Make sure this layout and its children are measured for its frame.
+        
+        A root layout is measured from its own layout params. A nested
+        layout was measured by its parent and only needs a new pass if the
+        parent then gave it a different size.
+        """
+        if self._parent is None:
+            specs = [
+                (MeasureSpec.EXACTLY, dimension) if dimension >= 0
+                else (MeasureSpec.UNSPECIFIED, 0)
+                for dimension in (self.layout_width, self.layout_height)
+            ]
+            width, height = self.measure(*specs)
+            self._set_frame(self.x, self.y, width, height)
+        elif (self._measure_key is None
+              or (self.measured_width, self.measured_height) != (self.width, self.height)):
+            self.measure((MeasureSpec.EXACTLY, self.width), (MeasureSpec.EXACTLY, self.height))
+        
     def render(self) -> Dict[str, Any]:
         """Render layout and all children.
         
+        Clean subtrees are not re-arranged or re-rendered; their cached
+        dictionaries are reused, so the cost of a render scales with what
+        changed since the previous one. The returned dictionary is shared
+        with the cache and should be treated as read-only.
+        
         Returns:
             Dictionary representation of layout
         """
+        if not self._dirty and self._render_cache is not None:
+            return self._render_cache
         self.arrange_children()
-        return {
+        self._render_cache = {
             "type": self.__class__.__name__,
             "id": self.layout_id,
-            "padding": self.padding,
-            "children": [child.render() for child in self.children]
+            "padding": dict(self.padding),
+            "position": {"x": self.x, "y": self.y},
+            "size": {"width": self.width, "height": self.height},
+            "children": [self._render_child(child) for child in self.children]
         }
+        self._dirty = False
+        return self._render_cache
+    
+    @staticmethod
+    def _render_child(child) -> Dict[str, Any]:
+        """Render a child, reusing its cached output when it is clean."""
+        if isinstance(child, Layout):
+            return child.render()
+        if child._dirty or child._render_cache is None:
+            child._render_cache = child.render()
+            child._dirty = False
+        return child._render_cache
 
 
 class LinearLayout(Layout):
-    """Linear layout arranges children in a single direction."""
+    """Linear layout arranges children in a single direction.
     
-    def __init__(self, layout_id: str, orientation: str = "vertical"):
+    Children are measured with their layout params and margins. When the
+    layout has a bounded size along its orientation, children with a
+    layout_weight share the space left over by the others.
+    """
+    
+    def __init__(self, layout_id: str, orientation: str = "vertical", spacing: int = 10):
         """Initialize LinearLayout.
         
         Args:
             layout_id: Unique identifier
             orientation: "vertical" or "horizontal"
+            spacing: Gap between consecutive children in pixels
         """
         super().__init__(layout_id)
         self.orientation = orientation
+        self.spacing = spacing
+        
+    def on_measure(self, width_spec: Tuple[int, int], height_spec: Tuple[int, int]):
+        """Measure children along the orientation and sum their sizes."""
+        vertical = self.orientation == "vertical"
+        pad = self.padding
+        pad_width = pad["left"] + pad["right"]
+        pad_height = pad["top"] + pad["bottom"]
+        main_spec = height_spec if vertical else width_spec
+        bounded = main_spec[0] != MeasureSpec.UNSPECIFIED
+        
+        used = ((pad_height if vertical else pad_width)
+                + self.spacing * max(0, len(self.children) - 1))
+        cross = 0
+        weighted = []
+        total_weight = 0
+        for child in self.children:
+            left_m, top_m, right_m, bottom_m = child.margins
+            used += top_m + bottom_m if vertical else left_m + right_m
+            if bounded and child.layout_weight > 0:
+                weighted.append(child)
+                total_weight += child.layout_weight
+                continue
+            if vertical:
+                child_width, child_height = child.measure(
+                    MeasureSpec.get_child_spec(width_spec, pad_width + left_m + right_m,
+                                               child.layout_width),
+                    MeasureSpec.get_child_spec(height_spec, used, child.layout_height)
+                )
+                used += child_height
+                cross = max(cross, child_width + left_m + right_m)
+            else:
+                child_width, child_height = child.measure(
+                    MeasureSpec.get_child_spec(width_spec, used, child.layout_width),
+                    MeasureSpec.get_child_spec(height_spec, pad_height + top_m + bottom_m,
+                                               child.layout_height)
+                )
+                used += child_width
+                cross = max(cross, child_height + top_m + bottom_m)
+        
+        # Weighted children split whatever the others left over
+        remaining = max(0, main_spec[1] - used)
+        for child in weighted:
+            share = int(remaining * child.layout_weight / total_weight)
+            remaining -= share
+            total_weight -= child.layout_weight
+            left_m, top_m, right_m, bottom_m = child.margins
+            if vertical:
+                child_width, _ = child.measure(
+                    MeasureSpec.get_child_spec(width_spec, pad_width + left_m + right_m,
+                                               child.layout_width),
+                    (MeasureSpec.EXACTLY, share)
+                )
+                cross = max(cross, child_width + left_m + right_m)
+            else:
+                _, child_height = child.measure(
+                    (MeasureSpec.EXACTLY, share),
+                    MeasureSpec.get_child_spec(height_spec, pad_height + top_m + bottom_m,
+                                               child.layout_height)
+                )
+                cross = max(cross, child_height + top_m + bottom_m)
+            used += share
+        
+        if vertical:
+            self._set_measured_dimension(
+                MeasureSpec.resolve_size(cross + pad_width, width_spec),
+                MeasureSpec.resolve_size(used, height_spec)
+            )
+        else:
+            self._set_measured_dimension(
+                MeasureSpec.resolve_size(used, width_spec),
+                MeasureSpec.resolve_size(cross + pad_height, height_spec)
+            )
         
     def arrange_children(self):
-        """Arrange children linearly."""
+        """Measure if needed, then place children one after another."""
+        self._ensure_measured()
         current_x = self.padding["left"]
         current_y = self.padding["top"]
         
         for child in self.children:
-            child.set_position(current_x, current_y)
+            left_m, top_m, right_m, bottom_m = child.margins
+            child._set_frame(current_x + left_m, current_y + top_m,
+                             child.measured_width, child.measured_height)
             
             if self.orientation == "vertical":
-                current_y += child.height + 10  # 10px margin
+                current_y += top_m + child.measured_height + bottom_m + self.spacing
             else:  # horizontal
-                current_x += child.width + 10  # 10px margin
+                current_x += left_m + child.measured_width + right_m + self.spacing
+
+
+# Per-axis indices into a child's solver variables (x, y, w, h, ml, mt, mr, mb)
+# as (position, size, low margin, high margin) plus the parent's edge names
+_AXES = {
+    "h": (0, 2, 4, 6, "left", "right"),
+    "v": (1, 3, 5, 7, "top", "bottom"),
+}
+_START = "start"
+_END = "end"
+
+
+def _combine(*parts: Tuple[float, Tuple[Dict[Any, float], float]]
+             ) -> Tuple[Dict[Any, float], float]:
+    """Sum scaled linear expressions given as (scale, (terms, constant))."""
+    terms: Dict[Any, float] = {}
+    constant = 0.0
+    for scale, (part_terms, part_constant) in parts:
+        for variable, coefficient in part_terms.items():
+            terms[variable] = terms.get(variable, 0.0) + scale * coefficient
+        constant += scale * part_constant
+    return terms, constant
 
 
 class RelativeLayout(Layout):
-    """Relative layout allows positioning relative to parent or siblings."""
+    """Relative layout allows positioning relative to parent or siblings.
+    
+    Rules are turned into linear constraints on each child's position and
+    solved by an incremental ConstraintSolver: editing one rule, or a change
+    in one child's size, only re-solves the positions that depend on it.
+    Children without rules on an axis keep their manually set position.
+    When a child is anchored on both sides of an axis it is centered
+    between the anchors.
+    
+    Example:
+        >>> layout = RelativeLayout("main")
+        >>> layout.add_view(title)
+        >>> layout.add_view(ok_button)
+        >>> layout.add_rule(title, RelativeLayout.CENTER_HORIZONTAL)
+        >>> layout.add_rule(ok_button, RelativeLayout.BELOW, "title")
+        >>> layout.add_rule(ok_button, RelativeLayout.ALIGN_PARENT_RIGHT)
+    """
+    
+    PARENT = "parent"
+    
+    ALIGN_PARENT_LEFT = "align_parent_left"
+    ALIGN_PARENT_TOP = "align_parent_top"
+    ALIGN_PARENT_RIGHT = "align_parent_right"
+    ALIGN_PARENT_BOTTOM = "align_parent_bottom"
+    CENTER_HORIZONTAL = "center_horizontal"
+    CENTER_VERTICAL = "center_vertical"
+    CENTER_IN_PARENT = "center_in_parent"
+    LEFT_OF = "left_of"
+    RIGHT_OF = "right_of"
+    ABOVE = "above"
+    BELOW = "below"
+    ALIGN_LEFT = "align_left"
+    ALIGN_TOP = "align_top"
+    ALIGN_RIGHT = "align_right"
+    ALIGN_BOTTOM = "align_bottom"
+    
+    # Rule -> list of (axis, slot, anchor edge, anchored to parent);
+    # slot 0 constrains the child's start, slot 1 its end
+    _RULES = {
+        ALIGN_PARENT_LEFT: [("h", 0, _START, True)],
+        ALIGN_PARENT_TOP: [("v", 0, _START, True)],
+        ALIGN_PARENT_RIGHT: [("h", 1, _END, True)],
+        ALIGN_PARENT_BOTTOM: [("v", 1, _END, True)],
+        CENTER_HORIZONTAL: [("h", 0, _START, True), ("h", 1, _END, True)],
+        CENTER_VERTICAL: [("v", 0, _START, True), ("v", 1, _END, True)],
+        CENTER_IN_PARENT: [("h", 0, _START, True), ("h", 1, _END, True),
+                           ("v", 0, _START, True), ("v", 1, _END, True)],
+        LEFT_OF: [("h", 1, _START, False)],
+        RIGHT_OF: [("h", 0, _END, False)],
+        ABOVE: [("v", 1, _START, False)],
+        BELOW: [("v", 0, _END, False)],
+        ALIGN_LEFT: [("h", 0, _START, False)],
+        ALIGN_TOP: [("v", 0, _START, False)],
+        ALIGN_RIGHT: [("h", 1, _END, False)],
+        ALIGN_BOTTOM: [("v", 1, _END, False)],
+    }
     
     def __init__(self, layout_id: str):
         """Initialize RelativeLayout.
@@ -346,14 +1079,661 @@ class RelativeLayout(Layout):
             layout_id: Unique identifier
         """
         super().__init__(layout_id)
+        self._solver = ConstraintSolver()
+        self._parent_vars = {
+            edge: self._solver.variable(f"parent:{edge}")
+            for edge in ("left", "top", "right", "bottom")
+        }
+        # view_id -> (child, (x, y, w, h, ml, mt, mr, mb) variables)
+        self._child_vars: Dict[str, Tuple[Any, Tuple[Variable, ...]]] = {}
+        # view_id -> axis -> [start anchor, end anchor, bias]
+        self._anchors: Dict[str, Dict[str, List[Any]]] = {}
+        # (first member id, axis) -> chain description
+        self._chains: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._chain_of: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        # Solver state built for a key: (constraints, auxiliary variable names)
+        self._built: Dict[Tuple, Tuple[List[LinearConstraint], List[str]]] = {}
+        # Anchor target id -> keys whose constraints reference it
+        self._dependents: Dict[str, set] = {}
+        self._pending: set = set()
+        self._aux_count = 0
+        
+    def _view_id(self, view: Any) -> str:
+        """Accept either a view or its id."""
+        return view if isinstance(view, str) else _node_id(view)
+        
+    def add_view(self, view: View):
+        """Add child view to layout.
+        
+        Args:
+            view: View to add
+        """
+        super().add_view(view)
+        view_id = _node_id(view)
+        variables = tuple(
+            self._solver.variable(f"view:{view_id}.{name}")
+            for name in ("x", "y", "w", "h", "ml", "mt", "mr", "mb")
+        )
+        self._child_vars[view_id] = (view, variables)
+        self._pending.add(("view", view_id, "h"))
+        self._pending.add(("view", view_id, "v"))
+        self._pending.update(self._dependents.get(view_id, ()))
+        
+    def remove_view(self, view: View):
+        """Remove child view from layout.
+        
+        Rules of other children anchored to the removed view are ignored
+        until a view with the same id is added again.
+        
+        Args:
+            view: View to remove
+        """
+        if view not in self.children:
+            return
+        super().remove_view(view)
+        view_id = _node_id(view)
+        # Drop everything reading this view's variables before removing them
+        affected = {("view", view_id, "h"), ("view", view_id, "v")}
+        affected.update(self._dependents.get(view_id, ()))
+        for axis in _AXES:
+            chain_key = self._chain_of.get((view_id, axis))
+            if chain_key is not None:
+                affected.add(("chain", chain_key))
+        for key in affected:
+            self._drop(key)
+        self._pending.update(affected)
+        _, variables = self._child_vars.pop(view_id)
+        for variable in variables:
+            self._solver.remove_variable(variable.name)
+        
+    def add_rule(self, view: Any, rule: str, anchor: Optional[str] = None):
+        """Add a positioning rule for a child.
+        
+        Args:
+            view: Child view or its id
+            rule: One of the rule constants, e.g. RelativeLayout.BELOW
+            anchor: Sibling id, required for sibling rules
+            
+        Raises:
+            ValueError: If the rule is unknown or its anchor is missing
+        """
+        if rule not in self._RULES:
+            raise ValueError(f"Unknown rule '{rule}'")
+        bias = 0.5
+        for axis, slot, edge, to_parent in self._RULES[rule]:
+            if not to_parent and anchor is None:
+                raise ValueError(f"Rule '{rule}' requires an anchor view id")
+            target = self.PARENT if to_parent else anchor
+            self._set_anchor(self._view_id(view), axis, slot, (target, edge), bias)
+            
+    def clear_rules(self, view: Any):
+        """Remove all rules of a child.
+        
+        Args:
+            view: Child view or its id
+        """
+        view_id = self._view_id(view)
+        if self._anchors.pop(view_id, None) is not None:
+            self._pending.add(("view", view_id, "h"))
+            self._pending.add(("view", view_id, "v"))
+            self.invalidate()
+        
+    def _set_anchor(self, view_id: str, axis: str, slot: int,
+                    anchor: Optional[Tuple[str, str]], bias: Optional[float] = None):
+        """Record one anchor of a child and schedule its axis for re-solve."""
+        anchors = self._anchors.setdefault(view_id, {}).setdefault(axis, [None, None, 0.5])
+        anchors[slot] = anchor
+        if bias is not None:
+            anchors[2] = bias
+        key = ("view", view_id, axis)
+        if anchor is not None and anchor[0] != self.PARENT:
+            self._dependents.setdefault(anchor[0], set()).add(key)
+        self._pending.add(key)
+        self.invalidate()
+        
+    def _anchor_expr(self, anchor: Tuple[str, str],
+                     axis: str) -> Optional[Tuple[Dict[Variable, float], float]]:
+        """Return the linear expression for an anchor, or None if it is missing."""
+        target, edge = anchor
+        position, size, _, _, low_edge, high_edge = _AXES[axis]
+        if target == self.PARENT:
+            return {self._parent_vars[low_edge if edge == _START else high_edge]: 1.0}, 0.0
+        entry = self._child_vars.get(target)
+        if entry is None:
+            return None
+        variables = entry[1]
+        if edge == _START:
+            return {variables[position]: 1.0}, 0.0
+        return {variables[position]: 1.0, variables[size]: 1.0}, 0.0
+        
+    def _drop(self, key: Tuple):
+        """Remove the solver constraints built for a key."""
+        built = self._built.pop(key, None)
+        if built is None:
+            return
+        constraints, aux_names = built
+        for constraint in constraints:
+            self._solver.remove_constraint(constraint)
+        for name in aux_names:
+            self._solver.remove_variable(name)
+            
+    def _build(self, key: Tuple):
+        """Create the solver constraints for a pending key."""
+        if key[0] == "view":
+            self._build_view_axis(key[1], key[2])
+            
+    def _build_view_axis(self, view_id: str, axis: str):
+        """Constrain one axis of a child from its anchors."""
+        entry = self._child_vars.get(view_id)
+        if entry is None or (view_id, axis) in self._chain_of:
+            return
+        start_anchor, end_anchor, bias = self._anchors.get(view_id, {}).get(
+            axis, (None, None, 0.5))
+        low = start_anchor and self._anchor_expr(start_anchor, axis)
+        high = end_anchor and self._anchor_expr(end_anchor, axis)
+        if not low and not high:
+            return
+        variables = entry[1]
+        position, size, low_margin, high_margin, _, _ = _AXES[axis]
+        start_expr = low and _combine((1.0, low), (1.0, ({variables[low_margin]: 1.0}, 0.0)))
+        end_expr = high and _combine(
+            (1.0, high),
+            (-1.0, ({variables[high_margin]: 1.0, variables[size]: 1.0}, 0.0))
+        )
+        if start_expr and end_expr:
+            terms, constant = _combine((1.0 - bias, start_expr), (bias, end_expr))
+        else:
+            terms, constant = start_expr or end_expr
+        constraint = self._solver.add_constraint(variables[position], terms, constant)
+        self._built[("view", view_id, axis)] = ([constraint], [])
+        
+    def _rebuild_pending(self) -> None:
+        """Rebuild the constraints of rules and chains edited since the last solve."""
+        if not self._pending:
+            return
+        pending = list(self._pending)
+        self._pending.clear()
+        # Drop first so chains and per-view rules can swap ownership of a variable
+        for key in pending:
+            self._drop(key)
+        for key in sorted(pending, key=lambda k: k[0] == "chain"):
+            self._build(key)
+        
+    def _solve(self, width: int, height: int) -> None:
+        """Feed current sizes, margins and manual positions to the solver and solve."""
+        solver = self._solver
+        pad = self.padding
+        solver.suggest_value(self._parent_vars["left"], pad["left"])
+        solver.suggest_value(self._parent_vars["top"], pad["top"])
+        solver.suggest_value(self._parent_vars["right"], width - pad["right"])
+        solver.suggest_value(self._parent_vars["bottom"], height - pad["bottom"])
+        for child, variables in self._child_vars.values():
+            x, y, w, h = variables[:4]
+            if x._writer is None:
+                solver.suggest_value(x, child.x)
+            if y._writer is None:
+                solver.suggest_value(y, child.y)
+            solver.suggest_value(w, child.measured_width)
+            solver.suggest_value(h, child.measured_height)
+            for variable, margin in zip(variables[4:], child.margins):
+                solver.suggest_value(variable, margin)
+        solver.solve()
+        
+    def on_measure(self, width_spec: Tuple[int, int], height_spec: Tuple[int, int]):
+        """Measure children, size the layout, then solve child positions."""
+        self._rebuild_pending()
+        pad = self.padding
+        pad_width = pad["left"] + pad["right"]
+        pad_height = pad["top"] + pad["bottom"]
+        right = bottom = 0
+        for child in self.children:
+            left_m, top_m, right_m, bottom_m = child.margins
+            child_width, child_height = child.measure(
+                MeasureSpec.get_child_spec(width_spec, pad_width + left_m + right_m,
+                                           child.layout_width),
+                MeasureSpec.get_child_spec(height_spec, pad_height + top_m + bottom_m,
+                                           child.layout_height)
+            )
+            x_var, y_var = self._child_vars[_node_id(child)][1][:2]
+            # Constrained children need room for themselves, manual ones up to their edge
+            if x_var._writer is None:
+                right = max(right, child.x + child_width + right_m)
+            else:
+                right = max(right, pad["left"] + left_m + child_width + right_m)
+            if y_var._writer is None:
+                bottom = max(bottom, child.y + child_height + bottom_m)
+            else:
+                bottom = max(bottom, pad["top"] + top_m + child_height + bottom_m)
+        width = MeasureSpec.resolve_size(right + pad["right"], width_spec)
+        height = MeasureSpec.resolve_size(bottom + pad["bottom"], height_spec)
+        self._set_measured_dimension(width, height)
+        self._solve(width, height)
         
     def arrange_children(self):
-        """Arrange children based on relative positioning rules.
+        """Place children at their solved positions."""
+        self._ensure_measured()
+        for child, variables in self._child_vars.values():
+            child._set_frame(int(round(variables[0].value)), int(round(variables[1].value)),
+                             child.measured_width, child.measured_height)
+
+
+class ConstraintLayout(RelativeLayout):
+    """Flat layout positioning children with constraints, chains and bias.
+    
+    Each side of a child can be constrained to a side of the parent or of
+    a sibling. A child constrained on both sides of an axis is placed
+    between them according to its bias (0.5 centers it). Chains distribute
+    a row or column of children between two anchors.
+    
+    Example:
+        >>> layout = ConstraintLayout("main")
+        >>> layout.constrain(title, top_to_top_of="parent",
+        ...                  left_to_left_of="parent", right_to_right_of="parent")
+        >>> layout.constrain(ok_button, top_to_bottom_of="title")
+        >>> layout.create_chain(["ok", "cancel"], style=ConstraintLayout.CHAIN_SPREAD)
+    """
+    
+    CHAIN_SPREAD = "spread"
+    CHAIN_SPREAD_INSIDE = "spread_inside"
+    CHAIN_PACKED = "packed"
+    
+    # Keyword -> (axis, slot, anchor edge)
+    _CONSTRAINTS = {
+        "left_to_left_of": ("h", 0, _START),
+        "left_to_right_of": ("h", 0, _END),
+        "right_to_left_of": ("h", 1, _START),
+        "right_to_right_of": ("h", 1, _END),
+        "top_to_top_of": ("v", 0, _START),
+        "top_to_bottom_of": ("v", 0, _END),
+        "bottom_to_top_of": ("v", 1, _START),
+        "bottom_to_bottom_of": ("v", 1, _END),
+    }
+    
+    def constrain(self, view: Any, horizontal_bias: Optional[float] = None,
+                  vertical_bias: Optional[float] = None, **constraints: Optional[str]):
+        """Constrain the sides of a child.
+        
+        Args:
+            view: Child view or its id
+            horizontal_bias: Position between left and right anchors (0.0 - 1.0)
+            vertical_bias: Position between top and bottom anchors (0.0 - 1.0)
+            **constraints: Side constraints such as ``left_to_right_of="title"``;
+                targets are sibling ids or "parent", None clears a side
+                
+        Raises:
+            ValueError: If a constraint keyword is unknown
+        """
+        view_id = self._view_id(view)
+        for name, target in constraints.items():
+            if name not in self._CONSTRAINTS:
+                raise ValueError(f"Unknown constraint '{name}'")
+            axis, slot, edge = self._CONSTRAINTS[name]
+            self._set_anchor(view_id, axis, slot, None if target is None else (target, edge))
+        if horizontal_bias is not None:
+            self._set_anchor_bias(view_id, "h", horizontal_bias)
+        if vertical_bias is not None:
+            self._set_anchor_bias(view_id, "v", vertical_bias)
+            
+    def _set_anchor_bias(self, view_id: str, axis: str, bias: float):
+        """Change the bias of one axis of a child."""
+        anchors = self._anchors.setdefault(view_id, {}).setdefault(axis, [None, None, 0.5])
+        anchors[2] = bias
+        self._pending.add(("view", view_id, axis))
+        self.invalidate()
+        
+    def create_chain(self, views: List[Any], orientation: str = "horizontal",
+                     style: str = CHAIN_SPREAD, start: str = RelativeLayout.PARENT,
+                     end: str = RelativeLayout.PARENT, bias: float = 0.5):
+        """Link children into a chain between two anchors.
+        
+        Chain members are positioned by the chain along its axis; their own
+        constraints on that axis are ignored while the chain exists.
+        
+        Args:
+            views: Children (or ids) in chain order
+            orientation: "horizontal" or "vertical"
+            style: CHAIN_SPREAD, CHAIN_SPREAD_INSIDE or CHAIN_PACKED
+            start: Parent or sibling id the chain starts after
+            end: Parent or sibling id the chain ends before
+            bias: Position of a packed chain between its anchors
+            
+        Raises:
+            ValueError: If the style is unknown or views is empty
+        """
+        if style not in (self.CHAIN_SPREAD, self.CHAIN_SPREAD_INSIDE, self.CHAIN_PACKED):
+            raise ValueError(f"Unknown chain style '{style}'")
+        if not views:
+            raise ValueError("A chain needs at least one view")
+        axis = "h" if orientation == "horizontal" else "v"
+        members = [self._view_id(view) for view in views]
+        for member in members:
+            if (member, axis) in self._chain_of:
+                self.remove_chain(member, orientation)
+        
+        chain_key = (members[0], axis)
+        self._chains[chain_key] = {
+            "axis": axis,
+            "members": members,
+            "style": style,
+            "bias": bias,
+            "start": (start, _START) if start == self.PARENT else (start, _END),
+            "end": (end, _END) if end == self.PARENT else (end, _START),
+        }
+        key = ("chain", chain_key)
+        for member in members:
+            self._chain_of[(member, axis)] = chain_key
+            self._dependents.setdefault(member, set()).add(key)
+            self._pending.add(("view", member, axis))
+        for target in (start, end):
+            if target != self.PARENT:
+                self._dependents.setdefault(target, set()).add(key)
+        self._pending.add(key)
+        self.invalidate()
+        
+    def remove_chain(self, view: Any, orientation: str = "horizontal"):
+        """Remove the chain containing a child.
+        
+        Args:
+            view: Any member of the chain, or its id
+            orientation: Orientation of the chain
+        """
+        axis = "h" if orientation == "horizontal" else "v"
+        chain_key = self._chain_of.get((self._view_id(view), axis))
+        if chain_key is None:
+            return
+        chain = self._chains.pop(chain_key)
+        self._drop(("chain", chain_key))
+        self._pending.discard(("chain", chain_key))
+        for member in chain["members"]:
+            del self._chain_of[(member, axis)]
+            self._pending.add(("view", member, axis))
+        self.invalidate()
+        
+    def _build(self, key: Tuple):
+        """Create the solver constraints for a pending key."""
+        if key[0] == "chain":
+            self._build_chain(key[1])
+        else:
+            super()._build(key)
+            
+    def _build_chain(self, chain_key: Tuple[str, str]):
+        """Constrain the members of a chain along its axis."""
+        chain = self._chains.get(chain_key)
+        if chain is None:
+            return
+        axis = chain["axis"]
+        members = [self._child_vars[m][1] for m in chain["members"] if m in self._child_vars]
+        if not members:
+            return
+        position, size, low_margin, high_margin, _, _ = _AXES[axis]
+        low = (self._anchor_expr(chain["start"], axis)
+               or self._anchor_expr((self.PARENT, _START), axis))
+        high = (self._anchor_expr(chain["end"], axis)
+                or self._anchor_expr((self.PARENT, _END), axis))
+        occupied = ({v: 1.0 for variables in members
+                     for v in (variables[size], variables[low_margin],
+                               variables[high_margin])}, 0.0)
+        free = _combine((1.0, high), (-1.0, low), (-1.0, occupied))
+        
+        style = chain["style"]
+        count = len(members)
+        constraints = []
+        aux_names = []
+        gap = None
+        if style == self.CHAIN_PACKED or count == 1:
+            first = _combine((1.0, low), (chain["bias"], free))
+        else:
+            self._aux_count += 1
+            name = f"chain:{self._aux_count}.gap"
+            gap = self._solver.variable(name)
+            aux_names.append(name)
+            divisor = count + 1 if style == self.CHAIN_SPREAD else count - 1
+            gap_terms, gap_constant = _combine((1.0 / divisor, free))
+            constraints.append(self._solver.add_constraint(gap, gap_terms, gap_constant))
+            if style == self.CHAIN_SPREAD:
+                first = _combine((1.0, low), (1.0, ({gap: 1.0}, 0.0)))
+            else:
+                first = low
+        
+        previous = None
+        for variables in members:
+            if previous is None:
+                terms, constant = _combine((1.0, first), (1.0, ({variables[low_margin]: 1.0}, 0.0)))
+            else:
+                terms = {previous[position]: 1.0, previous[size]: 1.0,
+                         previous[high_margin]: 1.0, variables[low_margin]: 1.0}
+                if gap is not None:
+                    terms[gap] = 1.0
+                constant = 0.0
+            constraints.append(self._solver.add_constraint(variables[position], terms, constant))
+            previous = variables
+        self._built[("chain", chain_key)] = (constraints, aux_names)
+
+
+class Adapter(ABC):
+    """Supplies items to a RecyclerView.
+    
+    Subclasses report how many items exist and bind an item's data to a
+    (possibly recycled) view. Override get_item_view_type() to mix view
+    types; views are only ever recycled into items of the same type.
+    
+    Example:
+        >>> class NamesAdapter(Adapter):
+        ...     def __init__(self, names):
+        ...         self.names = names
+        ...     def get_item_count(self):
+        ...         return len(self.names)
+        ...     def bind_view(self, view, position):
+        ...         view.set_text(self.names[position])
+    """
+    
+    VIEW_TYPES = {"TextView": TextView, "Button": Button}
+    
+    @abstractmethod
+    def get_item_count(self) -> int:
+        """Return the number of items in the data set."""
+        pass
+        
+    def get_item_view_type(self, position: int) -> str:
+        """Return the view type used for the item at position.
+        
+        Args:
+            position: Item position
+            
+        Returns:
+            View type name (a key of VIEW_TYPES by default)
+        """
+        return "TextView"
+        
+    def create_view(self, view_type: str, view_id: str) -> View:
+        """Create a new, unbound view for a view type.
+        
+        Args:
+            view_type: View type returned by get_item_view_type()
+            view_id: Unique identifier to give the view
+            
+        Returns:
+            New view instance
+        """
+        return self.VIEW_TYPES[view_type](view_id)
+        
+    @abstractmethod
+    def bind_view(self, view: View, position: int):
+        """Populate a view with the data of the item at position.
+        
+        Args:
+            view: View to bind (freshly created or recycled)
+            position: Item position
+        """
+        pass
+
+
+class RecyclerView(Layout):
+    """Virtualized vertical list backed by an Adapter.
+    
+    Only the items inside the viewport, plus ``prefetch_items`` on either
+    side, are materialized as views. Views that scroll out of range go to a
+    per-type recycling pool and are re-bound to new items, so memory and
+    render time depend on the viewport size rather than the item count.
+    
+    Example:
+        >>> recycler = RecyclerView("list", NamesAdapter(names), item_height=40)
+        >>> recycler.scroll_to(400)
+    """
+    
+    def __init__(self, layout_id: str, adapter: Optional[Adapter] = None,
+                 item_height: int = 48, height: int = 480,
+                 prefetch_items: int = 2, max_recycled_views: int = 20):
+        """Initialize RecyclerView.
+        
+        Args:
+            layout_id: Unique identifier
+            adapter: Adapter providing the items
+            item_height: Height of every item in pixels
+            height: Viewport height in pixels
+            prefetch_items: Extra items kept bound above and below the viewport
+            max_recycled_views: Maximum pooled views kept per view type
+        """
+        super().__init__(layout_id)
+        self.adapter = adapter
+        self.item_height = item_height
+        self.height = height
+        self.layout_height = height
+        self.prefetch_items = prefetch_items
+        self.max_recycled_views = max_recycled_views
+        self.scroll_y = 0
+        self._active: Dict[int, Tuple[str, View]] = {}
+        self._pool: Dict[str, List[View]] = {}
+        self._created_views = 0
+        self._data_changed = False
+        
+    def set_adapter(self, adapter: Optional[Adapter]):
+        """Replace the adapter and reset scrolling.
+        
+        Args:
+            adapter: New adapter, or None to clear the list
+        """
+        self._data_changed = True
+        self.adapter = adapter
+        self.scroll_y = 0
+        self.invalidate()
+        
+    def notify_data_set_changed(self):
+        """Re-bind all visible items on the next render."""
+        self._data_changed = True
+        self.invalidate()
+        
+    def get_item_count(self) -> int:
+        """Return the number of items reported by the adapter."""
+        return self.adapter.get_item_count() if self.adapter else 0
+        
+    def scroll_to(self, y: int):
+        """Scroll so that content offset y is at the top of the viewport.
+        
+        Args:
+            y: Content offset in pixels, clamped to the scrollable range
+        """
+        max_scroll = max(0, self.get_item_count() * self.item_height - self.height)
+        self.scroll_y = min(max(0, y), max_scroll)
+        
+    def on_save_instance_state(self) -> Optional[Dict[str, Any]]:
+        """Save the scroll position."""
+        return {"scroll_y": self.scroll_y} if self.scroll_y else None
+        
+    def on_restore_instance_state(self, state: Dict[str, Any]):
+        """Restore the scroll position, clamped to the current items."""
+        if "scroll_y" in state:
+            self.scroll_to(state["scroll_y"])
+        
+    def scroll_by(self, dy: int):
+        """Scroll by a relative amount.
+        
+        Args:
+            dy: Pixels to scroll (negative scrolls up)
+        """
+        self.scroll_to(self.scroll_y + dy)
+        
+    def get_visible_range(self) -> Tuple[int, int]:
+        """Get the range of bound item positions.
         
-        For now, this is a basic implementation that doesn't
-        move children from their set positions.
+        Returns:
+            Tuple (first, last) with last exclusive, including prefetched items
         """
-        pass  # Children maintain their manually set positions
+        count = self.get_item_count()
+        first = self.scroll_y // self.item_height - self.prefetch_items
+        last = -(-(self.scroll_y + self.height) // self.item_height) + self.prefetch_items
+        return max(0, first), min(count, last)
+        
+    def _obtain_view(self, view_type: str) -> View:
+        """Take a view of the given type from the pool or create one."""
+        pool = self._pool.get(view_type)
+        if pool:
+            return pool.pop()
+        view_id = f"{self.layout_id}_item_{self._created_views}"
+        self._created_views += 1
+        return self.adapter.create_view(view_type, view_id)
+        
+    def _recycle(self, position: int):
+        """Detach the view bound at position and return it to the pool."""
+        view_type, view = self._active.pop(position)
+        self.remove_view(view)
+        pool = self._pool.setdefault(view_type, [])
+        if len(pool) < self.max_recycled_views:
+            pool.append(view)
+            
+    def on_measure(self, width_spec: Tuple[int, int], height_spec: Tuple[int, int]):
+        """Measure the viewport; items are measured when they are bound."""
+        pad = self.padding
+        content_height = self.get_item_count() * self.item_height + pad["top"] + pad["bottom"]
+        self._set_measured_dimension(
+            MeasureSpec.resolve_size(pad["left"] + pad["right"], width_spec),
+            MeasureSpec.resolve_size(content_height, height_spec)
+        )
+        
+    def arrange_children(self):
+        """Bind the items in range and stack them at fixed item height."""
+        self._ensure_measured()
+        # Items are measured against the width spec the list itself received
+        width_spec = self._measure_key[0]
+        first, last = self.get_visible_range()
+        for position in list(self._active):
+            if self._data_changed or not first <= position < last:
+                self._recycle(position)
+        self._data_changed = False
+        
+        for position in range(first, last):
+            if position not in self._active:
+                view_type = self.adapter.get_item_view_type(position)
+                view = self._obtain_view(view_type)
+                self.adapter.bind_view(view, position)
+                self._active[position] = (view_type, view)
+                self.add_view(view)
+                
+        self.children[:] = [self._active[p][1] for p in range(first, last)]
+        left = self.padding["left"]
+        top = self.padding["top"] - self.scroll_y
+        item_spec = (MeasureSpec.EXACTLY, self.item_height)
+        pad_width = self.padding["left"] + self.padding["right"]
+        for position in range(first, last):
+            view = self._active[position][1]
+            left_m, _, right_m, _ = view.margins
+            view_width, _ = view.measure(
+                MeasureSpec.get_child_spec(width_spec, pad_width + left_m + right_m,
+                                           view.layout_width),
+                item_spec
+            )
+            view._set_frame(left + left_m, top + position * self.item_height,
+                            view_width, self.item_height)
+            
+    def render(self) -> Dict[str, Any]:
+        """Render the bound items along with scroll information."""
+        if not self._dirty and self._render_cache is not None:
+            return self._render_cache
+        data = super().render()
+        data["scroll_y"] = self.scroll_y
+        data["item_height"] = self.item_height
+        data["item_count"] = self.get_item_count()
+        return data
 
 
 class Widget:
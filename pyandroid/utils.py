@@ -6,93 +6,184 @@ like logging, file management, and networking.
 
 import logging
 import os
-import json
-from typing import Any, Dict, Optional, List
-from urllib.request import urlopen, Request
-from urllib.error import URLError
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, List, Union
+
+# json and urllib are imported where they are used, keeping
+# `import pyandroid.utils` cheap for processes that never touch them
+
+# FileManager durability policies
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_GROUP = "group"
+_FSYNC_POLICIES = (FSYNC_NONE, FSYNC_FILE, FSYNC_GROUP)
 
 
 class Logger:
-    """Enhanced logging utility for Android applications."""
+    """Enhanced logging utility for Android applications.
+    
+    Records are queued and written by a shared background thread (see
+    pyandroid.logs), so logging never blocks on terminal or file I/O.
+    Loggers with the same name share one underlying logging.Logger and
+    print each line once.
     
-    def __init__(self, name: str, level: str = "INFO"):
+    DEBUG and INFO records can be rate limited and sampled per call site,
+    so a line logged on every event cannot flood the output. The first
+    record a call site logs after a period in which records were dropped
+    is preceded by an "N similar messages suppressed" summary. Warnings
+    and errors are never dropped.
+    
+    Example:
+        >>> logger = Logger("Counter", rate_limit=5, sample_rate=0.1)
+        >>> logger.info("Clicked %d times", count, button="increment")
+    """
+    
+    def __init__(self, name: str, level: str = "INFO", rate_limit: Optional[int] = None,
+                 rate_period: float = 1.0, sample_rate: float = 1.0):
         """Initialize logger.
         
         Args:
             name: Logger name
             level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            rate_limit: Most DEBUG/INFO records logged per call site per
+                rate_period; None for no limit
+            rate_period: Length in seconds of a rate limiting period
+            sample_rate: Fraction of DEBUG/INFO records logged, chosen at random
         """
+        from .logs import queue_handler
+        
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, level.upper()))
+        # addHandler() ignores a handler that is already attached
+        self.logger.addHandler(queue_handler())
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.sample_rate = sample_rate
+        self._throttled = rate_limit is not None or sample_rate < 1.0
+        if sample_rate < 1.0:
+            import random
+            self._random = random.random
+        # [period start, records logged, records dropped] by (code, line) of the call site
+        self._sites: Dict[tuple, list] = {}
         
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+    def _log(self, level: int, message: str, args: tuple, fields: Dict[str, Any]) -> None:
+        """Queue a record if the level is enabled; formatting is left to the writer."""
+        if not self.logger.isEnabledFor(level):
+            return
+        if self._throttled and level < logging.WARNING:
+            caller = sys._getframe(2)
+            if not self._admit(level, (caller.f_code, caller.f_lineno)):
+                return
+        self.logger.log(level, message, *args, extra={"fields": fields} if fields else None,
+                        stacklevel=3)
         
-        # Create console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-        
-    def debug(self, message: str, **kwargs):
+    def _admit(self, level: int, site: tuple) -> bool:
+        """Apply sampling and the rate limit to a record from a call site."""
+        now = time.monotonic()
+        state = self._sites.get(site)
+        if state is None:
+            state = self._sites[site] = [now, 0, 0]
+        elif now - state[0] >= self.rate_period:
+            dropped = state[2]
+            state[0], state[1], state[2] = now, 0, 0
+            if dropped:
+                self.logger.log(level, "%d similar messages suppressed", dropped,
+                                extra={"fields": {"suppressed": dropped}}, stacklevel=4)
+        if ((self.sample_rate < 1.0 and self._random() >= self.sample_rate)
+                or (self.rate_limit is not None and state[1] >= self.rate_limit)):
+            state[2] += 1
+            return False
+        state[1] += 1
+        return True
+            
+    def debug(self, message: str, *args, **kwargs):
         """Log debug message.
         
         Args:
-            message: Debug message
-            **kwargs: Additional context
+            message: Debug message, optionally with %-style placeholders
+            *args: Values for the placeholders; only formatted if logged
+            **kwargs: Structured fields attached to the record
         """
-        self.logger.debug(f"{message} {kwargs if kwargs else ''}")
+        self._log(logging.DEBUG, message, args, kwargs)
         
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, *args, **kwargs):
         """Log info message.
         
         Args:
-            message: Info message
-            **kwargs: Additional context
+            message: Info message, optionally with %-style placeholders
+            *args: Values for the placeholders; only formatted if logged
+            **kwargs: Structured fields attached to the record
         """
-        self.logger.info(f"{message} {kwargs if kwargs else ''}")
+        self._log(logging.INFO, message, args, kwargs)
         
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """Log warning message.
         
         Args:
-            message: Warning message
-            **kwargs: Additional context
+            message: Warning message, optionally with %-style placeholders
+            *args: Values for the placeholders; only formatted if logged
+            **kwargs: Structured fields attached to the record
         """
-        self.logger.warning(f"{message} {kwargs if kwargs else ''}")
+        self._log(logging.WARNING, message, args, kwargs)
         
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, *args, **kwargs):
         """Log error message.
         
         Args:
-            message: Error message
-            **kwargs: Additional context
+            message: Error message, optionally with %-style placeholders
+            *args: Values for the placeholders; only formatted if logged
+            **kwargs: Structured fields attached to the record
         """
-        self.logger.error(f"{message} {kwargs if kwargs else ''}")
+        self._log(logging.ERROR, message, args, kwargs)
         
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, *args, **kwargs):
         """Log critical message.
         
         Args:
-            message: Critical message
-            **kwargs: Additional context
+            message: Critical message, optionally with %-style placeholders
+            *args: Values for the placeholders; only formatted if logged
+            **kwargs: Structured fields attached to the record
         """
-        self.logger.critical(f"{message} {kwargs if kwargs else ''}")
+        self._log(logging.CRITICAL, message, args, kwargs)
 
 
 class FileManager:
-    """File and storage management utility."""
+    """File and storage management utility.
+    
+    Files are written atomically: the content goes to a temporary file in
+    the same directory, which then replaces the target with os.replace(),
+    so a crash leaves either the old or the new file, never a truncated
+    one. The fsync policy decides how durable a write is when it returns:
+    
+    - FSYNC_NONE: no fsync; survives an app crash, not a power loss
+    - FSYNC_FILE: each file and then its directory are fsynced
+    - FSYNC_GROUP: each file is fsynced, and each directory once per
+      write_batch() call after every file in it has been renamed
+    """
     
-    def __init__(self, app_name: str):
+    def __init__(self, app_name: str, fsync: str = FSYNC_NONE):
         """Initialize file manager.
         
         Args:
             app_name: Application name for creating app-specific directories
+            fsync: Durability policy: FSYNC_NONE, FSYNC_FILE or FSYNC_GROUP
+            
+        Raises:
+            ValueError: If the fsync policy is unknown
         """
+        if fsync not in _FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. "
+                             f"Available policies: {list(_FSYNC_POLICIES)}")
+        self.fsync = fsync
         self.app_name = app_name
         self.app_dir = os.path.expanduser(f"~/.{app_name.lower()}")
         self.logger = Logger(f"FileManager.{app_name}")
+        # SharedPreferences by name, so every caller shares one cache
+        self._preferences: Dict[str, Any] = {}
         
         # Create app directory if it doesn't exist
         self._ensure_app_directory()
@@ -114,7 +205,7 @@ class FileManager:
         return self.app_dir
         
     def write_file(self, filename: str, content: str, subdir: str = "") -> bool:
-        """Write content to file.
+        """Write content to file atomically.
         
         Args:
             filename: Name of file to write
@@ -124,21 +215,57 @@ class FileManager:
         Returns:
             True if successful, False otherwise
         """
+        if not self.write_batch({filename: content}, subdir):
+            return False
+        self.logger.info(
+            f"File written successfully: {os.path.join(self.app_dir, subdir, filename)}")
+        return True
+        
+    def write_batch(self, files: Dict[str, Union[str, bytes]], subdir: str = "") -> bool:
+        """Write many files atomically in one pass.
+        
+        Each file is replaced atomically; the batch as a whole is not. With
+        FSYNC_GROUP every directory is fsynced once, after all files were
+        renamed, instead of once per file.
+        
+        Args:
+            files: Content by file name; str content is encoded as UTF-8
+            subdir: Subdirectory within app directory
+            
+        Returns:
+            True if every file was written, False otherwise
+            
+        Example:
+            >>> file_manager.write_batch({"a.state": data_a, "b.state": data_b}, "state")
+        """
+        directory = os.path.join(self.app_dir, subdir) if subdir else self.app_dir
+        # Temporary files not yet renamed, cleaned up on failure
+        pending: List[str] = []
+        filename = ""
         try:
-            if subdir:
-                file_dir = os.path.join(self.app_dir, subdir)
-                os.makedirs(file_dir, exist_ok=True)
-                filepath = os.path.join(file_dir, filename)
-            else:
-                filepath = os.path.join(self.app_dir, filename)
-                
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-                
-            self.logger.info(f"File written successfully: {filepath}")
+            os.makedirs(directory, exist_ok=True)
+            sync_files = self.fsync != FSYNC_NONE
+            for filename, content in files.items():
+                filepath = os.path.join(directory, filename)
+                data = content.encode('utf-8') if isinstance(content, str) else content
+                temp_path = _write_temp(filepath, data, sync_files)
+                pending.append(temp_path)
+                os.replace(temp_path, filepath)
+                pending.pop()
+                if self.fsync == FSYNC_FILE:
+                    _fsync_directory(os.path.dirname(filepath))
+            if self.fsync == FSYNC_GROUP:
+                for synced in {os.path.dirname(os.path.join(directory, name)) for name in files}:
+                    _fsync_directory(synced)
+            self.logger.debug(f"Wrote {len(files)} files to {directory}")
             return True
             
         except Exception as e:
+            for temp_path in pending:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
             self.logger.error(f"Failed to write file {filename}: {e}")
             return False
             
@@ -168,6 +295,68 @@ class FileManager:
             self.logger.error(f"Failed to read file {filename}: {e}")
             return None
             
+    def write_bytes(self, filename: str, data: bytes, subdir: str = "",
+                    append: bool = False) -> bool:
+        """Write binary data to file.
+        
+        Replacing a file is atomic. Appending writes in place, fsyncing the
+        file unless the policy is FSYNC_NONE.
+        
+        Args:
+            filename: Name of file to write
+            data: Bytes to write
+            subdir: Subdirectory within app directory
+            append: Append to the file instead of replacing it
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not append:
+            return self.write_batch({filename: data}, subdir)
+        try:
+            if subdir:
+                file_dir = os.path.join(self.app_dir, subdir)
+                os.makedirs(file_dir, exist_ok=True)
+                filepath = os.path.join(file_dir, filename)
+            else:
+                filepath = os.path.join(self.app_dir, filename)
+                
+            with open(filepath, 'ab') as f:
+                f.write(data)
+                if self.fsync != FSYNC_NONE:
+                    f.flush()
+                    os.fsync(f.fileno())
+                
+            self.logger.debug(f"Wrote {len(data)} bytes to {filepath}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to write file {filename}: {e}")
+            return False
+            
+    def read_bytes(self, filename: str, subdir: str = "") -> Optional[bytes]:
+        """Read binary data from file.
+        
+        Args:
+            filename: Name of file to read
+            subdir: Subdirectory within app directory
+            
+        Returns:
+            File content or None if the file is missing or unreadable
+        """
+        if subdir:
+            filepath = os.path.join(self.app_dir, subdir, filename)
+        else:
+            filepath = os.path.join(self.app_dir, filename)
+        try:
+            with open(filepath, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Failed to read file {filename}: {e}")
+            return None
+            
     def delete_file(self, filename: str, subdir: str = "") -> bool:
         """Delete file.
         
@@ -230,6 +419,8 @@ class FileManager:
         Returns:
             True if successful, False otherwise
         """
+        import json
+        
         try:
             json_content = json.dumps(data, indent=2, ensure_ascii=False)
             return self.write_file(filename, json_content, subdir)
@@ -247,6 +438,8 @@ class FileManager:
         Returns:
             Loaded data or None if failed
         """
+        import json
+        
         try:
             content = self.read_file(filename, subdir)
             if content:
@@ -255,6 +448,58 @@ class FileManager:
         except Exception as e:
             self.logger.error(f"Failed to load JSON {filename}: {e}")
             return None
+        
+    def get_shared_preferences(self, name: str) -> 'SharedPreferences':
+        """Get the key/value preferences stored under a name.
+        
+        The same object is returned for the same name. Values are read
+        from disk once and cached; see pyandroid.preferences.
+        
+        Args:
+            name: Preferences name
+            
+        Returns:
+            SharedPreferences instance
+            
+        Example:
+            >>> prefs = file_manager.get_shared_preferences("settings")
+            >>> prefs.edit().put("volume", 7).apply()
+        """
+        preferences = self._preferences.get(name)
+        if preferences is None:
+            from .preferences import SharedPreferences
+            preferences = self._preferences[name] = SharedPreferences(self, name)
+        return preferences
+
+
+def _write_temp(filepath: str, data: bytes, sync: bool) -> str:
+    """Write data to a temporary file next to filepath and return its path."""
+    directory, name = os.path.split(filepath)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return temp_path
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make renames in a directory durable; a no-op where directories cannot be opened."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 class NetworkManager:
@@ -284,6 +529,9 @@ class NetworkManager:
         Returns:
             Response content or None if failed
         """
+        from urllib.error import URLError
+        from urllib.request import Request, urlopen
+        
         try:
             request_headers = self.default_headers.copy()
             if headers:
@@ -316,6 +564,9 @@ class NetworkManager:
         Returns:
             Response content or None if failed
         """
+        from urllib.error import URLError
+        from urllib.request import Request, urlopen
+        
         try:
             request_headers = self.default_headers.copy()
             request_headers['Content-Type'] = 'application/json'
@@ -353,6 +604,8 @@ class NetworkManager:
         Returns:
             Response data as dictionary or None if failed
         """
+        import json
+        
         try:
             json_data = json.dumps(data)
             response = self.post(url, json_data, headers)
@@ -377,6 +630,8 @@ class NetworkManager:
         Returns:
             True if connected, False otherwise
         """
+        from urllib.request import Request, urlopen
+        
         try:
             request = Request(test_url, headers=self.default_headers)
             with urlopen(request, timeout=5) as response:
@@ -3,6 +3,8 @@
 import pytest
 import logging
 
+from pyandroid.utils import FileManager
+
 
 @pytest.fixture(autouse=True)
 def configure_logging():
@@ -11,6 +13,19 @@ def configure_logging():
     logging.getLogger("PyAndroid").setLevel(logging.WARNING)
 
 
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Use a temporary home directory for app directories."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def file_manager(home):
+    """Create a FileManager inside a temporary home directory."""
+    return FileManager("TestApp")
+
+
 @pytest.fixture
 def mock_kivy_available(monkeypatch):
     """Mock Kivy availability for testing GUI features."""
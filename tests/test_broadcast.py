@@ -0,0 +1,158 @@
+"""Tests for PyAndroid broadcasts."""
+
+import threading
+
+import pytest
+from pyandroid.broadcast import BroadcastReceiver
+from pyandroid.core import AndroidApp, Intent, IntentFilter
+
+
+@pytest.fixture
+def app():
+    """Create a console app whose looper delivers broadcasts."""
+    return AndroidApp("BroadcastApp", "com.test.broadcast", use_gui=False)
+
+
+class RecordingReceiver(BroadcastReceiver):
+    """Receiver recording what it gets, optionally aborting or answering."""
+
+    def __init__(self, name, log, abort=False):
+        self.name = name
+        self.log = log
+        self.abort = abort
+
+    def on_receive(self, intent):
+        self.log.append((self.name, intent.action))
+        if self.is_ordered_broadcast():
+            self.result.data = (self.result.data or "") + self.name
+            if self.abort:
+                self.abort_broadcast()
+
+
+class TestBroadcasts:
+    """Test cases for send_broadcast and register_receiver."""
+
+    def test_delivery_is_asynchronous_and_by_action(self, app):
+        """Test that receivers get their actions on the next loop tick."""
+        received = []
+        app.register_receiver(received.append, "SYNC")
+        app.register_receiver(lambda intent: received.append("other"), "OTHER")
+
+        intent = Intent("SYNC")
+        app.send_broadcast(intent)
+        assert received == []
+
+        app.looper.run_until_idle()
+        assert received == [intent]
+
+    def test_priority_order_and_filters(self, app):
+        """Test priority ordering and filter matching."""
+        log = []
+        app.register_receiver(RecordingReceiver("low", log), "PING")
+        app.register_receiver(RecordingReceiver("high", log), "PING", priority=10)
+        app.register_receiver(RecordingReceiver("images", log),
+                              IntentFilter(actions=["PING"], mime_types=["image/*"]))
+
+        app.send_broadcast(Intent("PING"))
+        app.send_broadcast(Intent("PING", mime_type="image/png"))
+        app.looper.run_until_idle()
+
+        assert log == [("high", "PING"), ("low", "PING"), ("images", "PING")]
+
+    def test_burst_is_delivered_in_one_message(self, app):
+        """Test that a burst needs one looper message and batches coalesce."""
+        single, batches = [], []
+        app.register_receiver(single.append, "SENSOR")
+        app.register_receiver(batches.append, "SENSOR", batch=True)
+
+        for value in range(100):
+            intent = Intent("SENSOR")
+            intent.put_extra("value", value)
+            app.send_broadcast(intent)
+
+        assert app.looper.pending_count() == 1
+        app.looper.run_until_idle()
+
+        assert len(single) == 100
+        assert len(batches) == 1
+        assert [intent.get_extra("value") for intent in batches[0]] == list(range(100))
+
+    def test_ordered_broadcast_abort_and_result(self, app):
+        """Test that ordered receivers share a result and can abort."""
+        log, results = [], []
+        app.register_receiver(RecordingReceiver("a", log), "ORDER", priority=3)
+        app.register_receiver(RecordingReceiver("b", log, abort=True), "ORDER", priority=2)
+        app.register_receiver(RecordingReceiver("c", log), "ORDER", priority=1)
+
+        app.send_ordered_broadcast(Intent("ORDER"), results.append, initial_data=">")
+        app.looper.run_until_idle()
+
+        assert log == [("a", "ORDER"), ("b", "ORDER")]
+        assert results[0].data == ">ab" and results[0].aborted
+
+    def test_ordered_broadcast_to_batch_receivers(self, app):
+        """Test that batch receivers of an ordered broadcast get a one-intent list."""
+        log, batches, results = [], [], []
+        app.register_receiver(RecordingReceiver("a", log), "ORDER", priority=2, batch=True)
+        app.register_receiver(batches.append, "ORDER", priority=1, batch=True)
+
+        intent = Intent("ORDER")
+        app.send_ordered_broadcast(intent, results.append, initial_data=">")
+        app.looper.run_until_idle()
+
+        assert log == [("a", "ORDER")]
+        assert batches == [[intent]]
+        assert results[0].data == ">a" and not results[0].aborted
+
+    def test_sticky_broadcast(self, app):
+        """Test that late receivers get the last sticky intent."""
+        first, second = Intent("BATTERY"), Intent("BATTERY")
+        app.send_sticky_broadcast(first)
+        app.send_sticky_broadcast(second)
+        app.looper.run_until_idle()
+
+        received = []
+        assert app.register_receiver(received.append, "BATTERY") is second
+        assert app.register_receiver(None, "BATTERY") is second
+        app.looper.run_until_idle()
+        assert received == [second]
+
+        assert app.remove_sticky_broadcast("BATTERY") is True
+        assert app.register_receiver(None, "BATTERY") is None
+
+    def test_unregister_and_errors(self, app):
+        """Test unregistering, including during delivery, and failing receivers."""
+        received = []
+
+        def failing(intent):
+            raise RuntimeError("boom")
+
+        def unregister_other(intent):
+            app.unregister_receiver(received.append)
+
+        app.register_receiver(failing, "EVENT", priority=2)
+        app.register_receiver(unregister_other, "EVENT", priority=1)
+        app.register_receiver(received.append, "EVENT")
+
+        app.send_broadcast(Intent("EVENT"))
+        app.looper.run_until_idle()
+
+        assert received == []
+        assert app.unregister_receiver(received.append) is False
+        assert app.unregister_receiver(failing) is True
+
+    def test_send_from_other_threads(self, app):
+        """Test that broadcasts sent from worker threads all arrive."""
+        received = []
+        app.register_receiver(received.append, "WORK", batch=True)
+
+        threads = [threading.Thread(target=lambda: [app.send_broadcast(Intent("WORK"))
+                                                    for _ in range(50)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        app.looper.run_until_idle()
+
+        assert sum(len(batch) for batch in received) == 200
@@ -0,0 +1,80 @@
+"""Tests for the PyAndroid constraint solver."""
+
+import pytest
+from pyandroid.constraints import ConstraintSolver
+from pyandroid.core import ConstraintError
+
+
+@pytest.fixture
+def solver():
+    """Create an empty solver."""
+    return ConstraintSolver()
+
+
+class TestConstraintSolver:
+    """Test cases for ConstraintSolver class."""
+    
+    def test_solve_chain_of_constraints(self, solver):
+        """Test that dependent constraints are evaluated in order."""
+        left = solver.variable("left")
+        middle = solver.variable("middle")
+        right = solver.variable("right")
+        solver.add_constraint(right, {middle: 1.0}, 10.0)
+        solver.add_constraint(middle, {left: 0.5}, 0.0)
+        
+        solver.suggest_value(left, 100)
+        changed = solver.solve()
+        
+        assert middle.value == 50
+        assert right.value == 60
+        assert set(changed) == {middle, right}
+    
+    def test_incremental_resolve(self, solver):
+        """Test that only constraints downstream of a change are re-evaluated."""
+        a = solver.variable("a")
+        b = solver.variable("b")
+        out_a = solver.variable("out_a")
+        out_b = solver.variable("out_b")
+        solver.add_constraint(out_a, {a: 1.0}, 1.0)
+        solver.add_constraint(out_b, {b: 1.0}, 1.0)
+        solver.solve()
+        
+        solver.suggest_value(b, 5)
+        assert solver.solve() == [out_b]
+        assert solver.solve() == []
+    
+    def test_cycle_rejected(self, solver):
+        """Test that cyclic constraints raise ConstraintError."""
+        a = solver.variable("a")
+        b = solver.variable("b")
+        c = solver.variable("c")
+        solver.add_constraint(b, {a: 1.0})
+        solver.add_constraint(c, {b: 1.0})
+        
+        with pytest.raises(ConstraintError):
+            solver.add_constraint(a, {c: 1.0})
+        with pytest.raises(ConstraintError):
+            solver.add_constraint(a, {a: 1.0})
+    
+    def test_double_constraint_rejected(self, solver):
+        """Test that a variable can only have one defining constraint."""
+        a = solver.variable("a")
+        b = solver.variable("b")
+        solver.add_constraint(b, {a: 1.0})
+        
+        with pytest.raises(ConstraintError):
+            solver.add_constraint(b, {a: 2.0})
+        with pytest.raises(ConstraintError):
+            solver.suggest_value(b, 3)
+    
+    def test_replace_constraint(self, solver):
+        """Test removing a constraint and adding a new one for the same output."""
+        a = solver.variable("a", 2.0)
+        b = solver.variable("b")
+        constraint = solver.add_constraint(b, {a: 1.0})
+        solver.solve()
+        
+        solver.remove_constraint(constraint)
+        solver.add_constraint(b, {a: 3.0})
+        solver.solve()
+        assert b.value == 6.0
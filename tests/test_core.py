@@ -5,10 +5,15 @@ from pyandroid.core import (
     AndroidApp, 
     Activity, 
     Intent,
+    IntentFilter,
     ActivityNotFoundError,
-    InvalidStateError
+    InvalidStateError,
+    DuplicateViewIdError
 )
-from pyandroid.ui import TextView
+from pyandroid.ui import TextView, Button, EditText, LinearLayout, RelativeLayout
+from pyandroid.lifecycle import LifecycleObserver, State
+from pyandroid.state import InstanceStateStore
+from pyandroid.utils import FileManager
 
 
 @pytest.fixture
@@ -78,9 +83,177 @@ class TestAndroidApp:
         test_app.start_activity("activity2")
         second_activity = test_app.current_activity
         
-        assert first_activity.state == "destroyed"
+        assert first_activity.state == "stopped"
         assert second_activity.state == "started"
         assert first_activity != second_activity
+        assert test_app.get_back_stack() == ["activity1"]
+
+
+    def test_console_run_drains_looper(self, test_app):
+        """Test that console mode runs posted work until the looper is idle."""
+        class MainActivity(Activity):
+            pass
+        
+        calls = []
+        test_app.register_activity("main", MainActivity)
+        test_app.start_activity("main")
+        test_app.handler.post_delayed(lambda: calls.append("tick"), 1)
+        test_app.run()
+        
+        assert calls == ["tick"]
+        assert test_app.looper.pending_count() == 0
+
+
+class TestBackStack:
+    """Test cases for back navigation and warm activity retention."""
+    
+    @pytest.fixture
+    def app(self):
+        """Create an app with counting activities registered."""
+        class CountingActivity(Activity):
+            starts = 0
+            
+            def on_start(self):
+                type(self).starts += 1
+                self.counter = 0
+                
+            def on_save_instance_state(self, out_state):
+                out_state["counter"] = self.counter
+                
+            def on_restore_instance_state(self, saved_state):
+                self.counter = saved_state["counter"]
+        
+        app = AndroidApp("TestApp", "com.test.app", use_gui=False, max_warm_activities=2)
+        for name in ("a", "b", "c", "d"):
+            app.register_activity(name, type(f"Activity_{name}", (CountingActivity,), {}))
+        return app
+    
+    def test_back_restarts_warm_activity(self, app):
+        """Test that going back resumes the same instance without on_start."""
+        app.start_activity("a")
+        app.run()
+        first = app.current_activity
+        app.start_activity("b")
+        
+        assert first.state == "stopped"
+        assert app.current_activity.state == "resumed"
+        assert app.back()
+        assert app.current_activity is first
+        assert first.state == "resumed"
+        assert app.activities["a"].starts == 1
+        
+    def test_finish_last_activity(self, app):
+        """Test that finishing the only activity leaves no current activity."""
+        app.start_activity("a")
+        activity = app.current_activity
+        activity.finish()
+        
+        assert activity.state == "destroyed"
+        assert app.current_activity is None
+        assert not app.back()
+        
+    def test_lru_eviction_keeps_saved_state(self, app):
+        """Test that evicted activities are rebuilt from their saved state."""
+        app.start_activity("a")
+        first = app.current_activity
+        first.counter = 7
+        for name in ("b", "c", "d"):
+            app.start_activity(name)
+            
+        assert first.state == "destroyed"
+        assert app.get_back_stack() == ["a", "b", "c"]
+        
+        app.back()
+        app.back()
+        app.back()
+        
+        rebuilt = app.current_activity
+        assert rebuilt is not first
+        assert rebuilt.name == "a"
+        assert rebuilt.counter == 7
+        assert app.activities["a"].starts == 2
+        
+    def test_view_budget(self, app):
+        """Test that the warm view budget evicts heavy activities."""
+        app.max_warm_views = 1
+        app.start_activity("a")
+        first = app.current_activity
+        layout = LinearLayout("main")
+        layout.add_view(TextView("text", "Hello"))
+        first.add_view("main", layout)
+        app.start_activity("b")
+        
+        assert first.state == "destroyed"
+        
+    def test_finish_activity_below_top(self, app):
+        """Test finishing an activity that is on the back stack."""
+        app.start_activity("a")
+        first = app.current_activity
+        app.start_activity("b")
+        first.finish()
+        
+        assert first.state == "destroyed"
+        assert app.get_back_stack() == []
+
+
+class FormActivity(Activity):
+    """Activity with a saved field and an input to test instance state."""
+    
+    SAVED_STATE_FIELDS = ("counter",)
+    
+    def on_start(self):
+        self.counter = 0
+        self.restored_note = None
+        layout = LinearLayout("form")
+        layout.add_view(EditText("name_input", hint="Name"))
+        layout.add_view(TextView("banner", "Welcome"))
+        self.add_view("form", layout)
+        
+    def on_save_instance_state(self, out_state):
+        out_state["note"] = "saved"
+        
+    def on_restore_instance_state(self, saved_state):
+        self.restored_note = saved_state.get("note")
+
+
+class TestInstanceState:
+    """Test cases for saving and restoring activity state."""
+    
+    def test_save_and_restore(self):
+        """Test that fields, view state and custom state are restored."""
+        activity = FormActivity("form")
+        activity.start()
+        activity.counter = 5
+        activity.get_view("name_input").set_text("Ada")
+        activity.get_view("banner").visible = False
+        state = activity.save_instance_state()
+        
+        assert set(state["android:views"]) == {"name_input", "banner"}
+        
+        rebuilt = FormActivity("form")
+        rebuilt.start()
+        rebuilt.restore_instance_state(state)
+        
+        assert rebuilt.counter == 5
+        assert rebuilt.get_view("name_input").get_text() == "Ada"
+        assert rebuilt.get_view("banner").visible is False
+        assert rebuilt.restored_note == "saved"
+        
+    def test_checkpoint_and_restore_activity(self, file_manager):
+        """Test persisting state through FileManager and restoring it."""
+        app = AndroidApp("StateApp", "com.test.state", use_gui=False)
+        app.state_store = InstanceStateStore(file_manager)
+        app.register_activity("form", FormActivity)
+        app.start_activity("form")
+        app.current_activity.counter = 9
+        assert app.checkpoint()
+        
+        relaunched = AndroidApp("StateApp", "com.test.state", use_gui=False)
+        relaunched.state_store = InstanceStateStore(FileManager(file_manager.app_name))
+        relaunched.register_activity("form", FormActivity)
+        
+        assert relaunched.restore_activity("form")
+        assert relaunched.current_activity.counter == 9
 
 
 class TestActivity:
@@ -148,6 +321,68 @@ class TestActivity:
         
         assert called_methods == ['on_start', 'on_resume', 'on_pause', 'on_stop', 'on_destroy']
     
+    def test_state_codes(self, test_activity):
+        """Test the string state and the State enum stay in sync."""
+        test_activity.start()
+        assert test_activity.state == "started"
+        assert test_activity.lifecycle_state is State.STARTED
+        
+        test_activity.state = "stopped"
+        assert test_activity.lifecycle_state is State.STOPPED
+        with pytest.raises(ValueError):
+            test_activity.state = "sleeping"
+    
+    def test_custom_transitions(self):
+        """Test that subclasses can override VALID_TRANSITIONS."""
+        class SkippingActivity(Activity):
+            VALID_TRANSITIONS = {**Activity.VALID_TRANSITIONS, "created": ["started", "destroyed"]}
+        
+        activity = SkippingActivity("skip")
+        activity.destroy()
+        assert activity.state == "destroyed"
+        with pytest.raises(InvalidStateError):
+            Activity("plain").destroy()
+    
+    def test_lifecycle_observers(self):
+        """Test observer ordering, catch-up on add and removal."""
+        events = []
+        
+        class LoggingActivity(Activity):
+            def on_resume(self):
+                events.append("activity resume")
+            
+            def on_pause(self):
+                events.append("activity pause")
+        
+        class Observer(LifecycleObserver):
+            def on_create(self, owner):
+                events.append("create")
+            
+            def on_start(self, owner):
+                events.append("start")
+            
+            def on_resume(self, owner):
+                events.append("resume")
+            
+            def on_pause(self, owner):
+                events.append("pause")
+        
+        activity = LoggingActivity("observed")
+        activity.start()
+        observer = Observer()
+        activity.add_observer(observer)
+        activity.add_observer(observer)
+        assert events == ["create", "start"]
+        
+        activity.resume()
+        activity.pause()
+        assert events[2:] == ["activity resume", "resume", "pause", "activity pause"]
+        
+        assert activity.remove_observer(observer) is True
+        assert activity.remove_observer(observer) is False
+        activity.resume()
+        assert events[-1] == "activity resume"
+    
     def test_add_view(self, test_activity):
         """Test adding views to activity."""
         view = TextView("test_view", "Test")
@@ -170,6 +405,43 @@ class TestActivity:
         # Try removing non-existent view
         assert test_activity.remove_view("nonexistent") is False
     
+    def test_get_nested_view(self, test_activity):
+        """Test that views nested in layouts are found by ID."""
+        layout = LinearLayout("main")
+        row = LinearLayout("row", orientation="horizontal")
+        layout.add_view(row)
+        test_activity.add_view("main", layout)
+        
+        # Views added after the layout is attached are indexed too
+        label = TextView("label", "Label")
+        row.add_view(label)
+        assert test_activity.get_view("label") is label
+        assert test_activity.get_view("row") is row
+        
+        row.remove_view(label)
+        assert test_activity.get_view("label") is None
+        
+        test_activity.remove_view("main")
+        assert test_activity.get_view("row") is None
+    
+    def test_duplicate_view_id(self, test_activity):
+        """Test that duplicate ids across the tree are rejected."""
+        layout = LinearLayout("main")
+        layout.add_view(TextView("label", "Label"))
+        test_activity.add_view("main", layout)
+        
+        with pytest.raises(DuplicateViewIdError):
+            test_activity.add_view("label", TextView("label", "Other"))
+        with pytest.raises(DuplicateViewIdError):
+            layout.add_view(TextView("main", "Shadows layout"))
+    
+    def test_replace_view(self, test_activity):
+        """Test that re-adding an existing view_id replaces the view."""
+        test_activity.add_view("text", TextView("text", "Old"))
+        new_view = TextView("text", "New")
+        test_activity.add_view("text", new_view)
+        assert test_activity.get_view("text") is new_view
+    
     def test_activity_with_extras(self):
         """Test activity initialization with extra arguments."""
         activity = Activity("TestActivity", user_id=123, username="alice")
@@ -177,6 +449,72 @@ class TestActivity:
         assert activity.extras["username"] == "alice"
 
 
+class TestTouchDispatch:
+    """Test cases for coordinate-based touch dispatch."""
+    
+    @pytest.fixture
+    def screen(self, test_activity):
+        """Create an activity with two rows of buttons."""
+        clicks = []
+        main = LinearLayout("main", orientation="vertical", spacing=0)
+        main.set_size(400, 400)
+        for row_index in range(2):
+            row = LinearLayout(f"row{row_index}", orientation="horizontal", spacing=0)
+            for column in range(4):
+                button = Button(f"b{row_index}{column}", "B", width=100, height=50)
+                button.set_on_click_listener(lambda view: clicks.append(view.view_id))
+                row.add_view(button)
+            main.add_view(row)
+        test_activity.add_view("main", main)
+        return test_activity, clicks
+    
+    def test_dispatch_touch(self, screen):
+        """Test that a touch reaches the view under the point."""
+        activity, clicks = screen
+        
+        assert activity.dispatch_touch(150, 70).view_id == "b11"
+        assert clicks == ["b11"]
+        assert activity.dispatch_touch(50, 300) is None
+    
+    def test_skips_hidden_and_disabled_views(self, screen):
+        """Test that invisible or disabled views are not hit."""
+        activity, _ = screen
+        activity.get_view("b00").visible = False
+        activity.get_view("b01").enabled = False
+        
+        assert activity.find_view_at(10, 10) is None
+        assert activity.find_view_at(110, 10) is None
+    
+    def test_index_follows_moves(self, screen):
+        """Test that views moved after the first touch are re-indexed."""
+        activity, _ = screen
+        assert activity.find_view_at(10, 10).view_id == "b00"
+        
+        row = activity.get_view("row0")
+        row.remove_view(activity.get_view("b00"))
+        assert activity.find_view_at(10, 10).view_id == "b01"
+        
+        activity.get_view("main").set_padding(0, 100, 0, 0)
+        assert activity.find_view_at(10, 10) is None
+        assert activity.find_view_at(10, 110).view_id == "b01"
+        
+        added = Button("added", "New", width=100, height=50)
+        activity.get_view("row0").add_view(added)
+        assert activity.find_view_at(310, 110).view_id == "added"
+    
+    def test_topmost_view_wins(self, test_activity):
+        """Test that overlapping views resolve to the last drawn one."""
+        layout = RelativeLayout("root")
+        layout.set_size(200, 200)
+        below = Button("below", "Below", width=100, height=100)
+        above = Button("above", "Above", width=100, height=100)
+        layout.add_view(below)
+        layout.add_view(above)
+        test_activity.add_view("root", layout)
+        
+        assert test_activity.find_view_at(50, 50) is above
+
+
 class TestIntent:
     """Test cases for Intent class."""
     
@@ -224,3 +562,105 @@ class TestIntent:
         # Verify it returns a copy (modifying shouldn't affect original)
         all_extras["key3"] = "new"
         assert intent.has_extra("key3") is False
+    
+    def test_bytes_round_trip(self):
+        """Test serializing an intent with its extras."""
+        intent = Intent("ACTION_SEND", data="content://photos/1", mime_type="image/png")
+        intent.add_category("DEFAULT")
+        intent.put_extra("image", b"pixels")
+        intent.put_extra("caption", "hello")
+        
+        restored = Intent.from_bytes(intent.to_bytes())
+        
+        assert (restored.action, restored.target, restored.data, restored.mime_type) == (
+            "ACTION_SEND", None, "content://photos/1", "image/png")
+        assert restored.categories == {"DEFAULT"}
+        assert restored.get_extra("caption") == "hello"
+        assert bytes(restored.get_extra("image")) == b"pixels"
+        assert restored.get_all_extras() == {"image": b"pixels", "caption": "hello"}
+        assert Intent.from_bytes(restored.to_bytes()).get_extra("caption") == "hello"
+    
+    def test_get_scheme(self):
+        """Test reading the scheme of the data URI."""
+        assert Intent("ACTION_VIEW", data="HTTPS://example.com/a").get_scheme() == "https"
+        assert Intent("ACTION_VIEW").get_scheme() is None
+
+
+class ItemActivity(Activity):
+    """Activity receiving an item id from intent extras."""
+    
+    def __init__(self, name, item_id=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.item_id = item_id
+
+
+class TestIntentResolution:
+    """Test cases for intent filters and implicit intent dispatch."""
+    
+    @pytest.fixture
+    def app(self, test_app):
+        test_app.register_activity("browser", Activity, intent_filters=[
+            IntentFilter(actions=["ACTION_VIEW"], categories=["BROWSABLE"],
+                         schemes=["http", "https"])])
+        test_app.register_activity("item", ItemActivity, intent_filters=[
+            IntentFilter(actions=["ACTION_VIEW"], schemes=["https"], hosts=["example.com"],
+                         path_prefixes=["/item/"], priority=10)])
+        test_app.register_activity("gallery", Activity, intent_filters=[
+            IntentFilter(actions=["ACTION_VIEW", "ACTION_PICK"], mime_types=["image/*"])])
+        test_app.register_activity("share", Activity, intent_filters=[
+            IntentFilter(actions=["ACTION_SEND"], mime_types=["text/plain"])])
+        return test_app
+    
+    def test_resolve_by_scheme_and_host(self, app):
+        """Test that the more specific, higher-priority filter wins."""
+        intent = Intent("ACTION_VIEW", data="https://Example.com/item/42")
+        assert app.resolve_activity(intent) == "item"
+        assert app.query_intent_activities(intent) == ["item", "browser"]
+    
+    def test_path_and_host_must_match(self, app):
+        """Test that other hosts and paths fall back to the browser."""
+        for data in ("https://example.com/about", "https://other.org/item/1"):
+            assert app.resolve_activity(Intent("ACTION_VIEW", data=data)) == "browser"
+        assert app.resolve_activity(Intent("ACTION_VIEW", data="ftp://example.com/item/1")) is None
+    
+    def test_categories_must_be_declared(self, app):
+        """Test that every intent category must be declared by the filter."""
+        intent = Intent("ACTION_VIEW", data="https://example.com/item/42")
+        intent.add_category("BROWSABLE")
+        assert app.resolve_activity(intent) == "browser"
+    
+    def test_mime_type_wildcards(self, app):
+        """Test MIME type matching with wildcards."""
+        assert app.resolve_activity(Intent("ACTION_PICK", mime_type="image/png")) == "gallery"
+        assert app.resolve_activity(Intent("ACTION_SEND", mime_type="TEXT/plain")) == "share"
+        assert app.resolve_activity(Intent("ACTION_SEND", mime_type="image/png")) is None
+        assert app.resolve_activity(Intent("ACTION_SEND")) is None
+    
+    def test_explicit_intent(self, app):
+        """Test that an explicit target skips filter resolution."""
+        assert app.resolve_activity(Intent("ACTION_SEND", "gallery")) == "gallery"
+        assert app.resolve_activity(Intent("ACTION_SEND", "missing")) is None
+    
+    def test_start_activity_with_intent(self, app):
+        """Test that start_activity resolves intents and passes extras."""
+        intent = Intent("ACTION_VIEW", data="https://example.com/item/42")
+        intent.put_extra("item_id", 42)
+        
+        app.start_activity(intent)
+        
+        assert app.current_activity.name == "item"
+        assert app.current_activity.item_id == 42
+        assert app.current_activity.intent is intent
+    
+    def test_start_activity_without_match(self, app):
+        """Test that an unresolvable intent raises."""
+        with pytest.raises(ActivityNotFoundError):
+            app.start_activity(Intent("ACTION_DIAL", data="tel:123"))
+    
+    def test_reregister_replaces_filters(self, app):
+        """Test that registering an activity again replaces its filters."""
+        app.register_activity("share", Activity, intent_filters=[
+            IntentFilter(actions=["ACTION_SEND"], mime_types=["*/*"])])
+        assert app.resolve_activity(Intent("ACTION_SEND", mime_type="image/png")) == "share"
+        app.register_activity("share", Activity)
+        assert app.resolve_activity(Intent("ACTION_SEND", mime_type="text/plain")) is None
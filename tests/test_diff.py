@@ -0,0 +1,122 @@
+"""Tests for PyAndroid render-tree diffing."""
+
+import random
+
+from pyandroid.diff import INSERT, MOVE, REMOVE, SET, diff_trees
+from pyandroid.ui import Button, LinearLayout, TextView
+
+
+def _node(node_id, *children, **props):
+    """Build a minimal render tree node."""
+    node = {"type": "Node", "id": node_id, **props}
+    if children:
+        node["children"] = list(children)
+    return node
+
+
+def _apply_order(ids, ops, parent_id):
+    """Apply child-list operations for one parent to a list of ids."""
+    ids = list(ids)
+    for op in ops:
+        if op.parent_id != parent_id:
+            continue
+        if op.op == REMOVE:
+            ids.remove(op.id)
+        elif op.op == INSERT:
+            ids.insert(op.index, op.id)
+        elif op.op == MOVE:
+            ids.remove(op.id)
+            ids.insert(op.index, op.id)
+    return ids
+
+
+class TestDiffTrees:
+    """Test cases for diff_trees function."""
+
+    def test_identical_tree_has_no_patches(self):
+        """Test that the same tree object yields no operations."""
+        tree = _node("root", _node("a", text="A"))
+        assert diff_trees(tree, tree) == []
+
+    def test_set_property(self):
+        """Test that a changed property emits a single SET."""
+        old = _node("root", _node("a", text="A"), _node("b", text="B"))
+        new = _node("root", old["children"][0], _node("b", text="C"))
+
+        ops = diff_trees(old, new)
+
+        assert len(ops) == 1
+        assert ops[0].op == SET
+        assert (ops[0].id, ops[0].key, ops[0].value) == ("b", "text", "C")
+
+    def test_insert_and_remove(self):
+        """Test keyed inserts and removes."""
+        old = _node("root", _node("a"), _node("b"))
+        new = _node("root", _node("a"), _node("c"))
+
+        ops = diff_trees(old, new)
+
+        assert [(op.op, op.id) for op in ops] == [(REMOVE, "b"), (INSERT, "c")]
+        assert ops[1].index == 1
+        assert ops[1].value is new["children"][1]
+
+    def test_single_move(self):
+        """Test that rotating a list moves only one child."""
+        old = _node("root", _node("a"), _node("b"), _node("c"))
+        new = _node("root", _node("b"), _node("c"), _node("a"))
+
+        ops = diff_trees(old, new)
+
+        assert [(op.op, op.id, op.index) for op in ops] == [(MOVE, "a", 2)]
+
+    def test_type_change_replaces_node(self):
+        """Test that a node with a new type is removed and reinserted."""
+        old = _node("root", _node("a"))
+        new = _node("root", {"type": "Other", "id": "a"})
+
+        ops = diff_trees(old, new)
+
+        assert [op.op for op in ops] == [REMOVE, INSERT]
+
+    def test_random_reorders_apply_cleanly(self):
+        """Test that operations turn any old child order into the new one."""
+        rng = random.Random(7)
+        for _ in range(200):
+            old_ids = rng.sample("abcdefghij", rng.randint(0, 10))
+            new_ids = rng.sample("abcdefghij", rng.randint(0, 10))
+            old = _node("root", *[_node(i) for i in old_ids])
+            new = _node("root", *[_node(i) for i in new_ids])
+
+            ops = diff_trees(old, new)
+
+            assert _apply_order(old_ids, ops, "root") == new_ids
+            kept = len(set(old_ids) & set(new_ids))
+            inserted = len(set(new_ids) - set(old_ids))
+            assert sum(op.op == INSERT for op in ops) == inserted
+            assert sum(op.op == MOVE for op in ops) <= max(kept - 1, 0)
+
+    def test_layout_update_touches_one_view(self):
+        """Test that changing one label after a render yields one SET."""
+        layout = LinearLayout("main")
+        label = TextView("label", "Count: 0")
+        layout.add_view(label)
+        layout.add_view(Button("increment", "+1"))
+        old = layout.render()
+
+        label.set_text("Count: 1")
+        ops = [op for op in diff_trees(old, layout.render()) if op.id == "label"]
+
+        assert [(op.op, op.key, op.value) for op in ops] == [(SET, "text", "Count: 1")]
+
+    def test_padding_changed_in_place(self):
+        """Test that padding mutated in place and invalidated emits a SET."""
+        layout = LinearLayout("main")
+        layout.add_view(TextView("label", "Hi"))
+        old = layout.render()
+
+        layout.padding["left"] = 5
+        layout.invalidate()
+        ops = [op for op in diff_trees(old, layout.render()) if op.key == "padding"]
+
+        assert [(op.op, op.id) for op in ops] == [(SET, "main")]
+        assert ops[0].value["left"] == 5 and old["padding"]["left"] == 0
@@ -0,0 +1,116 @@
+"""Tests for PyAndroid background executors."""
+
+import threading
+import time
+
+import pytest
+from pyandroid.core import AndroidApp
+from pyandroid.executor import ExecutorService
+
+
+def square(value):
+    """Square a number in a worker process."""
+    return value * value
+
+
+class FrozenError(Exception):
+    """Exception refusing new attributes."""
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+def run_looper_until(app, condition, timeout=5.0):
+    """Pump the main looper until condition() is true or time runs out."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.looper.run_pending()
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def app():
+    """Create a console app and shut its pools down afterwards."""
+    app = AndroidApp("ExecutorApp", "com.test.executor", use_gui=False)
+    yield app
+    if app._executor is not None:
+        app._executor.shutdown()
+
+
+class TestExecutorService:
+    """Test cases for AndroidApp.executor."""
+
+    def test_io_callbacks_run_on_main_looper(self, app):
+        """Test that done callbacks run on the looper thread."""
+        threads = []
+        future = app.executor.run_io(lambda: threading.current_thread().name)
+        future.add_done_callback(lambda done: threads.append(
+            (done.result(), threading.current_thread() is threading.main_thread())))
+
+        assert future.result(timeout=2).startswith("PyAndroid-io")
+        assert threads == []
+        assert run_looper_until(app, lambda: threads)
+        assert threads[0][1] is True
+
+    def test_cpu_pool(self, app):
+        """Test running picklable work in the process pool."""
+        app._executor = ExecutorService(app.handler, cpu_workers=2)
+
+        futures = [app.executor.run_cpu(square, value) for value in range(5)]
+
+        assert [future.result(timeout=30) for future in futures] == [0, 1, 4, 9, 16]
+        assert app.executor.get_metrics()["cpu"]["completed"] == 5
+
+    def test_errors_and_metrics(self, app):
+        """Test that failures propagate and are counted."""
+        def fail():
+            time.sleep(0.01)
+            raise ValueError("disk full")
+
+        future = app.executor.run_io(fail)
+
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+        assert run_looper_until(app, lambda: app.executor.get_metrics()["io"]["in_flight"] == 0)
+        metrics = app.executor.get_metrics()["io"]
+        assert (metrics["submitted"], metrics["failed"]) == (1, 1)
+        assert metrics["max_run_ms"] >= 5
+
+    def test_immutable_exception_propagates(self, app):
+        """Test that an exception that cannot take attributes reaches the future unchanged."""
+        def fail():
+            raise FrozenError("read-only")
+
+        with pytest.raises(FrozenError):
+            app.executor.run_io(fail).result(timeout=2)
+        assert run_looper_until(app, lambda: app.executor.get_metrics()["io"]["failed"] == 1)
+
+    def test_queue_depth_and_cancel(self, app):
+        """Test queue depth and cancelling queued work."""
+        executor = ExecutorService(app.handler, io_workers=1)
+        release = threading.Event()
+        try:
+            running = executor.run_io(release.wait)
+            queued = [executor.run_io(square, value) for value in range(3)]
+
+            assert executor.metrics["io"].queue_depth == 3
+            assert queued[-1].cancel() is True
+            release.set()
+
+            assert [future.result(timeout=2) for future in queued[:2]] == [0, 1]
+            assert running.result(timeout=2) is True
+            assert run_looper_until(app, lambda: executor.metrics["io"].in_flight == 0)
+            metrics = executor.get_metrics()["io"]
+            assert metrics["cancelled"] == 1
+            assert metrics["max_queue_depth"] == 3
+            assert metrics["max_wait_ms"] > 0
+        finally:
+            executor.shutdown()
+
+    def test_unknown_pool(self, app):
+        """Test that unknown pools raise KeyError."""
+        with pytest.raises(KeyError):
+            app.executor.submit("gpu", square, 2)
@@ -0,0 +1,67 @@
+"""Import-time regression tests for PyAndroid."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative budget for `import pyandroid`, in microseconds. The lazy
+# package imports in a few milliseconds; eager imports took tens.
+IMPORT_BUDGET_US = 30_000
+
+
+def import_times(statement):
+    """Run a statement under -X importtime and return cumulative times by module."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True, cwd=ROOT, env=env
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime:
+    """Test cases for lazy package imports."""
+    
+    def test_package_import_is_lazy(self):
+        """Test that importing the package loads no submodules."""
+        times = import_times("import pyandroid")
+        
+        loaded = [name for name in times if name.startswith("pyandroid.")]
+        assert loaded == ["pyandroid.__version__"]
+        assert times["pyandroid"] < IMPORT_BUDGET_US
+        
+    @pytest.mark.parametrize("statement", [
+        "from pyandroid import AndroidApp, Activity",
+        "import pyandroid.ui",
+        "import pyandroid.utils",
+        "from pyandroid.backend import KivyRenderer",
+        "from pyandroid.utils import FileManager; FileManager('App').logger.debug('x')",
+    ])
+    def test_heavy_modules_stay_unloaded(self, statement):
+        """Test that common imports do not pull in networking, JSON, Kivy or executors."""
+        times = import_times(statement)
+        
+        for heavy in ("urllib.request", "http.client", "json", "kivy", "asyncio",
+                      "concurrent.futures"):
+            assert heavy not in times, f"{statement!r} imported {heavy}"
+            
+    def test_lazy_attributes(self):
+        """Test that submodules and classes resolve on attribute access."""
+        import pyandroid
+        from pyandroid.core import AndroidApp
+        
+        assert pyandroid.AndroidApp is AndroidApp
+        assert pyandroid.ui.LinearLayout is not None
+        assert "utils" in dir(pyandroid)
+        with pytest.raises(AttributeError):
+            pyandroid.missing
@@ -0,0 +1,304 @@
+"""Tests for the shared logging pipeline."""
+
+import logging
+import os
+import threading
+import time
+
+import pytest
+from pyandroid import logs
+from pyandroid.utils import Logger
+
+
+class RecordingHandler(logging.Handler):
+    """Handler keeping the records and threads it was called on."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.append(threading.current_thread())
+
+
+@pytest.fixture
+def sink():
+    """Add a recording sink to the pipeline."""
+    handler = RecordingHandler()
+    logs.add_sink(handler)
+    yield handler
+    logs.remove_sink(handler)
+
+
+class TestLogger:
+    """Test cases for utils.Logger on the queue pipeline."""
+
+    def test_records_are_written_in_background(self, sink):
+        """Test that records reach sinks on the writer thread with their fields."""
+        logger = Logger("LogsTest.fields")
+        logger.info("Uploaded %d items", 3, account="alice")
+
+        assert logs.flush(timeout=2)
+        record = sink.records[-1]
+        assert record.getMessage() == "Uploaded 3 items"
+        assert record.fields == {"account": "alice"}
+        assert record.funcName == "test_records_are_written_in_background"
+        assert sink.threads[-1] is not threading.current_thread()
+
+        formatter = logs.FieldsFormatter("%(message)s")
+        assert formatter.format(record) == "Uploaded 3 items account='alice'"
+
+    def test_formatting_happens_on_writer_thread(self, sink, monkeypatch):
+        """Test that arguments are formatted by the writer, and tracebacks kept."""
+        formatted_on = []
+
+        class Recorder:
+            def __str__(self):
+                formatted_on.append(threading.current_thread())
+                return "value"
+
+        logger = Logger("LogsTest.lazy")
+        # pytest's capture handlers on the root logger format on this thread
+        monkeypatch.setattr(logger.logger, "propagate", False)
+        logger.info("got %s", Recorder())
+        try:
+            raise KeyError("missing")
+        except KeyError:
+            logger.logger.exception("lookup failed")
+
+        assert logs.flush(timeout=2)
+        writer_threads = list(formatted_on)
+        assert writer_threads and threading.current_thread() not in writer_threads
+        assert sink.records[0].getMessage() == "got value"
+        assert sink.records[1].exc_info is None
+        assert "KeyError: 'missing'" in sink.records[1].exc_text
+
+    def test_same_name_logs_once(self, sink):
+        """Test that loggers sharing a name share one handler."""
+        first = Logger("LogsTest.shared")
+        second = Logger("LogsTest.shared")
+        second.warning("once")
+
+        assert logs.flush(timeout=2)
+        assert len(first.logger.handlers) == 1
+        assert [record.getMessage() for record in sink.records] == ["once"]
+
+    def test_disabled_levels_are_not_formatted(self, sink):
+        """Test that disabled levels neither format arguments nor queue records."""
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted")
+
+        logger = Logger("LogsTest.levels", level="WARNING")
+        logger.debug("value %s", Exploding())
+        logger.info("value %s", Exploding(), extra=Exploding())
+
+        assert logs.flush(timeout=2)
+        assert sink.records == []
+
+    def test_remove_sink(self):
+        """Test that removed sinks stop receiving records."""
+        handler = RecordingHandler()
+        logs.add_sink(handler)
+        logs.add_sink(handler)
+        assert logs.remove_sink(handler) is True
+        assert logs.remove_sink(handler) is False
+
+        Logger("LogsTest.removed").error("dropped")
+        assert logs.flush(timeout=2)
+        assert handler.records == []
+
+    def test_rate_limit_per_call_site(self, sink):
+        """Test that each call site gets its own budget and a suppression summary."""
+        logger = Logger("LogsTest.rate", rate_limit=2, rate_period=0.05)
+
+        def tick(number):
+            logger.info("tick %d", number)
+
+        for number in range(5):
+            tick(number)
+        for number in range(3):
+            logger.info("tock %d", number)
+        time.sleep(0.06)
+        tick(5)
+
+        assert logs.flush(timeout=2)
+        messages = [record.getMessage() for record in sink.records]
+        assert messages == ["tick 0", "tick 1", "tock 0", "tock 1",
+                            "3 similar messages suppressed", "tick 5"]
+        assert sink.records[4].fields == {"suppressed": 3}
+        assert sink.records[4].funcName == "tick"
+
+    def test_sampling_keeps_warnings(self, sink):
+        """Test that sampling drops INFO records but never warnings."""
+        logger = Logger("LogsTest.sampling", sample_rate=0.0)
+        for _ in range(10):
+            logger.info("noise")
+            logger.warning("important")
+
+        assert logs.flush(timeout=2)
+        assert [record.getMessage() for record in sink.records] == ["important"] * 10
+        with pytest.raises(ValueError):
+            Logger("LogsTest.sampling", sample_rate=1.5)
+
+
+class TestLogBuffer:
+    """Test cases for the logcat ring buffer."""
+
+    def make_record(self, name, level, message):
+        """Create a log record."""
+        return logging.LogRecord(name, level, __file__, 1, message, None, None)
+
+    def test_ring_overwrites_oldest(self):
+        """Test that a full buffer keeps the most recent records."""
+        buffer = logs.LogBuffer(capacity=3)
+        for number in range(5):
+            buffer.handle(self.make_record("App", logging.INFO, f"event {number}"))
+
+        assert len(buffer) == 3
+        assert [entry.message for entry in buffer.query()] == ["event 2", "event 3", "event 4"]
+        assert [entry.message for entry in buffer.query(limit=1)] == ["event 4"]
+        buffer.clear()
+        assert buffer.query() == []
+
+    def test_query_filters(self):
+        """Test filtering by tag prefix, level and time window."""
+        buffer = logs.LogBuffer(capacity=10)
+        buffer.handle(self.make_record("PyAndroid.Looper", logging.DEBUG, "tick"))
+        buffer.handle(self.make_record("PyAndroid.Activity.main", logging.WARNING, "slow"))
+        middle = time.monotonic()
+        time.sleep(0.01)
+        buffer.handle(self.make_record("Sync", logging.ERROR, "offline"))
+
+        assert [entry.message for entry in buffer.query(tag="PyAndroid.")] == ["tick", "slow"]
+        assert [entry.message for entry in buffer.query(level=logging.WARNING)] == [
+            "slow", "offline"]
+        assert [entry.message for entry in buffer.query(since=middle)] == ["offline"]
+        assert [entry.message for entry in buffer.query(until=middle)] == ["tick", "slow"]
+        entry = buffer.query(tag="Sync")[0]
+        assert (entry.level, entry.tag) == (logging.ERROR, "Sync")
+
+    def test_dump(self, tmp_path):
+        """Test dumping records to a file."""
+        buffer = logs.LogBuffer(capacity=10)
+        buffer.handle(self.make_record("Sync", logging.ERROR, "offline"))
+        buffer.handle(self.make_record("Sync", logging.INFO, "retrying"))
+        path = tmp_path / "logcat.txt"
+
+        assert buffer.dump(str(path), level=logging.ERROR) == 1
+        assert path.read_text().strip().endswith("E/Sync: offline")
+
+    def test_enable_logcat_collects_core_and_logger_records(self):
+        """Test that logcat sees both utils.Logger and PyAndroid.* records."""
+        core = logging.getLogger("PyAndroid")
+        level = core.level
+        core.setLevel(logging.INFO)
+        try:
+            buffer = logs.enable_logcat(capacity=100)
+            assert logs.logcat() is buffer
+            logging.getLogger("PyAndroid.Looper").info("core %s", "message")
+            Logger("LogsTest.logcat").info("clicked", button="ok")
+
+            assert logs.flush(timeout=2)
+            messages = [entry.message for entry in buffer.query()]
+            assert "core message" in messages
+            assert "clicked button='ok'" in messages
+        finally:
+            assert logs.disable_logcat() is True
+            core.setLevel(level)
+        assert logs.disable_logcat() is False
+        assert logs.logcat() is None
+
+
+class TestFileLogSink:
+    """Test cases for the rotating, compressed file sink."""
+
+    def make_record(self, message, level=logging.INFO):
+        """Create a log record."""
+        return logging.LogRecord("Sync", level, __file__, 1, message, None, None)
+
+    def test_group_commit(self, file_manager):
+        """Test that records are buffered until flush_bytes or flush()."""
+        sink = logs.FileLogSink(file_manager, flush_bytes=10_000, flush_interval=60)
+        try:
+            sink.handle(self.make_record("first"))
+            sink.handle(self.make_record("second"))
+            assert not os.path.exists(sink.path)
+
+            sink.flush()
+            assert [entry.message for entry in logs.read_log_files(sink.directory)] == [
+                "first", "second"]
+            assert sink.path.startswith(file_manager.get_app_directory())
+        finally:
+            sink.close()
+
+    def test_flush_interval(self, file_manager):
+        """Test that buffered records are written after flush_interval."""
+        sink = logs.FileLogSink(file_manager, flush_bytes=10_000, flush_interval=0.02)
+        try:
+            sink.handle(self.make_record("late"))
+            deadline = time.monotonic() + 2
+            while not os.path.exists(sink.path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [entry.message for entry in logs.read_log_files(sink.directory)] == ["late"]
+        finally:
+            sink.close()
+
+    def test_rotation_and_compression(self, file_manager):
+        """Test rotating by size, gzipping segments and pruning old ones."""
+        sink = logs.FileLogSink(file_manager, max_bytes=300, backup_count=2, flush_bytes=1)
+        for number in range(20):
+            sink.handle(self.make_record(f"event {number:02d}", logging.WARNING))
+        sink.close()
+
+        names = sorted(os.listdir(sink.directory))
+        assert "app.log" in names
+        compressed = [name for name in names if name.endswith(".log.gz")]
+        assert len(compressed) == 2
+        assert not any(name.endswith(".tmp") for name in names)
+        entries = list(logs.read_log_files(sink.directory))
+        numbers = [int(entry.message.split()[1]) for entry in entries]
+        assert numbers == sorted(numbers) and numbers[-1] == 19
+        assert entries[0].level == logging.WARNING and entries[0].tag == "Sync"
+
+    def test_rotation_by_age(self, file_manager):
+        """Test rotating an old file and reading records across segments."""
+        sink = logs.FileLogSink(file_manager, max_age=0.0, flush_bytes=1)
+        sink.handle(self.make_record("old"))
+        sink.handle(self.make_record("new"))
+
+        assert [entry.message for entry in sink.read()] == ["old", "new"]
+        sink.close()
+        assert os.path.exists(os.path.join(sink.directory, "app.000001.log.gz"))
+
+    def test_reader_skips_damaged_lines(self, file_manager):
+        """Test that a truncated last line is skipped."""
+        sink = logs.FileLogSink(file_manager, flush_bytes=1)
+        sink.handle(self.make_record("complete"))
+        sink.close()
+        with open(sink.path, "a", encoding="utf-8") as f:
+            f.write('{"time": 1.0, "lev')
+
+        assert [entry.message for entry in logs.read_log_files(sink.directory)] == ["complete"]
+
+    def test_reopened_file_keeps_size_and_age(self, file_manager):
+        """Test that a file left by an earlier sink is rotated by its own size and age."""
+        sink = logs.FileLogSink(file_manager, flush_bytes=1)
+        old = self.make_record("yesterday")
+        old.created = time.time() - 2 * 24 * 3600
+        sink.handle(old)
+        sink.close()
+
+        sink = logs.FileLogSink(file_manager, flush_bytes=1)
+        sink.handle(self.make_record("today"))
+        sink.close()
+        assert os.path.exists(os.path.join(sink.directory, "app.000001.log.gz"))
+
+        sink = logs.FileLogSink(file_manager, max_bytes=10, flush_bytes=1)
+        sink.handle(self.make_record("tomorrow"))
+        sink.close()
+        assert os.path.exists(os.path.join(sink.directory, "app.000002.log.gz"))
+        assert [entry.message for entry in logs.read_log_files(sink.directory)] == [
+            "yesterday", "today", "tomorrow"]
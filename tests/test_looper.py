@@ -0,0 +1,138 @@
+"""Tests for the PyAndroid message loop."""
+
+import threading
+
+import pytest
+from pyandroid.looper import Handler, Looper, Message
+
+
+class FakeClock:
+    """Manually advanced millisecond clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def looper(clock):
+    """Create a looper driven by the fake clock."""
+    return Looper(clock=clock)
+
+
+class RecordingHandler(Handler):
+    """Handler that records the messages it handles."""
+    
+    def __init__(self, looper):
+        super().__init__(looper)
+        self.handled = []
+        
+    def handle_message(self, message):
+        self.handled.append((message.what, message.arg1, message.obj))
+
+
+class TestLooper:
+    """Test cases for Looper, Handler and Message."""
+    
+    def test_timed_callbacks_run_in_order(self, looper, clock):
+        """Test that callbacks run by due time, then by posting order."""
+        handler = Handler(looper)
+        calls = []
+        handler.post_delayed(lambda: calls.append("late"), 20)
+        handler.post_delayed(lambda: calls.append("soon"), 10)
+        handler.post(lambda: calls.append("now1"))
+        handler.post(lambda: calls.append("now2"))
+        handler.post_at_time(lambda: calls.append("at"), 10)
+        
+        assert looper.run_pending() == 2
+        clock.now = 10
+        looper.run_pending()
+        assert calls == ["now1", "now2", "soon", "at"]
+        clock.now = 25
+        looper.run_pending()
+        assert calls[-1] == "late"
+        assert looper.pending_count() == 0
+        
+    def test_messages_reach_handle_message(self, looper):
+        """Test that messages without a callback go to handle_message()."""
+        handler = RecordingHandler(looper)
+        handler.send_message(handler.obtain_message(what=1, arg1=5, obj="x"))
+        handler.send_empty_message(2)
+        
+        looper.run_pending()
+        
+        assert handler.handled == [(1, 5, "x"), (2, 0, None)]
+        
+    def test_remove_by_token(self, looper, clock):
+        """Test that removing by token only drops matching work."""
+        handler = Handler(looper)
+        other = Handler(looper)
+        calls = []
+        token = object()
+        handler.post_delayed(lambda: calls.append("a"), 5, token=token)
+        handler.post_delayed(lambda: calls.append("b"), 5)
+        other.post_delayed(lambda: calls.append("c"), 5, token=token)
+        
+        assert handler.has_messages(token)
+        assert handler.remove_callbacks_and_messages(token) == 1
+        assert not handler.has_messages(token)
+        clock.now = 5
+        looper.run_pending()
+        
+        assert sorted(calls) == ["b", "c"]
+        
+    def test_messages_are_recycled(self, looper):
+        """Test that dispatched messages return to the pool."""
+        handler = Handler(looper)
+        Message._pool.clear()
+        handler.post(lambda: None)
+        looper.run_pending()
+        
+        message = Message.obtain()
+        assert message.callback is None and message.target is None
+        assert Message._pool == []
+        
+    def test_post_from_background_thread(self):
+        """Test that another thread can post while the loop waits."""
+        looper = Looper()
+        handler = Handler(looper)
+        results = []
+        
+        def worker():
+            handler.post(lambda: results.append(threading.get_ident()))
+            handler.post(looper.quit)
+        
+        handler.post_delayed(lambda: threading.Thread(target=worker).start(), 1)
+        looper.loop()
+        
+        assert results == [threading.get_ident()]
+        
+    def test_run_until_idle_waits_for_delayed(self):
+        """Test that run_until_idle() waits for delayed messages."""
+        looper = Looper()
+        handler = Handler(looper)
+        calls = []
+        handler.post_delayed(lambda: calls.append(1), 5)
+        handler.post_delayed(lambda: handler.post(lambda: calls.append(2)), 1)
+        
+        assert looper.run_until_idle() == 3
+        assert sorted(calls) == [1, 2]
+        
+    def test_errors_do_not_stop_the_loop(self, looper):
+        """Test that a failing callback is logged and the loop continues."""
+        handler = Handler(looper)
+        calls = []
+        handler.post(lambda: 1 / 0)
+        handler.post(lambda: calls.append("ok"))
+        
+        looper.run_pending()
+        
+        assert calls == ["ok"]
@@ -0,0 +1,117 @@
+"""Tests for SharedPreferences."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from pyandroid.preferences import SharedPreferences
+from pyandroid.utils import FileManager
+
+
+def read_file(file_manager, name="settings"):
+    """Read a preferences file from disk, or None if it does not exist."""
+    path = os.path.join(file_manager.get_app_directory(), "shared_prefs", f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestSharedPreferences:
+    """Test cases for SharedPreferences and Editor."""
+
+    def test_commit_and_reload(self, file_manager):
+        """Test that committed values survive a new instance."""
+        prefs = file_manager.get_shared_preferences("settings")
+        assert file_manager.get_shared_preferences("settings") is prefs
+
+        assert prefs.edit().put("volume", 7).put("theme", "dark").put("tags", ["a"]).commit()
+        assert read_file(file_manager) == {"volume": 7, "theme": "dark", "tags": ["a"]}
+
+        reloaded = SharedPreferences(FileManager(file_manager.app_name), "settings")
+        assert reloaded.get("volume") == 7
+        assert reloaded.get("missing", 3) == 3
+        assert "theme" in reloaded
+        assert reloaded.get_all() == {"volume": 7, "theme": "dark", "tags": ["a"]}
+
+    def test_reads_come_from_memory(self, file_manager):
+        """Test that the file is read once."""
+        prefs = file_manager.get_shared_preferences("settings")
+        prefs.edit().put("volume", 7).commit()
+        os.remove(os.path.join(file_manager.get_app_directory(), "shared_prefs",
+                               "settings.json"))
+
+        assert prefs.get("volume") == 7
+
+    def test_apply_coalesces_writes(self, file_manager, monkeypatch):
+        """Test that edits applied in a burst are written once, in the background."""
+        prefs = SharedPreferences(file_manager, "settings", flush_delay=0.05)
+        writes = []
+        write_bytes = file_manager.write_bytes
+        monkeypatch.setattr(file_manager, "write_bytes",
+                            lambda *args, **kwargs: writes.append(args[0])
+                            or write_bytes(*args, **kwargs))
+
+        for volume in range(10):
+            prefs.edit().put("volume", volume).apply()
+        assert prefs.get("volume") == 9
+        assert read_file(file_manager) is None
+
+        deadline = time.monotonic() + 2
+        while read_file(file_manager) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read_file(file_manager) == {"volume": 9}
+        assert writes == ["settings.json"]
+        assert os.listdir(os.path.join(file_manager.get_app_directory(),
+                                       "shared_prefs")) == ["settings.json"]
+
+    def test_flush_writes_pending_changes(self, file_manager):
+        """Test that flush() writes applied changes right away."""
+        prefs = SharedPreferences(file_manager, "settings", flush_delay=60)
+        prefs.edit().put("volume", 1).apply()
+
+        assert prefs.flush()
+        assert read_file(file_manager) == {"volume": 1}
+
+    def test_listeners(self, file_manager):
+        """Test that listeners see changed keys only."""
+        prefs = file_manager.get_shared_preferences("settings")
+        changes = []
+        listener = lambda changed_prefs, key: changes.append(key)
+        prefs.register_on_change_listener(listener)
+
+        prefs.edit().put("volume", 7).put("theme", "dark").commit()
+        prefs.edit().put("volume", 7).put("muted", False).remove("theme").commit()
+        prefs.edit().put("muted", 0).commit()
+        prefs.edit().clear().put("volume", 8).commit()
+
+        assert changes == ["volume", "theme", "theme", "muted", "muted", None, "volume"]
+        assert prefs.get_all() == {"volume": 8}
+        assert prefs.unregister_on_change_listener(listener) is True
+        assert prefs.unregister_on_change_listener(listener) is False
+
+    def test_corrupt_file_and_bad_values(self, file_manager):
+        """Test that a corrupt file reads as empty and bad values are rejected."""
+        file_manager.write_bytes("settings.json", b"{not json", "shared_prefs")
+        prefs = file_manager.get_shared_preferences("settings")
+
+        assert prefs.get_all() == {}
+        with pytest.raises(TypeError):
+            prefs.edit().put("handler", object())
+
+    def test_pending_apply_written_at_exit(self, tmp_path):
+        """Test that edits applied right before the interpreter exits are written."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=root)
+        subprocess.run([sys.executable, "-c", (
+            "from pyandroid.utils import FileManager\n"
+            "prefs = FileManager('ExitApp').get_shared_preferences('settings')\n"
+            "prefs.flush_delay = 60\n"
+            "prefs.edit().put('k', 1).apply()\n"
+        )], check=True, env=env, capture_output=True)
+
+        path = tmp_path / ".exitapp" / "shared_prefs" / "settings.json"
+        assert json.loads(path.read_text()) == {"k": 1}
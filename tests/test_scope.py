@@ -0,0 +1,150 @@
+"""Tests for lifecycle-aware coroutine scopes."""
+
+import asyncio
+import time
+
+import pytest
+from pyandroid.core import Activity, AndroidApp
+
+
+def run_looper_until(app, condition, timeout=2.0):
+    """Pump the main looper until condition() is true or time runs out."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.looper.run_pending()
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def app():
+    """Create a console app with a resumed activity."""
+    app = AndroidApp("ScopeApp", "com.test.scope", use_gui=False)
+    app.register_activity("main", Activity)
+    app.start_activity("main")
+    app.current_activity.resume()
+    return app
+
+
+class TestLifecycleScope:
+    """Test cases for Activity.lifecycle_scope."""
+
+    def test_result_delivered_on_main_looper(self, app):
+        """Test that results arrive through the main looper."""
+        results = []
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            return 42
+
+        future = app.current_activity.lifecycle_scope.launch(compute(), on_result=results.append)
+
+        assert future.result(timeout=2) == 42
+        assert results == []
+        assert run_looper_until(app, lambda: results == [42])
+
+    def test_errors_go_to_on_error(self, app):
+        """Test that exceptions are delivered to on_error."""
+        errors = []
+
+        async def fail():
+            raise ValueError("offline")
+
+        app.current_activity.lifecycle_scope.launch(fail(), on_error=errors.append)
+
+        assert run_looper_until(app, lambda: errors)
+        assert isinstance(errors[0], ValueError)
+
+    def test_destroy_cancels_tasks(self, app):
+        """Test that destroying the activity cancels running work."""
+        activity = app.current_activity
+        results, cleaned_up = [], []
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+                return "late"
+            finally:
+                cleaned_up.append(True)
+
+        future = activity.lifecycle_scope.launch(slow(), on_result=results.append)
+        time.sleep(0.02)
+        activity.finish()
+
+        with pytest.raises(Exception):
+            future.result(timeout=2)
+        assert future.cancelled()
+        assert run_looper_until(app, lambda: cleaned_up)
+        assert results == []
+        assert len(activity.lifecycle_scope) == 0
+
+        async def never():
+            return 1
+
+        assert activity.lifecycle_scope.launch(never()).cancelled()
+
+    def test_suspend_on_pause(self, app):
+        """Test that suspendable tasks stop while paused and continue on resume."""
+        activity = app.current_activity
+        steps = []
+
+        async def ticker():
+            for step in range(1000):
+                steps.append(step)
+                await asyncio.sleep(0.002)
+
+        activity.lifecycle_scope.launch(ticker(), suspend_on_pause=True)
+        assert run_looper_until(app, lambda: len(steps) >= 3)
+
+        activity.pause()
+        time.sleep(0.05)
+        paused_at = len(steps)
+        time.sleep(0.1)
+        assert len(steps) == paused_at
+
+        activity.resume()
+        assert run_looper_until(app, lambda: len(steps) > paused_at + 3)
+        activity.lifecycle_scope.cancel()
+
+    def test_destroy_while_stopped_cancels_suspended_task(self, app):
+        """Test that a suspendable task awaiting through pause, stop and destroy is cancelled."""
+        activity = app.current_activity
+        started, cleaned_up = [], []
+
+        async def slow():
+            started.append(True)
+            try:
+                await asyncio.sleep(10)
+            finally:
+                await asyncio.sleep(0)
+                cleaned_up.append(True)
+
+        future = activity.lifecycle_scope.launch(slow(), suspend_on_pause=True)
+        assert run_looper_until(app, lambda: started)
+        activity.pause()
+        activity.stop()
+        activity.destroy()
+
+        with pytest.raises(Exception):
+            future.result(timeout=2)
+        assert run_looper_until(app, lambda: cleaned_up)
+        assert len(activity.lifecycle_scope) == 0
+
+    def test_scope_of_started_activity_waits_for_resume(self):
+        """Test that suspendable tasks launched before resume wait for it."""
+        activity = Activity("standalone")
+        activity.start()
+        ran = []
+
+        async def work():
+            ran.append(True)
+            return "done"
+
+        future = activity.lifecycle_scope.launch(work(), suspend_on_pause=True)
+        time.sleep(0.05)
+        assert ran == []
+
+        activity.resume()
+        assert future.result(timeout=2) == "done"
@@ -0,0 +1,172 @@
+"""Tests for PyAndroid services."""
+
+import threading
+import time
+
+import pytest
+from pyandroid.core import AndroidApp, Intent, ServiceNotFoundError
+from pyandroid.service import Binder, Service, batched
+
+
+def run_looper_until(app, condition, timeout=2.0):
+    """Pump the main looper until condition() is true or time runs out."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.looper.run_pending()
+        time.sleep(0.001)
+    return True
+
+
+class SyncService(Service):
+    """Service recording its callbacks and batches."""
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, **kwargs)
+        self.events = []
+        self.commands = []
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def on_create(self):
+        self.events.append("create")
+
+    def on_start_command(self, intent, start_id):
+        self.release.wait(2)
+        self.commands.append((intent.get_extra("account"), start_id,
+                              threading.current_thread().name))
+
+    def on_unbind(self, intent):
+        self.events.append("unbind")
+
+    def on_destroy(self):
+        self.events.append("destroy")
+
+    @batched
+    def fetch(self, item_ids):
+        self.batches.append(list(item_ids))
+        return [f"item-{item_id}" for item_id in item_ids]
+
+    def block(self):
+        self.release.wait(2)
+        return "unblocked"
+
+    def status(self, verbose=False):
+        return ("idle", verbose)
+
+
+@pytest.fixture
+def app():
+    """Create a console app with a registered service."""
+    app = AndroidApp("ServiceApp", "com.test.service", use_gui=False)
+    app.register_service("sync", SyncService)
+    yield app
+    for running in list(app._running_services.values()):
+        running._shutdown()
+
+
+class TestService:
+    """Test cases for Service and AndroidApp service management."""
+
+    def test_commands_run_on_worker_thread(self, app):
+        """Test that commands run in order on the service's own thread."""
+        assert app.start_service("sync", account="alice") == 1
+        assert app.start_service(Intent(target="sync")) == 2
+        service = app._running_services["sync"]
+
+        assert run_looper_until(app, lambda: len(service.commands) == 2)
+        assert [command[:2] for command in service.commands] == [("alice", 1), (None, 2)]
+        assert service.commands[0][2] == "PyAndroid-service-sync"
+        assert service.events == ["create"]
+
+    def test_stop_self_with_start_id(self, app):
+        """Test that stop_self() ignores stale start ids and destroys the service."""
+        app.start_service("sync")
+        app.start_service("sync")
+        service = app._running_services["sync"]
+
+        service.stop_self(1)
+        app.looper.run_pending()
+        assert service.started
+        service.stop_self(2)
+
+        assert run_looper_until(app, lambda: service.events == ["create", "destroy"])
+        assert "sync" not in app._running_services
+        assert not service.is_running
+
+    def test_bound_service_outlives_stop(self, app):
+        """Test that a service stays alive while a client is bound."""
+        binder = app.bind_service("sync")
+        app.start_service("sync")
+        service = app._running_services["sync"]
+
+        assert app.stop_service("sync") is True
+        assert binder.call("status", verbose=True).result(timeout=2) == ("idle", True)
+        assert app.unbind_service("sync") is True
+        assert app.unbind_service("sync") is False
+
+        assert run_looper_until(app, lambda: service.events == ["create", "unbind", "destroy"])
+        assert app.stop_service("sync") is False
+
+    def test_batched_calls(self, app):
+        """Test that calls queued while the worker is busy run as one batch."""
+        binder = app.bind_service("sync")
+        service = binder.service
+        service.release.clear()
+        blocker = binder.call("block")
+        futures = [binder.call("fetch", item_id) for item_id in range(4)]
+        service.release.set()
+
+        assert [future.result(timeout=2) for future in futures] == [
+            "item-0", "item-1", "item-2", "item-3"]
+        assert blocker.result(timeout=2) == "unblocked"
+        assert service.batches == [[0, 1, 2, 3]]
+
+        done = []
+        binder.call("fetch", 9).add_done_callback(
+            lambda future: done.append(threading.current_thread() is threading.main_thread()))
+        assert run_looper_until(app, lambda: done == [True])
+        assert service.batches[-1] == [9]
+
+        with pytest.raises(TypeError):
+            binder.call("fetch", 1, 2)
+
+    def test_calls_after_destroy_fail(self, app):
+        """Test that calls on a destroyed service fail instead of hanging."""
+        binder = app.bind_service("sync")
+        assert isinstance(binder, Binder)
+        app.unbind_service("sync")
+
+        with pytest.raises(RuntimeError):
+            binder.call("status").result(timeout=2)
+        with pytest.raises(RuntimeError):
+            binder.call("fetch", 1).result(timeout=2)
+
+    def test_queued_calls_fail_on_unbind(self, app):
+        """Test that calls still queued when the service stops fail, and later calls too."""
+        binder = app.bind_service("sync")
+        service = binder.service
+        service.release.clear()
+        blocker = binder.call("block")
+        assert run_looper_until(app, blocker.running)
+        queued = [binder.call("status"), binder.call("fetch", 1), binder.call("fetch", 2)]
+        app.unbind_service("sync")
+        service.release.set()
+
+        assert blocker.result(timeout=2) == "unblocked"
+        for future in queued:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=2)
+        with pytest.raises(RuntimeError):
+            binder.call("fetch", 3).result(timeout=2)
+        assert binder._pending == {}
+
+    def test_unknown_service(self, app):
+        """Test that unregistered services raise ServiceNotFoundError."""
+        with pytest.raises(ServiceNotFoundError):
+            app.start_service("upload")
+        with pytest.raises(ServiceNotFoundError):
+            app.bind_service("upload")
+        assert app.unbind_service("upload") is False
@@ -0,0 +1,52 @@
+"""Tests for the PyAndroid spatial index."""
+
+import random
+
+from pyandroid.spatial import SpatialIndex
+
+
+class TestSpatialIndex:
+    """Test cases for SpatialIndex class."""
+    
+    def test_query_point(self):
+        """Test that only rectangles containing the point are returned."""
+        index = SpatialIndex()
+        index.insert("a", 0, 0, 10, 10)
+        index.insert("b", 5, 5, 10, 10)
+        
+        assert sorted(index.query_point(7, 7)) == ["a", "b"]
+        assert index.query_point(10, 2) == []
+        assert index.query_point(12, 12) == ["b"]
+    
+    def test_move_and_remove(self):
+        """Test that re-inserting moves an item and remove drops it."""
+        index = SpatialIndex()
+        index.insert("a", 0, 0, 10, 10)
+        index.insert("a", 100, 100, 10, 10)
+        
+        assert index.query_point(5, 5) == []
+        assert index.query_point(105, 105) == ["a"]
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert len(index) == 0
+    
+    def test_matches_brute_force(self):
+        """Test queries against a linear scan over many moving rectangles."""
+        rng = random.Random(3)
+        index = SpatialIndex(max_items=4)
+        rects = {}
+        for step in range(3000):
+            item = rng.randrange(500)
+            if rng.random() < 0.1:
+                index.remove(item)
+                rects.pop(item, None)
+            else:
+                rect = (rng.randrange(1000), rng.randrange(1000),
+                        rng.randrange(1, 200), rng.randrange(1, 40))
+                index.insert(item, *rect)
+                rects[item] = rect
+        for _ in range(500):
+            x, y = rng.uniform(0, 1200), rng.uniform(0, 1100)
+            expected = {item for item, (left, top, width, height) in rects.items()
+                        if left <= x < left + width and top <= y < top + height}
+            assert set(index.query_point(x, y)) == expected
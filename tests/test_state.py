@@ -0,0 +1,195 @@
+"""Tests for PyAndroid bundles and saved instance state."""
+
+import array
+
+import pytest
+from pyandroid.bundle import Bundle, Parcel, _Encoded
+from pyandroid.state import InstanceStateStore
+
+
+@pytest.fixture
+def store(file_manager):
+    """Create a state store writing under a temporary home directory."""
+    return InstanceStateStore(file_manager)
+
+
+def state_file_size(store, name="main"):
+    """Return the size of a state file in bytes."""
+    return len(store.file_manager.read_bytes(f"{name}.state", store.subdir))
+
+
+class TestBundle:
+    """Test cases for Bundle class."""
+    
+    def test_round_trip(self):
+        """Test that every supported type survives encoding."""
+        bundle = Bundle({
+            "none": None, "flag": True, "off": False, "count": -42,
+            "huge": 1 << 80, "ratio": 0.25, "name": "héllo", "raw": b"\x00\x01",
+            "items": [1, "two", [3.0]], "nested": {"inner": Bundle({"x": 1})},
+        })
+        
+        decoded = Bundle.from_bytes(bundle.to_bytes())
+        
+        assert decoded["huge"] == 1 << 80
+        assert decoded["items"] == [1, "two", [3.0]]
+        assert decoded["nested"]["inner"]["x"] == 1
+        assert decoded == bundle
+        
+    def test_rejects_unsupported_values(self):
+        """Test that unsupported values and keys raise TypeError."""
+        with pytest.raises(TypeError):
+            Bundle({"obj": object()}).to_bytes()
+        with pytest.raises(TypeError):
+            Bundle()[1] = "x"
+            
+    def test_truncated_data(self):
+        """Test that truncated data raises ValueError."""
+        data = Bundle({"name": "value"}).to_bytes()
+        with pytest.raises(ValueError):
+            Bundle.from_bytes(data[:-2])
+    
+    def test_array_round_trip(self):
+        """Test that numeric arrays keep their type and items."""
+        bundle = Bundle({"floats": array.array("d", [0.5, -2.0]),
+                         "longs": array.array("l", [1, -(1 << 31)])})
+        restored = Bundle.from_bytes(bundle.to_bytes())
+        
+        assert restored["floats"] == array.array("d", [0.5, -2.0])
+        assert restored["longs"].tolist() == [1, -(1 << 31)]
+
+
+class TestParcel:
+    """Test cases for lazily decoded parcels."""
+    
+    @pytest.fixture
+    def data(self):
+        return Bundle({
+            "image": b"\x89PNG" * 1000,
+            "samples": array.array("f", [1.0, 2.5, -3.0]),
+            "meta": {"width": 640, "tags": ["a", "b"]},
+            "title": "photo",
+        }).to_bytes()
+    
+    def test_bytes_and_arrays_share_the_buffer(self, data):
+        """Test that bytes and arrays are zero-copy views of the data."""
+        parcel = Parcel.from_bytes(data)
+        
+        image = parcel["image"]
+        samples = parcel["samples"]
+        
+        assert isinstance(image, memoryview) and image.readonly
+        assert image.obj is data and image == b"\x89PNG" * 1000
+        assert samples.format == "f" and samples.tolist() == [1.0, 2.5, -3.0]
+    
+    def test_entries_decode_on_first_access(self, data):
+        """Test that only the entries read are decoded."""
+        parcel = Parcel.from_bytes(data)
+        
+        assert parcel["title"] == "photo"
+        assert "meta" in parcel
+        
+        decoded = [key for key, value in parcel._values.items() if not isinstance(value, _Encoded)]
+        assert decoded == ["title"]
+        assert list(parcel) == ["image", "samples", "meta", "title"]
+    
+    def test_unmodified_parcel_encodes_to_same_bytes(self, data):
+        """Test that an unmodified parcel is written back unchanged."""
+        parcel = Parcel.from_bytes(data)
+        parcel["title"]
+        assert parcel.to_bytes() == data
+    
+    def test_modified_parcel_round_trip(self, data):
+        """Test that changes are encoded with the undecoded entries."""
+        parcel = Parcel.from_bytes(bytearray(data))
+        parcel["meta"]["tags"].append("c")
+        parcel["title"] = "edited"
+        del parcel["samples"]
+        
+        restored = Bundle.from_bytes(parcel.to_bytes())
+        
+        assert restored == {"image": b"\x89PNG" * 1000, "title": "edited",
+                            "meta": {"width": 640, "tags": ["a", "b", "c"]}}
+    
+    def test_copy_is_independent(self, data):
+        """Test that a copy shares data but not entries."""
+        parcel = Parcel.from_bytes(data)
+        copy = parcel.copy()
+        copy["title"] = "other"
+        
+        assert parcel["title"] == "photo"
+        assert copy["image"] == parcel["image"]
+    
+    def test_malformed_data(self, data):
+        """Test that truncated parcels raise ValueError."""
+        with pytest.raises(ValueError):
+            Parcel.from_bytes(data[:-3])
+
+
+class TestInstanceStateStore:
+    """Test cases for InstanceStateStore class."""
+    
+    def test_save_and_load(self, store):
+        """Test that a saved bundle loads back in a new store."""
+        state = Bundle({"counter": 3, "android:views": {"input": {"text": "hi"}}})
+        assert store.save("main", state)
+        
+        loaded = InstanceStateStore(store.file_manager).load("main")
+        
+        assert loaded["counter"] == 3
+        assert loaded["android:views"]["input"]["text"] == "hi"
+        assert store.load("missing") is None
+        
+    def test_incremental_saves_append_changes_only(self, store):
+        """Test that later saves only write changed and removed entries."""
+        views = {f"view{i}": {"text": "x" * 50} for i in range(20)}
+        store.save("main", Bundle({"counter": 0, "android:views": views}))
+        full_size = state_file_size(store)
+        
+        store.save("main", Bundle({"counter": 1, "android:views": views}))
+        delta_size = state_file_size(store) - full_size
+        store.save("main", Bundle({"counter": 1, "android:views": views}))
+        
+        assert 0 < delta_size < full_size / 10
+        assert state_file_size(store) == full_size + delta_size
+        
+        del views["view3"]
+        views["view4"] = {"visible": False}
+        store.save("main", Bundle({"counter": 2, "android:views": views}))
+        loaded = InstanceStateStore(store.file_manager).load("main")
+        
+        assert loaded["counter"] == 2
+        assert "view3" not in loaded["android:views"]
+        assert dict(loaded["android:views"]["view4"]) == {"visible": False}
+        
+    def test_compaction(self, store):
+        """Test that the file is rewritten once changes outgrow the snapshot."""
+        store.save("main", Bundle({"counter": 0}))
+        full_size = state_file_size(store)
+        for counter in range(1, 50):
+            store.save("main", Bundle({"counter": counter}))
+            
+        assert state_file_size(store) <= full_size * 3
+        assert InstanceStateStore(store.file_manager).load("main")["counter"] == 49
+        
+    def test_torn_write_is_ignored(self, store):
+        """Test that a partially written record does not lose earlier state."""
+        store.save("main", Bundle({"counter": 1}))
+        store.file_manager.write_bytes("main.state", b"\x40\x00\x00\x00\x00", "state", append=True)
+        
+        fresh = InstanceStateStore(store.file_manager)
+        assert fresh.load("main")["counter"] == 1
+        fresh.save("main", Bundle({"counter": 2}))
+        assert InstanceStateStore(store.file_manager).load("main")["counter"] == 2
+
+    @pytest.mark.parametrize("tail", [b"\x40\x00", b"\x40\x00\x00\x00"])
+    def test_torn_length_prefix_is_ignored(self, store, tail):
+        """Test that a record cut off inside its length prefix or before its flags is dropped."""
+        store.save("main", Bundle({"counter": 1}))
+        store.save("main", Bundle({"counter": 2}))
+        store.file_manager.write_bytes("main.state", tail, "state", append=True)
+        
+        fresh = InstanceStateStore(store.file_manager)
+        assert fresh.load("main")["counter"] == 2
+        fresh.save("main", Bundle({"counter": 3}))
+        assert InstanceStateStore(store.file_manager).load("main")["counter"] == 3
@@ -1,7 +1,13 @@
 """Tests for PyAndroid UI components."""
 
 import pytest
-from pyandroid.ui import TextView, Button, EditText, LinearLayout, RelativeLayout, Widget
+from pyandroid.backend.kivy_backend import KivyRenderer, argb_to_rgba
+from pyandroid.core import DuplicateViewIdError
+from pyandroid.ui import (
+    TextView, Button, EditText, LinearLayout, RelativeLayout, Widget,
+    Adapter, RecyclerView, parse_color, format_color,
+    MeasureSpec, MATCH_PARENT, WRAP_CONTENT, ConstraintLayout
+)
 
 
 @pytest.fixture
@@ -158,6 +164,44 @@ class TestEditText:
         assert rendered["hint"] == "Enter text"
 
 
+class TestCompactViews:
+    """Test cases for the slotted view representation."""
+    
+    def test_views_have_no_instance_dict(self, text_view, button, edit_text):
+        """Test that built-in views do not carry a per-instance __dict__."""
+        for view in (text_view, button, edit_text):
+            assert not hasattr(view, "__dict__")
+    
+    def test_color_round_trip(self):
+        """Test packing and formatting colors."""
+        assert parse_color("#FF0000") == 0xFFFF0000
+        assert parse_color("#80FF0000") == 0x80FF0000
+        assert format_color(0xFF00FF00) == "#00FF00"
+        assert format_color(0x8000FF00) == "#8000FF00"
+
+    def test_kivy_colors_keep_alpha(self):
+        """Test that the Kivy renderer converts both color forms, keeping alpha."""
+        renderer = KivyRenderer.__new__(KivyRenderer)
+
+        assert renderer.hex_to_rgba("#FF0000") == (1.0, 0.0, 0.0, 1.0)
+        assert renderer.hex_to_rgba("#00000000") == (0.0, 0.0, 0.0, 0.0)
+        assert renderer.hex_to_rgba("#8000FF00") == (0.0, 1.0, 0.0, 0x80 / 255.0)
+        assert argb_to_rgba(parse_color("#800000FF")) == (0.0, 0.0, 1.0, 0x80 / 255.0)
+
+    def test_invalid_color_rejected(self, text_view):
+        """Test that malformed colors raise ValueError."""
+        with pytest.raises(ValueError):
+            text_view.set_text_color("red")
+        with pytest.raises(ValueError):
+            text_view.set_background_color("#12345")
+    
+    def test_lowercase_color_normalized(self, edit_text):
+        """Test that colors are stored packed and read back uppercase."""
+        edit_text.set_background_color("#ff9800")
+        assert edit_text.background_color == "#FF9800"
+        assert edit_text.render()["background_color"] == "#FF9800"
+
+
 class TestLinearLayout:
     """Test cases for LinearLayout class."""
     
@@ -206,6 +250,29 @@ class TestLinearLayout:
         found = linear_layout.find_view_by_id("nonexistent")
         assert found is None
     
+    def test_find_nested_view_by_id(self, linear_layout):
+        """Test finding a view nested in a child layout."""
+        row = LinearLayout("row", orientation="horizontal")
+        linear_layout.add_view(row)
+        button = Button("nested_btn", "Nested")
+        row.add_view(button)
+        
+        assert linear_layout.find_view_by_id("nested_btn") is button
+        assert linear_layout.find_view_by_id("row") is row
+        
+        row.remove_view(button)
+        assert linear_layout.find_view_by_id("nested_btn") is None
+    
+    def test_duplicate_view_id_rejected(self, linear_layout):
+        """Test that inserting a duplicate id anywhere in the tree raises."""
+        row = LinearLayout("row", orientation="horizontal")
+        row.add_view(TextView("dup", "First"))
+        linear_layout.add_view(row)
+        
+        with pytest.raises(DuplicateViewIdError):
+            linear_layout.add_view(TextView("dup", "Second"))
+        assert len(linear_layout.children) == 1
+    
     def test_set_padding(self, linear_layout):
         """Test setting layout padding."""
         linear_layout.set_padding(10, 20, 30, 40)
@@ -249,6 +316,98 @@ class TestLinearLayout:
         assert view1.x == view2.x  # Same x position in vertical layout
 
 
+class TestMeasureLayout:
+    """Test cases for the measure and layout passes."""
+    
+    def test_wrap_content_uses_text(self):
+        """Test that wrap_content views are sized from their text."""
+        short = TextView("short", "Hi")
+        long = TextView("long", "A much longer label")
+        unspecified = (MeasureSpec.UNSPECIFIED, 0)
+        
+        short.measure(unspecified, unspecified)
+        long.measure(unspecified, unspecified)
+        
+        assert short.layout_width == WRAP_CONTENT
+        assert 0 < short.measured_width < long.measured_width
+        assert short.measured_height > 0
+    
+    def test_at_most_clamps_wrap_content(self):
+        """Test that wrap_content never exceeds an AT_MOST bound."""
+        view = TextView("tv", "A much longer label")
+        view.measure(MeasureSpec.make(50, MeasureSpec.AT_MOST),
+                     MeasureSpec.make(0, MeasureSpec.UNSPECIFIED))
+        assert view.measured_width == 50
+    
+    def test_match_parent_and_margins(self):
+        """Test that match_parent children fill the space inside padding and margins."""
+        layout = LinearLayout("root")
+        layout.set_size(400, 600)
+        layout.set_padding(10, 10, 10, 10)
+        child = TextView("tv", "Text")
+        child.set_layout_params(width=MATCH_PARENT)
+        child.set_margins(5, 7, 5, 0)
+        layout.add_view(child)
+        
+        layout.render()
+        
+        assert child.width == 370
+        assert (child.x, child.y) == (15, 17)
+    
+    def test_weights_share_remaining_space(self):
+        """Test that weighted children split the leftover space."""
+        layout = LinearLayout("root", spacing=0)
+        layout.set_size(300, 500)
+        header = TextView("header", "Header", height=100)
+        body = TextView("body", "Body")
+        footer = TextView("footer", "Footer")
+        body.set_layout_params(weight=1)
+        footer.set_layout_params(weight=3)
+        for view in (header, body, footer):
+            layout.add_view(view)
+        
+        layout.render()
+        
+        assert (body.y, body.height) == (100, 100)
+        assert (footer.y, footer.height) == (200, 300)
+    
+    def test_nested_layout_wraps_children(self):
+        """Test that a nested layout is sized from its children."""
+        root = LinearLayout("root")
+        row = LinearLayout("row", orientation="horizontal", spacing=0)
+        row.add_view(TextView("a", width=100, height=30))
+        row.add_view(TextView("b", width=50, height=40))
+        root.add_view(row)
+        
+        root.render()
+        
+        assert row.measured_height == 40
+        assert row.children[1].x == 100
+    
+    def test_clean_siblings_are_not_remeasured(self):
+        """Test that re-layout skips subtrees whose inputs did not change."""
+        measured = []
+        
+        class TrackedTextView(TextView):
+            def on_measure(self, width_spec, height_spec):
+                measured.append(self.view_id)
+                super().on_measure(width_spec, height_spec)
+        
+        layout = LinearLayout("root")
+        changed = TrackedTextView("changed", "Before")
+        stable = TrackedTextView("stable", "Stable")
+        layout.add_view(changed)
+        layout.add_view(stable)
+        layout.render()
+        
+        measured.clear()
+        changed.set_text("After the change")
+        layout.render()
+        
+        assert measured == ["changed"]
+        assert stable.y > changed.y
+
+
 class TestRelativeLayout:
     """Test cases for RelativeLayout class."""
     
@@ -266,6 +425,147 @@ class TestRelativeLayout:
         rendered = layout.render()
         assert rendered["type"] == "RelativeLayout"
         assert len(rendered["children"]) == 1
+    
+    def test_relative_layout_keeps_manual_positions(self):
+        """Test that children without rules stay where they were placed."""
+        layout = RelativeLayout("test_layout")
+        view = TextView("tv1", "Test", width=50, height=20)
+        view.set_position(30, 40)
+        layout.add_view(view)
+        
+        layout.render()
+        assert (view.x, view.y) == (30, 40)
+    
+    def test_relative_rules(self):
+        """Test parent and sibling rules."""
+        layout = RelativeLayout("root")
+        layout.set_size(400, 300)
+        title = TextView("title", "Title", width=100, height=40)
+        ok = Button("ok", "OK", width=80, height=30)
+        layout.add_view(title)
+        layout.add_view(ok)
+        layout.add_rule(title, RelativeLayout.CENTER_HORIZONTAL)
+        layout.add_rule(ok, RelativeLayout.BELOW, "title")
+        layout.add_rule(ok, RelativeLayout.ALIGN_PARENT_RIGHT)
+        ok.set_margins(0, 10, 5, 0)
+        
+        layout.render()
+        
+        assert title.x == 150
+        assert (ok.x, ok.y) == (315, 50)
+    
+    def test_sibling_size_change_resolves(self):
+        """Test that resizing an anchor moves the views constrained to it."""
+        layout = RelativeLayout("root")
+        layout.set_size(400, 300)
+        title = TextView("title", "Title", width=100, height=40)
+        body = TextView("body", "Body", width=100, height=40)
+        layout.add_view(title)
+        layout.add_view(body)
+        layout.add_rule(body, RelativeLayout.BELOW, "title")
+        layout.render()
+        
+        title.set_size(100, 90)
+        layout.render()
+        assert body.y == 90
+    
+    def test_unknown_rule(self):
+        """Test that unknown rules and missing anchors are rejected."""
+        layout = RelativeLayout("root")
+        with pytest.raises(ValueError):
+            layout.add_rule("x", "floating")
+        with pytest.raises(ValueError):
+            layout.add_rule("x", RelativeLayout.BELOW)
+
+
+class TestConstraintLayout:
+    """Test cases for ConstraintLayout class."""
+    
+    @pytest.fixture
+    def layout(self):
+        """Create a fixed-size constraint layout."""
+        layout = ConstraintLayout("root")
+        layout.set_size(300, 200)
+        return layout
+    
+    def test_bias_between_parent_edges(self, layout):
+        """Test that bias positions a view between two anchors."""
+        view = TextView("tv", "Text", width=100, height=20)
+        layout.add_view(view)
+        layout.constrain(view, left_to_left_of="parent", right_to_right_of="parent",
+                         horizontal_bias=0.25)
+        
+        layout.render()
+        assert view.x == 50
+    
+    def test_sibling_constraints(self, layout):
+        """Test constraining one side to a sibling."""
+        label = TextView("label", "Label", width=80, height=20)
+        field = EditText("field", width=100, height=20)
+        layout.add_view(label)
+        layout.add_view(field)
+        layout.constrain(label, left_to_left_of="parent", top_to_top_of="parent")
+        layout.constrain(field, left_to_right_of="label", top_to_top_of="label")
+        
+        layout.render()
+        assert (field.x, field.y) == (80, 0)
+        
+        layout.constrain(label, left_to_left_of=None, right_to_right_of="parent")
+        layout.render()
+        assert field.x == 300
+    
+    def test_spread_chain(self, layout):
+        """Test that a spread chain distributes free space evenly."""
+        views = [Button(f"b{i}", width=60, height=20) for i in range(3)]
+        for view in views:
+            layout.add_view(view)
+        layout.create_chain(views, style=ConstraintLayout.CHAIN_SPREAD)
+        
+        layout.render()
+        assert [view.x for view in views] == [30, 120, 210]
+    
+    def test_packed_chain_with_bias(self, layout):
+        """Test that a packed chain is positioned by its bias."""
+        views = [Button(f"b{i}", width=60, height=20) for i in range(2)]
+        for view in views:
+            layout.add_view(view)
+        layout.create_chain(views, style=ConstraintLayout.CHAIN_PACKED, bias=0.0)
+        
+        layout.render()
+        assert [view.x for view in views] == [0, 60]
+        
+        views[0].set_size(100, 20)
+        layout.render()
+        assert views[1].x == 100
+    
+    def test_removing_anchor_view(self, layout):
+        """Test that removing an anchored sibling leaves dependents unconstrained."""
+        label = TextView("label", "Label", width=80, height=20)
+        field = EditText("field", width=100, height=20)
+        layout.add_view(label)
+        layout.add_view(field)
+        layout.constrain(field, left_to_right_of="label")
+        layout.render()
+        
+        layout.remove_view(label)
+        layout.render()
+        assert layout.find_view_by_id("label") is None
+        assert field.x == 80
+    
+    def test_many_constraints(self):
+        """Test a column of hundreds of views each below the previous one."""
+        layout = ConstraintLayout("root")
+        views = [TextView(f"row{i}", width=100, height=10) for i in range(300)]
+        for i, view in enumerate(views):
+            layout.add_view(view)
+            if i:
+                layout.constrain(view, top_to_bottom_of=f"row{i - 1}")
+        layout.render()
+        assert views[-1].y == 2990
+        
+        views[0].set_size(100, 20)
+        layout.render()
+        assert views[-1].y == 3000
 
 
 class TestWidget:
@@ -303,3 +603,147 @@ class TestWidget:
         assert isinstance(et, EditText)
         assert et.view_id == "test"
         assert et.hint == "Hint"
+
+
+class TestIncrementalRender:
+    """Test cases for dirty-flag render caching."""
+    
+    def test_clean_layout_reuses_render(self, linear_layout):
+        """Test that rendering an unchanged layout returns the cached tree."""
+        linear_layout.add_view(TextView("tv1", "Text 1"))
+        
+        first = linear_layout.render()
+        assert linear_layout.render() is first
+    
+    def test_setter_rerenders_only_changed_child(self, linear_layout):
+        """Test that a setter invalidates its view but not its siblings."""
+        view1 = TextView("tv1", "Text 1")
+        view2 = TextView("tv2", "Text 2")
+        linear_layout.add_view(view1)
+        linear_layout.add_view(view2)
+        
+        first = linear_layout.render()
+        view2.set_text("Changed")
+        second = linear_layout.render()
+        
+        assert second is not first
+        assert second["children"][0] is first["children"][0]
+        assert second["children"][1]["text"] == "Changed"
+    
+    def test_nested_change_invalidates_ancestors(self, linear_layout):
+        """Test that changing a nested view dirties every ancestor."""
+        row = LinearLayout("row", orientation="horizontal")
+        label = TextView("label", "Label")
+        row.add_view(label)
+        linear_layout.add_view(row)
+        
+        first = linear_layout.render()
+        label.set_text_color("#FF0000")
+        second = linear_layout.render()
+        
+        assert second is not first
+        assert second["children"][0]["children"][0]["text_color"] == "#FF0000"
+    
+    def test_direct_assignment_invalidates(self, linear_layout):
+        """Test that assigning a public attribute directly also invalidates."""
+        view = TextView("tv1", "Text 1")
+        linear_layout.add_view(view)
+        
+        first = linear_layout.render()
+        view.text = "Assigned"
+        assert linear_layout.render()["children"][0]["text"] == "Assigned"
+        assert linear_layout.render() is not first
+    
+    def test_unchanged_value_keeps_cache(self, linear_layout):
+        """Test that re-setting the same value does not invalidate."""
+        view = TextView("tv1", "Text 1")
+        linear_layout.add_view(view)
+        
+        first = linear_layout.render()
+        view.set_text("Text 1")
+        assert linear_layout.render() is first
+
+
+class NumberAdapter(Adapter):
+    """Adapter over a range of numbers used by RecyclerView tests."""
+    
+    def __init__(self, count):
+        self.count = count
+        self.bind_calls = 0
+    
+    def get_item_count(self):
+        return self.count
+    
+    def get_item_view_type(self, position):
+        return "Button" if position % 10 == 0 else "TextView"
+    
+    def bind_view(self, view, position):
+        self.bind_calls += 1
+        view.set_text(f"Item {position}")
+
+
+class TestRecyclerView:
+    """Test cases for RecyclerView class."""
+    
+    def test_only_viewport_is_materialized(self):
+        """Test that a large list binds only the visible range."""
+        recycler = RecyclerView("list", NumberAdapter(50000), item_height=40,
+                                height=400, prefetch_items=2)
+        rendered = recycler.render()
+        
+        assert rendered["item_count"] == 50000
+        assert len(recycler.children) == 12  # 10 visible + 2 prefetched below
+        assert rendered["children"][0]["text"] == "Item 0"
+        assert rendered["children"][0]["type"] == "Button"
+    
+    def test_scroll_recycles_views(self):
+        """Test that scrolling reuses pooled views instead of creating new ones."""
+        adapter = NumberAdapter(50000)
+        recycler = RecyclerView("list", adapter, item_height=40, height=400)
+        recycler.render()
+        
+        for _ in range(200):
+            recycler.scroll_by(40)
+            recycler.render()
+        
+        first, last = recycler.get_visible_range()
+        assert first == 198
+        assert recycler.children[0].text == "Item 198"
+        assert recycler.children[0].y == 198 * 40 - recycler.scroll_y
+        assert recycler._created_views < 2 * (last - first)
+    
+    def test_scroll_is_clamped(self):
+        """Test that scrolling stops at the ends of the list."""
+        recycler = RecyclerView("list", NumberAdapter(20), item_height=40, height=400)
+        recycler.scroll_to(10000)
+        assert recycler.scroll_y == 400
+        recycler.scroll_by(-10000)
+        assert recycler.scroll_y == 0
+    
+    def test_notify_data_set_changed(self):
+        """Test that data changes re-bind the visible items."""
+        adapter = NumberAdapter(5)
+        recycler = RecyclerView("list", adapter, item_height=40, height=400)
+        recycler.render()
+        
+        adapter.count = 3
+        recycler.notify_data_set_changed()
+        rendered = recycler.render()
+        assert len(rendered["children"]) == 3
+    
+    def test_adapter_requires_count_and_binding(self):
+        """Test that an adapter missing get_item_count() or bind_view() cannot be created."""
+        class CountOnlyAdapter(Adapter):
+            def get_item_count(self):
+                return 0
+        
+        with pytest.raises(TypeError):
+            CountOnlyAdapter()
+    
+    def test_bound_items_are_indexed(self):
+        """Test that bound items can be found by id and pooled ones cannot."""
+        recycler = RecyclerView("list", NumberAdapter(100), item_height=40,
+                                height=40, prefetch_items=0)
+        recycler.render()
+        view_id = recycler.children[0].view_id
+        assert recycler.find_view_by_id(view_id) is recycler.children[0]
@@ -0,0 +1,77 @@
+"""Tests for PyAndroid utilities."""
+
+import os
+import stat
+
+import pytest
+from pyandroid import utils
+from pyandroid.utils import FSYNC_FILE, FSYNC_GROUP, FileManager
+
+
+@pytest.fixture
+def fsync_calls(monkeypatch):
+    """Record whether each os.fsync call synced a directory."""
+    calls = []
+    fsync = os.fsync
+
+    def record(fd):
+        calls.append(stat.S_ISDIR(os.fstat(fd).st_mode))
+        fsync(fd)
+
+    monkeypatch.setattr(utils.os, "fsync", record)
+    return calls
+
+
+class TestFileManager:
+    """Test cases for atomic and batched FileManager writes."""
+
+    def test_write_file_is_atomic(self, home, monkeypatch):
+        """Test that a failed write keeps the old file and leaves no temporary file."""
+        fm = FileManager("AtomicApp")
+        assert fm.write_file("config.txt", "old")
+
+        def fail(source, target):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(utils.os, "replace", fail)
+        assert fm.write_file("config.txt", "new") is False
+        monkeypatch.undo()
+
+        assert fm.read_file("config.txt") == "old"
+        assert os.listdir(fm.get_app_directory()) == ["config.txt"]
+
+    def test_write_batch(self, home):
+        """Test writing many files in one call."""
+        fm = FileManager("BatchApp")
+        files = {f"item{number}.state": bytes([number]) * 10 for number in range(20)}
+        files["notes.txt"] = "héllo"
+
+        assert fm.write_batch(files, "state")
+        assert sorted(fm.list_files("state")) == sorted(files)
+        assert fm.read_bytes("item7.state", "state") == b"\x07" * 10
+        assert fm.read_file("notes.txt", "state") == "héllo"
+
+    def test_fsync_per_file(self, home, fsync_calls):
+        """Test that FSYNC_FILE syncs each file and its directory."""
+        fm = FileManager("FileSyncApp", fsync=FSYNC_FILE)
+        assert fm.write_batch({"a": b"1", "b": b"2"})
+
+        assert fsync_calls == [False, True, False, True]
+
+    def test_fsync_group(self, home, fsync_calls):
+        """Test that FSYNC_GROUP syncs each directory once per batch."""
+        fm = FileManager("GroupSyncApp", fsync=FSYNC_GROUP)
+        assert fm.write_batch({"a": b"1", "b": b"2", "c": b"3"})
+
+        assert fsync_calls == [False, False, False, True]
+
+    def test_append_and_default_policy(self, home, fsync_calls):
+        """Test that appends stay in place and the default policy never syncs."""
+        fm = FileManager("AppendApp")
+        assert fm.write_bytes("log.bin", b"ab")
+        assert fm.write_bytes("log.bin", b"cd", append=True)
+
+        assert fm.read_bytes("log.bin") == b"abcd"
+        assert fsync_calls == []
+        with pytest.raises(ValueError):
+            FileManager("AppendApp", fsync="always")